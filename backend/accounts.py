@@ -1,73 +1,91 @@
-import psycopg2
-import bcrypt
 import streamlit as st
-from backend.db import get_connection, release_connection  # Connection Pool 활용
+from backend import passwords
+from backend.db import identity_cache
+from backend.metrics import instrument
+from backend.purge import start_purge_job
+from backend.storage import IntegrityError, get_backend
 
-# 비밀번호 해싱
+# 비밀번호 해싱 (bcrypt는 별도 process pool에서 실행, backend/passwords.py)
 def hash_password(password: str) -> str:
     """비밀번호를 해싱하여 저장"""
     if not isinstance(password, str):
         raise ValueError("Password must be a string")
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode(), salt).decode()  # 해싱 후 문자열로 변환
+    return passwords.hash_password(password)
 
 # 비밀번호 검증
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """비밀번호를 검증 (해싱된 비밀번호와 비교)"""
     if not isinstance(plain_password, str) or not isinstance(hashed_password, str):
         raise ValueError("Both plain_password and hashed_password must be strings")
-    return bcrypt.checkpw(plain_password.encode(), hashed_password.encode('utf-8'))  # 수정된 부분
+    return passwords.verify_password(plain_password, hashed_password)
+
+# 저장된 해시의 cost가 현재 설정과 다르면 새 cost로 교체 (실패해도 로그인은 유지)
+# 재해싱은 process pool에 제출만 하고 기다리지 않음 (로그인 응답에 bcrypt 한 번의 시간이 더해지지 않도록)
+def _upgrade_password_hash(user_id, password: str, stored_password: str):
+    if not passwords.needs_rehash(stored_password):
+        return None
+
+    def save(new_hash):
+        try:
+            get_backend().execute("update_password_hash", (user_id, new_hash, stored_password))
+        except Exception as e:
+            print(f"Error upgrading password hash: {e}")
+
+    return passwords.hash_password_async(password, save)
 
 # 사용자 등록
+@instrument("register_user")
 def register_user(username: str, password: str) -> bool:
-    """새 사용자를 데이터베이스에 추가"""
+    """새 사용자를 데이터베이스에 추가 (중복 아이디면 False, 비밀번호 해싱을 처리하지 못하면 None)"""
     if not isinstance(username, str) or not isinstance(password, str):
         raise ValueError("Username and password must be strings")
     
-    hashed_password = hash_password(password)
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO users (username, password) VALUES (%s, %s) RETURNING id;",
-                    (username, hashed_password),
-                )
-                conn.commit()
-                return True  # 회원가입 성공
-        except psycopg2.IntegrityError:
-            return False  # 중복 아이디 오류
-        finally:
-            release_connection(conn)
+    try:
+        hashed_password = hash_password(password)
+    except passwords.UNAVAILABLE_ERRORS as e:
+        # 해싱 process pool이 응답하지 않으면 가입 실패로 처리 (회원가입 화면은 유지)
+        print(f"Error hashing password: {e!r}")
+        return None
+    try:
+        rows = get_backend().query(
+            "register_user", (username, hashed_password), commit=True
+        )
+    except IntegrityError:
+        return False  # 중복 아이디 오류
+    identity_cache.set(username, rows[0]["id"])  # 이전에 캐시된 값이 있으면 교체
+    return True  # 회원가입 성공
 
 # 사용자 인증 (로그인)
-def authenticate(username: str, password: str) -> bool:
-    """사용자의 비밀번호를 검증하여 로그인 처리"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "SELECT password FROM users WHERE username = %s AND is_active = TRUE",
-                    (username,),
-                )
-                user_data = cur.fetchone()
+@instrument("authenticate")
+def authenticate(username: str, password: str):
+    """사용자의 비밀번호를 검증하여 성공 시 사용자 정보({"id", "username"}), 실패 시 None 반환"""
+    try:
+        rows = get_backend().query("authenticate", (username,))
+    except Exception as e:
+        print(f"Error during authentication: {e}")
+        return None
 
-            if user_data:
-                stored_password = user_data[0]  # 데이터베이스에서 가져온 해싱된 비밀번호
-                return verify_password(password, stored_password)  # 수정된 부분
-            return False
-        except Exception as e:
-            print(f"Error during authentication: {e}")
-            return False
-        finally:
-            release_connection(conn)
+    # bcrypt 검증은 연결을 반환한 뒤 수행 (검증 중 연결 점유 방지)
+    if rows:
+        user_id, stored_password = rows[0]["id"], rows[0]["password"]  # 해싱된 비밀번호
+        try:
+            verified = verify_password(password, stored_password)
+        except passwords.UNAVAILABLE_ERRORS as e:
+            # 해싱 process pool이 응답하지 않으면 로그인 실패로 처리 (로그인 화면은 유지)
+            print(f"Error verifying password: {e!r}")
+            return None
+        if verified:
+            _upgrade_password_hash(user_id, password, stored_password)
+            identity_cache.set(username, user_id)
+            return {"id": user_id, "username": username}
+    return None
 
 # 로그인 처리 (세션 업데이트)
-def login_user(username: str):
+def login_user(username: str, user_id=None):
     """로그인 시 세션에 사용자 정보 저장"""
     st.session_state["authenticated"] = True
     st.session_state["user"] = username
+    st.session_state["user_id"] = user_id
     st.success(f"{username}님, 로그인되었습니다.")
 
 # 로그아웃 처리
@@ -75,26 +93,24 @@ def logout():
     """로그아웃 시 세션 초기화"""
     st.session_state["authenticated"] = False
     st.session_state["user"] = None
+    st.session_state["user_id"] = None
     st.info("📢 로그아웃 되었습니다.")
 
-# 회원 탈퇴 (is_active = False 로 변경)
+# 회원 탈퇴 (is_active = False 로 변경 후 채팅 데이터 purge)
+@instrument("delete_user")
 def delete_user(username: str) -> bool:
-    """회원 탈퇴 시 실제 데이터를 삭제하는 대신 is_active = False로 변경"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "UPDATE users SET is_active = FALSE WHERE username = %s",
-                    (username,),
-                )
-                conn.commit()
-                return True  # 탈퇴 성공
-        except Exception as e:
-            print(f"Error deleting user: {e}")
-            return False
-        finally:
-            release_connection(conn)
+    """회원 탈퇴 시 is_active = False로 변경하고, 채팅 데이터는 백그라운드 purge 작업으로 삭제"""
+    try:
+        get_backend().execute("deactivate_user", (username,))
+    except Exception as e:
+        print(f"Error deleting user: {e}")
+        return False
+
+    identity_cache.invalidate(username)
+    # 비활성 사용자의 메시지/세션을 batch 단위로 삭제
+    # (이미 실행 중이면 False, 실행 중인 작업이 끝나기 전에 이 사용자까지 다시 조회하여 삭제)
+    start_purge_job()
+    return True  # 탈퇴 성공
 
 # 로그인 상태 확인
 def is_authenticated() -> bool:
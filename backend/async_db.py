@@ -0,0 +1,357 @@
+"""
+비동기 DB 접근 계층 (asyncpg)
+
+- backend/db.py와 같은 함수 이름/반환 형태를 async 함수로 제공
+  (예: await create_chat_session(user_id), await get_chat_history(session_id))
+- DB 작업을 LLM / Pinecone 호출과 동시에 실행하거나 FastAPI(uvicorn) 서비스에서 사용
+- asyncpg pool은 event loop에 묶이므로 loop마다 pool을 하나씩 생성
+- SQL은 동기 계층과 같은 backend/queries.py 등록소를 사용 (asyncpg가 연결별로 자동 prepare)
+- username -> user_id 캐시와 메시지 write-behind journal은 동기 계층(backend.db)과 공유
+  - 메시지 조회 / 삭제 전에 journal에 남은 메시지를 먼저 저장 (동기 계층에서 넣은 최근 메시지 포함)
+  - 메시지를 DB에 저장하지 못하면 journal의 spool 파일에 기록하여 DB 복구 후 저장 (메시지 유실 없음)
+"""
+
+import asyncio
+import time
+import uuid
+import weakref
+from datetime import datetime, timezone
+
+import asyncpg
+import streamlit as st
+
+from backend import metrics, queries
+from backend.db import DEFAULT_CHUNK_SIZE, DEFAULT_PAGE_SIZE, identity_cache, message_journal
+from backend.metrics import instrument
+from backend.pool import PoolTimeoutError
+
+# event loop -> pool 생성 task
+_pools = weakref.WeakKeyDictionary()
+
+
+async def _create_pool():
+    # secrets는 처음 연결할 때 읽음 (모듈 import만으로 설정 파일을 요구하지 않도록)
+    from backend.config import DB_CONFIG, DB_POOL_CONFIG
+
+    pool = await asyncpg.create_pool(
+        database=DB_CONFIG["database"],
+        user=DB_CONFIG["user"],
+        password=DB_CONFIG["password"],
+        host=DB_CONFIG["host"],
+        port=DB_CONFIG["port"],
+        ssl=st.secrets["postgres"].get("SSL_MODE", "require"),  # 기본값 'require'
+        min_size=DB_POOL_CONFIG["minconn"],
+        max_size=DB_POOL_CONFIG["maxconn"],
+        max_inactive_connection_lifetime=DB_POOL_CONFIG["max_idle"],
+    )
+    print("Async database connection pool created successfully.")
+    return pool
+
+
+async def get_pool():
+    """현재 event loop의 asyncpg pool 반환 (없으면 생성)"""
+    loop = asyncio.get_running_loop()
+    task = _pools.get(loop)
+    if task is None:
+        task = _pools[loop] = loop.create_task(_create_pool())
+    try:
+        return await task
+    except Exception:
+        _pools.pop(loop, None)  # 다음 호출에서 다시 생성 시도
+        raise
+
+
+async def close_pool():
+    """현재 event loop의 pool 종료"""
+    task = _pools.pop(asyncio.get_running_loop(), None)
+    if task is not None:
+        await (await task).close()
+
+
+class _Acquire:
+    """pool.acquire()에 동기 계층과 같은 timeout 의미 부여 (초과 시 PoolTimeoutError)"""
+
+    def __init__(self, timeout):
+        from backend.config import DB_POOL_CONFIG
+
+        self.timeout = DB_POOL_CONFIG["timeout"] if timeout is None else timeout
+        self.pool = None
+        self.conn = None
+
+    async def __aenter__(self):
+        start = time.perf_counter()
+        try:
+            self.pool = await get_pool()
+            self.conn = await self.pool.acquire(timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(
+                f"{self.timeout:.1f}초 안에 DB 연결을 얻지 못했습니다."
+            ) from None
+        finally:
+            metrics.add_pool_wait(time.perf_counter() - start)  # 계측 중인 호출에 풀 대기 시간 누적
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        await self.pool.release(self.conn)
+
+
+# async with 문용 연결 대여 (사용 후 자동 반환)
+def db_connection(timeout=None):
+    return _Acquire(timeout)
+
+
+# journal에 남은 메시지 저장 (flush는 대기하는 동기 함수이므로 event loop를 막지 않도록 스레드에서 실행)
+async def _flush_journal():
+    await asyncio.to_thread(message_journal.flush)
+
+
+# 새로운 채팅 세션 생성
+@instrument("async_create_chat_session")
+async def create_chat_session(user_id):
+    """새로운 채팅 세션을 생성하고, 세션 ID를 반환"""
+    async with db_connection() as conn:
+        try:
+            with queries.timed("create_chat_session"):
+                return await conn.fetchval(queries.sql("create_chat_session"), user_id)
+        except Exception as e:
+            print(f"Error creating chat session: {e}")
+    return None
+
+
+# 챗봇과의 대화 메시지 삽입
+@instrument("async_insert_chat_message")
+async def insert_chat_message(session_id, sender, message):
+    """
+    사용자 또는 챗봇이 보낸 메시지를 저장하고 message_uid 반환
+    (DB에 저장하지 못하면 journal spool 파일에 기록, DB 복구 후 같은 message_uid로 저장,
+    제약 조건 위반 / 잘못된 값이면 journal dead-letter 파일에 기록)
+    """
+    if session_id is None:
+        raise ValueError("session_id is required to store a chat message.")
+    row = {
+        "message_uid": str(uuid.uuid4()),
+        "session_id": session_id,
+        "sender": sender,
+        "message": message,
+        "timestamp": datetime.now(timezone.utc),
+    }
+    try:
+        async with db_connection() as conn:
+            with queries.timed("insert_chat_messages"):
+                await conn.execute(
+                    queries.sql("insert_chat_messages"),
+                    [uuid.UUID(row["message_uid"])],
+                    [session_id],
+                    [sender],
+                    [message],
+                    [row["timestamp"]],
+                )
+    except (asyncpg.IntegrityConstraintViolationError, asyncpg.DataError) as e:
+        await asyncio.to_thread(message_journal.reject, [row], e)
+    except Exception as e:
+        await asyncio.to_thread(message_journal.spool, [row], e)
+    return row["message_uid"]
+
+
+# 등록된 조회 쿼리 실행 공통 처리 (동기 계층의 RealDictCursor와 같은 dict 리스트 반환)
+# asyncpg가 연결마다 statement를 자동으로 prepare / cache 하므로 SQL만 전달
+async def _fetch_all(name, args, error_message):
+    rows = []
+    async with db_connection() as conn:
+        try:
+            with queries.timed(name):
+                records = await conn.fetch(queries.sql(name), *args)
+            rows = [dict(record) for record in records]
+        except Exception as e:
+            print(f"{error_message}: {e}")
+    return rows
+
+
+# 특정 세션의 대화 내역 가져오기
+@instrument("async_get_chat_history")
+async def get_chat_history(session_id):
+    """특정 채팅 세션의 대화 내역을 시간순으로 조회"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    return await _fetch_all(
+        "get_chat_history", (session_id,), "Error fetching chat history"
+    )
+
+
+# 사용자별 전체 채팅 세션 목록 가져오기
+@instrument("async_get_user_chat_sessions")
+async def get_user_chat_sessions(user_id):
+    """사용자가 가진 모든 채팅 세션을 최신순으로 조회"""
+    return await _fetch_all(
+        "get_user_chat_sessions", (user_id,), "Error fetching chat sessions"
+    )
+
+
+# 사용자가 이전 면접에서 받은 질문 가져오기 (질문 중복 제거용)
+@instrument("async_get_user_questions")
+async def get_user_questions(user_id, limit=100):
+    """backend.db.get_user_questions의 async 버전"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    rows = await _fetch_all(
+        "get_user_questions", (user_id, limit), "Error fetching user questions"
+    )
+    return [row["message"] for row in rows]
+
+
+# 전체 사용자 대화 기록 조회
+@instrument("async_get_all_chat_sessions")
+async def get_all_chat_sessions():
+    """모든 사용자 채팅 세션 목록을 최신순으로 조회"""
+    return await _fetch_all(
+        "get_all_chat_sessions", (), "Error fetching all chat sessions"
+    )
+
+
+# keyset 페이지 조회 공통 처리 (limit + 1개를 가져와 다음 페이지 존재 여부 판단)
+async def _fetch_page(name, args, limit, cursor_keys):
+    rows = await _fetch_all(name, (*args, limit + 1), "Error fetching page")
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, tuple(rows[-1][key] for key in cursor_keys)
+
+
+# 특정 세션의 대화 내역을 페이지 단위로 가져오기
+@instrument("async_get_chat_history_page")
+async def get_chat_history_page(session_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    """backend.db.get_chat_history_page의 async 버전"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    if after is None:
+        return await _fetch_page(
+            "get_chat_history_page", (session_id,), limit, ("timestamp", "id")
+        )
+    return await _fetch_page(
+        "get_chat_history_page_after", (session_id, *after), limit, ("timestamp", "id")
+    )
+
+
+# 사용자별 채팅 세션 목록을 페이지 단위로 가져오기
+@instrument("async_get_user_chat_sessions_page")
+async def get_user_chat_sessions_page(user_id, limit=DEFAULT_PAGE_SIZE, before=None):
+    """backend.db.get_user_chat_sessions_page의 async 버전"""
+    if before is None:
+        return await _fetch_page(
+            "get_user_chat_sessions_page", (user_id,), limit, ("created_at", "id")
+        )
+    return await _fetch_page(
+        "get_user_chat_sessions_page_before",
+        (user_id, *before),
+        limit,
+        ("created_at", "id"),
+    )
+
+
+# 전체 사용자 채팅 세션 목록을 페이지 단위로 가져오기
+@instrument("async_get_all_chat_sessions_page")
+async def get_all_chat_sessions_page(limit=DEFAULT_PAGE_SIZE, before=None):
+    """backend.db.get_all_chat_sessions_page의 async 버전"""
+    if before is None:
+        return await _fetch_page(
+            "get_all_chat_sessions_page", (), limit, ("created_at", "id")
+        )
+    return await _fetch_page(
+        "get_all_chat_sessions_page_before", tuple(before), limit, ("created_at", "id")
+    )
+
+
+# server-side cursor로 결과를 chunk 단위 스트리밍
+async def _stream_chunks(name, args, chunk_size):
+    async with db_connection() as conn:
+        async with conn.transaction():
+            chunk = []
+            async for record in conn.cursor(
+                queries.sql(name), *args, prefetch=chunk_size
+            ):
+                chunk.append(dict(record))
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if chunk:
+                yield chunk
+
+
+# 특정 세션의 대화 내역 스트리밍
+@instrument("async_iter_chat_history")
+async def iter_chat_history(session_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """특정 채팅 세션의 대화 내역을 시간순으로 chunk_size개씩 반환 (async generator)"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    async for chunk in _stream_chunks("get_chat_history", (session_id,), chunk_size):
+        yield chunk
+
+
+# 사용자별 채팅 세션 스트리밍
+@instrument("async_iter_user_chat_sessions")
+async def iter_user_chat_sessions(user_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """사용자의 채팅 세션을 최신순으로 chunk_size개씩 반환 (async generator)"""
+    async for chunk in _stream_chunks("get_user_chat_sessions", (user_id,), chunk_size):
+        yield chunk
+
+
+# 전체 사용자 채팅 세션 스트리밍
+@instrument("async_iter_all_chat_sessions")
+async def iter_all_chat_sessions(chunk_size=DEFAULT_CHUNK_SIZE):
+    """모든 사용자 채팅 세션을 최신순으로 chunk_size개씩 반환 (async generator)"""
+    async for chunk in _stream_chunks("get_all_chat_sessions", (), chunk_size):
+        yield chunk
+
+
+# 실행만 하는 문장 공통 처리 (삭제 등)
+async def _execute(name, args, error_message):
+    async with db_connection() as conn:
+        try:
+            with queries.timed(name):
+                await conn.execute(queries.sql(name), *args)
+            return True
+        except Exception as e:
+            print(f"{error_message}: {e}")
+    return False
+
+
+# 특정 채팅 세션의 대화 메시지 삭제
+@instrument("async_delete_chat_messages")
+async def delete_chat_messages(session_id):
+    """특정 채팅 세션의 모든 메시지를 삭제"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    await _execute(
+        "delete_chat_messages", (session_id,), "Error deleting chat messages"
+    )
+
+
+# 특정 채팅 세션과 모든 대화 내역 삭제
+@instrument("async_delete_chat_session")
+async def delete_chat_session(session_id):
+    """특정 채팅 세션의 메시지와 세션 정보를 한 문장으로 삭제"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    await _execute("delete_chat_session", (session_id,), "Error deleting chat session")
+
+
+# 특정 사용자의 모든 채팅 세션 및 대화 삭제
+@instrument("async_delete_all_user_sessions")
+async def delete_all_user_sessions(user_id):
+    """특정 사용자의 모든 채팅 세션과 연관된 메시지를 한 문장으로 삭제"""
+    await _flush_journal()  # 아직 저장되지 않은 메시지 먼저 반영
+    await _execute(
+        "delete_all_user_sessions", (user_id,), "Error deleting all user chat sessions"
+    )
+
+
+@instrument("async_get_user_id")
+async def get_user_id(username):
+    """사용자의 user_id를 조회 (캐시에 있으면 DB 조회 생략)"""
+    user_id = identity_cache.get(username)
+    if user_id is not None:
+        return user_id
+
+    async with db_connection() as conn:
+        try:
+            with queries.timed("get_user_id"):
+                user_id = await conn.fetchval(queries.sql("get_user_id"), username)
+        except Exception as e:
+            print(f"Error fetching user ID: {e}")
+    if user_id is not None:
+        identity_cache.set(username, user_id)  # 존재하는 사용자만 캐시
+    return user_id
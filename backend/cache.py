@@ -0,0 +1,75 @@
+"""
+프로세스 공용 LRU + TTL 캐시
+
+- 최대 maxsize개까지 보관하고, 넘치면 가장 오래 사용하지 않은 항목부터 제거 (LRU)
+- 저장 후 ttl초가 지난 항목은 만료되어 다시 조회
+- 여러 Streamlit 세션 스레드에서 동시에 사용해도 안전
+- hit / miss 횟수를 stats()로 제공
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=300.0):
+        """
+        :param maxsize: 최대 보관 항목 수
+        :param ttl: 항목 유효 시간 (초)
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, default=None):
+        """캐시된 값 반환 (없거나 만료되었으면 default)"""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is not _MISSING and item[0] > now:
+                self._data.move_to_end(key)
+                self._hits += 1
+                return item[1]
+            if item is not _MISSING:
+                del self._data[key]  # 만료된 항목 제거
+            self._misses += 1
+            return default
+
+    def set(self, key, value):
+        """값 저장 (가득 차면 가장 오래 사용하지 않은 항목 제거)"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key):
+        """특정 항목 삭제"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """모든 항목 삭제"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """캐시 크기와 hit / miss 지표"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
@@ -0,0 +1,137 @@
+"""
+평가 워크플로우(LangGraph) checkpoint 저장소
+
+- 컴파일한 그래프 하나를 프로세스 전체에서 공유하고, 면접 세션(session_id)을 thread_id로 사용
+- memory: BoundedMemorySaver
+  - thread마다 최신 checkpoint 하나만 보관 (이전 checkpoint / channel 값 / pending write는 읽지 않으므로 삭제)
+  - thread 수를 max_threads로 제한하고 (LRU), ttl초 동안 사용하지 않은 thread는 삭제
+  → 긴 면접 / 많은 세션에서도 메모리 사용량이 일정 범위를 넘지 않음
+- postgres: langgraph-checkpoint-postgres의 PostgresSaver (선택 설치, psycopg 3 사용)
+  여러 프로세스가 같은 면접 상태를 공유하거나 재시작 후에도 유지해야 할 때 사용
+- CHECKPOINT_CONFIG["backend"]로 선택 (환경 변수 CHECKPOINT_BACKEND)
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.settings import CHECKPOINT_CONFIG
+
+
+class BoundedMemorySaver(MemorySaver):
+    """thread마다 최신 checkpoint만 보관하고 thread 수 / 유휴 시간을 제한하는 MemorySaver"""
+
+    def __init__(self, max_threads=1000, ttl=3600, **kwargs):
+        """
+        :param max_threads: 보관할 최대 thread(면접 세션) 수, 넘으면 가장 오래 사용하지 않은 thread 삭제
+        :param ttl: 이 시간(초) 동안 사용하지 않은 thread는 삭제
+        """
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.ttl = ttl
+        self._lock = threading.RLock()  # 여러 Streamlit 세션 스레드가 같은 saver를 사용
+        self._last_used = OrderedDict()  # thread_id -> 마지막 사용 시각 (오래된 순)
+        self._evictions = 0
+
+    def _touch(self, thread_id):
+        # thread 사용 시각 갱신 후 개수 / 유휴 시간 제한을 넘은 thread 삭제
+        now = time.monotonic()
+        self._last_used[thread_id] = now
+        self._last_used.move_to_end(thread_id)
+        while self._last_used:
+            oldest, last_used = next(iter(self._last_used.items()))
+            if len(self._last_used) <= self.max_threads and now - last_used <= self.ttl:
+                break
+            self.delete_thread(oldest)
+            self._evictions += 1
+
+    def _prune(self, thread_id, checkpoint_ns, checkpoint):
+        # 최신 checkpoint가 참조하지 않는 이전 checkpoint / channel 값 / pending write 삭제
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        for checkpoint_id in [key for key in checkpoints if key != checkpoint["id"]]:
+            del checkpoints[checkpoint_id]
+            self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+        versions = checkpoint["channel_versions"]
+        for key in [
+            key
+            for key in self.blobs
+            if key[0] == thread_id and key[1] == checkpoint_ns and versions.get(key[2]) != key[3]
+        ]:
+            del self.blobs[key]
+
+    def get_tuple(self, config):
+        with self._lock:
+            thread_id = config["configurable"]["thread_id"]
+            if thread_id in self._last_used:
+                self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def list(self, config, **kwargs):
+        with self._lock:
+            return iter(list(super().list(config, **kwargs)))
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            result = super().put(config, checkpoint, metadata, new_versions)
+            thread_id = config["configurable"]["thread_id"]
+            self._prune(thread_id, config["configurable"]["checkpoint_ns"], checkpoint)
+            self._touch(thread_id)
+            return result
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            super().put_writes(config, writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        with self._lock:
+            self._last_used.pop(thread_id, None)
+            super().delete_thread(thread_id)
+
+    def stats(self):
+        """보관 중인 thread / checkpoint / channel 값 / pending write 수와 삭제한 thread 수"""
+        with self._lock:
+            return {
+                "threads": len(self._last_used),
+                "checkpoints": sum(
+                    len(checkpoints)
+                    for namespaces in self.storage.values()
+                    for checkpoints in namespaces.values()
+                ),
+                "blobs": len(self.blobs),
+                "writes": sum(len(writes) for writes in self.writes.values()),
+                "evictions": self._evictions,
+            }
+
+
+def _postgres_saver(db_config, pool_size):
+    # langgraph-checkpoint-postgres는 psycopg 3을 사용하므로 별도 연결 풀 생성 (선택 설치)
+    from langgraph.checkpoint.postgres import PostgresSaver
+    from psycopg.rows import dict_row
+    from psycopg_pool import ConnectionPool
+
+    kwargs = dict(db_config)
+    kwargs["dbname"] = kwargs.pop("database")
+    pool = ConnectionPool(
+        kwargs=dict(kwargs, autocommit=True, prepare_threshold=0, row_factory=dict_row),
+        max_size=pool_size,
+        open=True,
+    )
+    saver = PostgresSaver(pool)
+    saver.setup()  # checkpoint 테이블 생성 / 마이그레이션
+    return saver
+
+
+def create_checkpointer(backend=None):
+    """설정(CHECKPOINT_CONFIG)에 맞는 checkpoint 저장소 생성"""
+    backend = backend or CHECKPOINT_CONFIG["backend"]
+    if backend == "memory":
+        return BoundedMemorySaver(
+            max_threads=CHECKPOINT_CONFIG["max_threads"], ttl=CHECKPOINT_CONFIG["ttl"]
+        )
+    if backend == "postgres":
+        from backend.config import DB_CONFIG
+
+        return _postgres_saver(DB_CONFIG, CHECKPOINT_CONFIG["pool_size"])
+    raise ValueError(f"Unknown checkpoint backend: {backend}")
@@ -1,45 +1,84 @@
+"""
+프로젝트 설정 (secrets.toml) 및 외부 서비스 리소스
+
+- secrets.toml 값(DB_CONFIG, PINECONE_CONFIG 등)은 처음 사용할 때 읽음 (import만으로는 secrets 불필요)
+- OpenAI Embeddings / Pinecone client / index / vector store / retriever는 처음 사용할 때 한 번 만들고
+  st.cache_resource로 프로세스 전체(모든 세션)에서 공유 (Pinecone 인덱스 존재 확인도 한 번만 수행)
+- 무거운 SDK(langchain_core, langchain_openai, pinecone, langchain_pinecone)도 처음 사용할 때 import
+- 이전 이름(embeddings, pc, index, vectorstore, retriever)은 모듈 속성으로 계속 제공
+
+import 시간 측정: python -m benchmarks.import_profile
+"""
+
+import functools
 import streamlit as st
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
-from langchain_core.prompts import PromptTemplate
-# from pinecone import Pinecone, ServerlessSpec
-import pinecone
-from langchain_pinecone import PineconeVectorStore
-# Neon PostgreSQL 연결 정보
-DB_CONFIG = {
-    "host": st.secrets['postgres']['POSTGRES_HOST'],
-    "database": st.secrets['postgres']['POSTGRES_DB'],
-    "user": st.secrets['postgres']['POSTGRES_USER'],
-    "password": st.secrets['postgres']['POSTGRES_PASSWORD'],
-    "port": st.secrets['postgres']['POSTGRES_PORT']
-}
+# 채팅 메시지 journal / identity 캐시 설정 (secrets 없이 쓰는 설정은 backend/settings.py)
+from backend.settings import MESSAGE_JOURNAL_CONFIG, IDENTITY_CACHE_CONFIG  # noqa: F401
+from backend.settings import LOCAL_INDEX_CONFIG, RETRIEVAL_BACKEND
 
-PINECONE_CONFIG = {
-    "api_key": st.secrets['pinecone']['PINECONE_API_KEY'],
-    "environment": st.secrets['pinecone']['PINECONE_ENV'],
-    "index_name": st.secrets['pinecone']['PINECONE_INDEX_NAME']
-}
+
+# Neon PostgreSQL 연결 정보
+@functools.cache
+def _db_config():
+    return {
+        "host": st.secrets['postgres']['POSTGRES_HOST'],
+        "database": st.secrets['postgres']['POSTGRES_DB'],
+        "user": st.secrets['postgres']['POSTGRES_USER'],
+        "password": st.secrets['postgres']['POSTGRES_PASSWORD'],
+        "port": st.secrets['postgres']['POSTGRES_PORT']
+    }
+
+# DB Connection Pool 설정 (secrets.toml의 [postgres] 섹션에서 조정 가능)
+@functools.cache
+def _db_pool_config():
+    return {
+        "minconn": int(st.secrets['postgres'].get('POOL_MIN_CONN', 1)),
+        "maxconn": int(st.secrets['postgres'].get('POOL_MAX_CONN', 10)),
+        "timeout": float(st.secrets['postgres'].get('POOL_TIMEOUT', 10)),
+        "max_idle": float(st.secrets['postgres'].get('POOL_MAX_IDLE', 300)),
+    }
+
+# 주요 쿼리 prepared statement 사용 여부 (PgBouncer transaction 모드 등에서는 false)
+@functools.cache
+def _db_prepared_statements():
+    return str(st.secrets['postgres'].get('PREPARED_STATEMENTS', 'true')).lower() == 'true'
+
+# 이 시간(초)보다 오래 걸린 DB 함수 호출은 slow query log에 기록
+@functools.cache
+def _db_slow_query_threshold():
+    return float(st.secrets['postgres'].get('SLOW_QUERY_MS', 200)) / 1000
+
+# Pinecone 연결 정보
+@functools.cache
+def _pinecone_config():
+    return {
+        "api_key": st.secrets['pinecone']['PINECONE_API_KEY'],
+        "environment": st.secrets['pinecone']['PINECONE_ENV'],
+        "index_name": st.secrets['pinecone']['PINECONE_INDEX_NAME']
+    }
 
 # openai 기본 모델 설정
 DEFAULT_MODEL = "gpt-4o-mini"
 
-# OpenAI API 클라이언트 설정
-def get_openai_client():
-    return ChatOpenAI(model= DEFAULT_MODEL, temperature=0.9, api_key=st.secrets['openai']["OPENAI_API_KEY"],max_completion_tokens=1500)
+# OpenAI API 클라이언트 설정 (공용 연결 풀 사용, 같은 설정의 ChatOpenAI는 하나만 생성, backend/llm_clients.py)
+def get_openai_client(**params):
+    """ChatOpenAI (params로 기본값 변경, 호출 단위 변경은 get_openai_client().bind(temperature=...))"""
+    from backend.llm_clients import get_chat_model
+
+    # stream_usage: 스트리밍 응답에도 토큰 수(usage_metadata) 포함 (backend/llm_metrics.py)
+    params = {"temperature": 0.9, "max_completion_tokens": 1500, "stream_usage": True, **params}
+    return get_chat_model(DEFAULT_MODEL, st.secrets['openai']["OPENAI_API_KEY"], **params)
 
 def get_openai_key():
     return st.secrets['openai']["OPENAI_API_KEY"]
 
-# 면접 질문 생성 프롬프트
-QUESTION_PROMPT = PromptTemplate(
-    template="""주어진 문서를 기반으로 파이썬 면접 질문을 하나만 생성해 주세요. 
+# 면접 질문 생성 프롬프트 (PromptTemplate은 처음 사용할 때 생성, langchain_core import 지연)
+QUESTION_TEMPLATE = """주어진 문서를 기반으로 파이썬 면접 질문을 하나만 생성해 주세요. 
     문서 내용: {context}
-    면접 질문:""",
-    input_variables=["context"]
-)
+    면접 질문:"""
 
 # 면접 챗봇 평가 프롬프트
-EVALUATION_PROMPT = PromptTemplate(
-    template="""
+EVALUATION_TEMPLATE = """
     너는 파이썬 면접관 챗봇이야. 
     지원자가 답변을 입력하면 아래의 문서를 참조해서 평가 및 모범답안을 제시해줘
     
@@ -49,47 +88,118 @@ EVALUATION_PROMPT = PromptTemplate(
     질문: {question}
     답변: {answer}
     평가:
-    """,
-    input_variables=["question", "answer", "context"]
-)
+    """
+
+@functools.cache
+def _question_prompt():
+    from langchain_core.prompts import PromptTemplate
+
+    return PromptTemplate(template=QUESTION_TEMPLATE, input_variables=["context"])
+
+@functools.cache
+def _evaluation_prompt():
+    from langchain_core.prompts import PromptTemplate
+
+    return PromptTemplate(
+        template=EVALUATION_TEMPLATE, input_variables=["question", "answer", "context"]
+    )
 
 # RAG 설정
 VECTOR_STORE_PATH = "my_vector_store"
 
-# Embedding 설정
+# Embedding 설정 (같은 텍스트의 임베딩은 영구 캐시에서 반환, backend/embedding_cache.py)
+@st.cache_resource(show_spinner=False)
+def get_embeddings():
+    """OpenAI Embeddings (프로세스 전체에서 하나만 생성)"""
+    from langchain_openai import OpenAIEmbeddings
+    from backend.embedding_cache import CachedEmbeddings
 
-embeddings = OpenAIEmbeddings(api_key=get_openai_key())
+    from backend.llm_clients import get_http_client
 
-PINECONE_API_KEY = PINECONE_CONFIG["api_key"]
-PINECONE_ENV = PINECONE_CONFIG["environment"]
-INDEX_NAME = PINECONE_CONFIG["index_name"]
+    return CachedEmbeddings(
+        embeddings=OpenAIEmbeddings(api_key=get_openai_key(), http_client=get_http_client())
+    )
 
-pc = pinecone.Pinecone(api_key=PINECONE_API_KEY)
+# Pinecone 클라이언트
+@st.cache_resource(show_spinner=False)
+def get_pinecone_client():
+    """Pinecone 클라이언트 (프로세스 전체에서 하나만 생성)"""
+    import pinecone
 
-# # Now do stuff
-# if index_name not in pc.list_indexes().names():
-#     pc.create_index(
-#         name=index_name,
-#         dimension=1536,
-#         metric='cosine',
-#         spec=ServerlessSpec(
-#             cloud='aws',
-#             region='us-east-1'
-#         )
-#     )
+    return pinecone.Pinecone(api_key=_pinecone_config()["api_key"])
 
-# index 객체 생성
-if INDEX_NAME not in pc.list_indexes().names():
-    raise ValueError(f"Pinecone 인덱스 '{INDEX_NAME}'가 존재하지 않습니다. 먼저 생성해 주세요.")
+# index 객체 생성 (인덱스 존재 확인은 처음 한 번만 수행)
+@st.cache_resource(show_spinner=False)
+def get_index():
+    """Pinecone index 객체 (인덱스가 없으면 ValueError, 실패한 결과는 캐시되지 않음)"""
+    pc = get_pinecone_client()
+    index_name = _pinecone_config()["index_name"]
+    if index_name not in pc.list_indexes().names():
+        raise ValueError(f"Pinecone 인덱스 '{index_name}'가 존재하지 않습니다. 먼저 생성해 주세요.")
+    return pc.Index(index_name)
 
-index = pc.Index(INDEX_NAME)
+# gRPC index 객체 (RETRIEVAL_BACKEND=grpc, 채널 하나를 프로세스 전체에서 재사용)
+@st.cache_resource(show_spinner=False)
+def get_grpc_index():
+    """Pinecone gRPC index 객체 (pinecone_db.PineconeWrapper와 같은 클라이언트)"""
+    from pinecone.grpc import PineconeGRPC
 
-# Vector Store 생성 (LangChain용)
-vectorstore = PineconeVectorStore(index, embeddings,namespace="example-namespace")
-print(type(vectorstore))  # <class 'langchain_pinecone.vectorstores.Pinecone'>
+    return PineconeGRPC(api_key=_pinecone_config()["api_key"]).Index(_pinecone_config()["index_name"])
+
+# Pinecone namespace (질문 생성용 문서)
+PINECONE_NAMESPACE = "example-namespace"
 
-# retriever로 변환
-retriever = vectorstore.as_retriever(search_type = "mmr",search_kwargs={"k": 5, "fetch_k": 20, "lambda_mult": 0.7})
+# Vector Store 생성 (LangChain용)
+@st.cache_resource(show_spinner=False)
+def get_vectorstore():
+    """Pinecone vector store"""
+    from langchain_pinecone import PineconeVectorStore
+
+    return PineconeVectorStore(get_index(), get_embeddings(), namespace=PINECONE_NAMESPACE)
+
+# 로컬 벡터 인덱스 (RETRIEVAL_BACKEND=local, `python -m backend.local_index snapshot`으로 생성)
+@st.cache_resource(show_spinner=False)
+def get_local_index():
+    """파일에서 읽은 LocalVectorIndex (프로세스 전체에서 하나만 로드)"""
+    from backend.local_index import LocalVectorIndex
+
+    return LocalVectorIndex.load(LOCAL_INDEX_CONFIG["path"])
+
+# retriever로 변환 (같은 검색 결과는 프로세스 공용 캐시에서 반환, backend/retrieval_cache.py)
+@st.cache_resource(show_spinner=False)
+def get_retriever():
+    """질문 생성 / 평가에 사용할 MMR retriever (RETRIEVAL_BACKEND에 따라 Pinecone REST / gRPC 또는 로컬 인덱스)"""
+    from backend.retrieval_cache import CachedRetriever
+
+    search_type = "mmr"
+    search_kwargs = {"k": 5, "fetch_k": 20, "lambda_mult": 0.7}
+    if RETRIEVAL_BACKEND == "local":
+        from backend.local_index import LocalRetriever
+
+        retriever = LocalRetriever(
+            index=get_local_index(),
+            embeddings=get_embeddings(),
+            search_type=search_type,
+            search_kwargs=search_kwargs,
+        )
+    elif RETRIEVAL_BACKEND == "grpc":
+        from backend.pinecone_retriever import PineconeRetriever
+
+        retriever = PineconeRetriever(
+            index=get_grpc_index(),
+            embeddings=get_embeddings(),
+            namespace=PINECONE_NAMESPACE,
+            search_type=search_type,
+            search_kwargs=search_kwargs,
+        )
+    else:
+        retriever = get_vectorstore().as_retriever(search_type=search_type, search_kwargs=search_kwargs)
+    return CachedRetriever(
+        retriever=retriever,
+        namespace=f"{RETRIEVAL_BACKEND}:{PINECONE_NAMESPACE}",
+        search_type=search_type,
+        search_kwargs=search_kwargs,
+    )
 
 QUERY="파이썬 면접 질문 하나 생성해"
 
@@ -106,3 +216,33 @@ USER_AVATAR = 'https://github.com/user-attachments/assets/f77abd1d-5c80-49c2-822
 # retriever = vector_store.as_retriever()
 
 
+# secrets 값 / 프롬프트 / 리소스는 처음 접근할 때 만들어 반환 (PEP 562 모듈 __getattr__)
+_LAZY_SETTINGS = {
+    "DB_CONFIG": _db_config,
+    "DB_POOL_CONFIG": _db_pool_config,
+    "DB_PREPARED_STATEMENTS": _db_prepared_statements,
+    "DB_SLOW_QUERY_THRESHOLD": _db_slow_query_threshold,
+    "PINECONE_CONFIG": _pinecone_config,
+    "PINECONE_API_KEY": lambda: _pinecone_config()["api_key"],
+    "PINECONE_ENV": lambda: _pinecone_config()["environment"],
+    "INDEX_NAME": lambda: _pinecone_config()["index_name"],
+    "QUESTION_PROMPT": _question_prompt,
+    "EVALUATION_PROMPT": _evaluation_prompt,
+}
+_LAZY_RESOURCES = {
+    "embeddings": get_embeddings,
+    "pc": get_pinecone_client,
+    "index": get_index,
+    "vectorstore": get_vectorstore,
+    "retriever": get_retriever,
+    "local_index": get_local_index,
+    "grpc_index": get_grpc_index,
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_SETTINGS:
+        return _LAZY_SETTINGS[name]()  # functools.cache로 한 번만 생성
+    if name in _LAZY_RESOURCES:
+        return _LAZY_RESOURCES[name]()  # st.cache_resource가 프로세스 전체에서 공유
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
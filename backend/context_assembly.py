@@ -0,0 +1,133 @@
+"""
+프롬프트 문맥(context) 조립 / 토큰 예산
+
+- 대상 모델의 tokenizer(tiktoken)로 토큰 수를 세어, 검색한 문맥을 CONTEXT_BUDGET_CONFIG의 토큰 예산 안으로 맞춤
+  → 검색된 chunk 크기와 관계없이 프롬프트 토큰 수(응답 지연 / 비용)의 상한이 정해짐
+- 압축: 연속 공백을 하나로 줄이고, 빈 줄 / 이미 나온 줄(머리글, 반복 문구 등)은 제거
+- 자르기: 문장 단위로 예산까지 남기고, 첫 문장도 넘치면 토큰 단위로 자름
+- 병합: 첫 chunk(선택한 문맥) 뒤에 예산이 남으면 작은 chunk를 이어 붙임 (넘치는 chunk는 건너뜀)
+- tiktoken encoding 파일을 받을 수 없으면 (오프라인 등) UTF-8 바이트 수 / 3으로 근사
+  (영어 / 한국어 모두 실제 토큰 수보다 약간 크게 세므로 예산을 넘지 않음), TIKTOKEN_CACHE_DIR로 미리 받은 파일 사용 가능
+"""
+
+import functools
+import math
+import re
+
+_SENTENCE_END = re.compile(r"(?<=[.!?。])\s+|\n+")
+
+
+class TokenCounter:
+    def __init__(self, model):
+        """
+        :param model: 대상 모델 이름 (tiktoken encoding 선택, 모르는 모델이면 o200k_base)
+        """
+        self.model = model
+        self.encoding = None
+        try:
+            import tiktoken
+
+            try:
+                self.encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            print(f"Error loading tokenizer for {model}, using approximate token counts: {e}")
+
+    @property
+    def exact(self):
+        """tiktoken으로 정확히 세는지 여부 (False면 근사)"""
+        return self.encoding is not None
+
+    def count(self, text):
+        """text의 토큰 수"""
+        if not text:
+            return 0
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return math.ceil(len(text.encode("utf-8")) / 3)
+
+    def truncate(self, text, max_tokens):
+        """text의 앞에서부터 max_tokens 토큰까지만 반환"""
+        if max_tokens <= 0:
+            return ""
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            # 멀티바이트 문자 중간에서 잘리면 생기는 대체 문자(�) 제거
+            return self.encoding.decode(tokens[:max_tokens]).rstrip("�")
+        # 근사: 예산 안에 들어가는 가장 긴 앞부분을 이진 탐색
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= max_tokens:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+
+@functools.cache
+def get_counter(model):
+    """모델마다 하나만 만드는 TokenCounter (tokenizer 로딩은 한 번만)"""
+    return TokenCounter(model)
+
+
+def compress(text):
+    """연속 공백을 하나로 줄이고 빈 줄 / 이미 나온 줄 제거"""
+    lines = []
+    seen = set()
+    for line in str(text).splitlines():
+        line = " ".join(line.split())
+        if line and line not in seen:
+            seen.add(line)
+            lines.append(line)
+    return "\n".join(lines)
+
+
+def trim(text, budget, counter):
+    """문장 단위로 budget 토큰까지 남김 (첫 문장도 넘치면 토큰 단위로 자름)"""
+    if counter.count(text) <= budget:
+        return text
+    kept = []
+    used = 0
+    for sentence in _SENTENCE_END.split(text):
+        tokens = counter.count(sentence) + (1 if kept else 0)  # 문장 사이 구분자 1토큰
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    if not kept:
+        return counter.truncate(text, budget).rstrip()
+    return " ".join(kept)
+
+
+def assemble_context(chunks, budget, counter, merge=True, min_chunk_tokens=50, separator="\n\n"):
+    """
+    chunk들을 압축하여 budget 토큰 안의 문맥 하나로 조립하고 (문맥, 포함한 원본 chunk 리스트) 반환
+    :param chunks: 문맥 후보 (첫 chunk는 넘치면 잘라서라도 항상 포함)
+    :param budget: 최대 토큰 수
+    :param counter: TokenCounter (get_counter(모델))
+    :param merge: 남은 예산에 다음 chunk들을 이어 붙일지 여부
+    :param min_chunk_tokens: 남은 예산이 이보다 작으면 병합 중단
+    """
+    parts = []
+    included = []
+    remaining = budget
+    separator_tokens = counter.count(separator)
+    for chunk in chunks:
+        text = compress(chunk)
+        if not text or text in parts:
+            continue
+        if not parts:
+            text = trim(text, budget, counter)
+            tokens = counter.count(text)
+        else:
+            tokens = counter.count(text) + separator_tokens
+            if tokens > remaining:
+                continue  # 넘치는 chunk는 자르지 않고 건너뛰어 더 작은 chunk를 찾음
+        parts.append(text)
+        included.append(chunk)
+        remaining -= tokens
+        if not merge or remaining < min_chunk_tokens:
+            break
+    return separator.join(parts), included
@@ -1,243 +1,295 @@
-from psycopg2.extras import RealDictCursor
-from psycopg2 import pool
-import streamlit as st
-from backend.config import DB_CONFIG  # `config.py`에서 DB 설정 가져오기
-
-# Connection Pool 생성 (최소 1개, 최대 5개)
-try:
-    connection_pool = pool.SimpleConnectionPool(
-        minconn=1,
-        maxconn=5,
-        dbname=DB_CONFIG["database"],
-        user=DB_CONFIG["user"],
-        password=DB_CONFIG["password"],
-        host=DB_CONFIG["host"],
-        port=DB_CONFIG["port"],
-        sslmode=st.secrets["postgres"].get("SSL_MODE", "require"),  # 기본값 'require'
-    )
-    if connection_pool:
-        print("Database connection pool created successfully.")
-except Exception as e:
-    print(f"Database connection pool creation failed: {e}")
+from backend import metrics, queries
+from backend.cache import TTLCache
+from backend.message_journal import MessageJournal, register_shutdown
+from backend.metrics import instrument
+from backend.pool import PoolTimeoutError
+from backend.settings import MESSAGE_JOURNAL_CONFIG, IDENTITY_CACHE_CONFIG
+from backend.storage import DataError, IntegrityError, get_backend
 
+# 페이지 조회 / 스트리밍 조회 기본 크기
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_CHUNK_SIZE = 500
 
-# PostgreSQL 연결 함수 (연결 풀에서 가져오기)
-def get_connection():
-    try:
-        return connection_pool.getconn()
-    except Exception as e:
-        print(f"Error getting connection from pool: {e}")
-        return None
+# SQL 실행은 DB_BACKEND 설정으로 선택한 저장소가 담당 (backend/storage/)
+# postgres 저장소는 처음 사용할 때 secrets.toml 설정으로 Connection Pool을 만듦
+
+
+# DB-API 연결 대여 (대기 시간 초과 시 PoolTimeoutError)
+def get_connection(timeout=None):
+    return get_backend().getconn(timeout)
 
 
 # 연결 반환 함수
-def release_connection(conn):
+def release_connection(conn, discard=False):
     if conn:
-        connection_pool.putconn(conn)
+        get_backend().putconn(conn, discard=discard)
+
+
+# with 문용 연결 대여 (사용 후 자동 반환)
+def db_connection(timeout=None):
+    return get_backend().connection(timeout)
+
+
+# Connection Pool 지표 조회
+def pool_stats():
+    """대여 중인 연결 수, 대기 시간, 고갈 횟수 등 저장소 연결 지표 반환"""
+    return get_backend().stats()
+
+
+# 쿼리별 실행 지표 조회
+def query_stats():
+    """등록된 쿼리별 실행 횟수, PREPARE 횟수, 실행 시간 반환"""
+    return queries.stats()
+
+
+# DB 함수별 계측 지표 조회
+def db_metrics(format="json"):
+    """함수별 소요 시간 / 풀 대기 / 실행 시간 / 행 수 histogram을 JSON 또는 Prometheus text로 반환"""
+    if format == "prometheus":
+        return metrics.to_prometheus()
+    return metrics.to_json()
 
 
 # 새로운 채팅 세션 생성
+@instrument("create_chat_session")
 def create_chat_session(user_id):
     """새로운 채팅 세션을 생성하고, 세션 ID를 반환"""
-    conn = get_connection()
-    session_id = None
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO chat_sessions (user_id) VALUES (%s) RETURNING id;",
-                    (user_id,),
-                )
-                session_id = cur.fetchone()[0]
-                conn.commit()
-        except Exception as e:
-            print(f"Error creating chat session: {e}")
-        finally:
-            release_connection(conn)
-    return session_id
+    try:
+        rows = get_backend().query("create_chat_session", (user_id,), commit=True)
+        return rows[0]["id"]
+    except PoolTimeoutError:
+        raise  # 풀 고갈은 호출부에서 처리
+    except Exception as e:
+        print(f"Error creating chat session: {e}")
+    return None
+
+
+# journal이 모은 메시지를 한 번에 저장 (백그라운드 스레드에서 호출, 실패 시 예외 전달)
+# chat_messages 테이블에 UNIQUE 제약이 있는 message_uid(UUID) 컬럼 필요
+@instrument("write_chat_messages")
+def _write_chat_messages(rows):
+    """메시지 여러 개를 한 번에 저장 (이미 저장된 message_uid는 무시)"""
+    get_backend().write_messages(rows)
+
+
+# 채팅 메시지 write-behind journal (프로세스 종료 시 남은 메시지 저장)
+# 제약 조건 위반 / 잘못된 값은 spool하지 않고 해당 행만 dead-letter 파일로 옮김
+message_journal = register_shutdown(
+    MessageJournal(
+        _write_chat_messages, row_errors=(IntegrityError, DataError), **MESSAGE_JOURNAL_CONFIG
+    )
+)
 
 
 # 챗봇과의 대화 메시지 삽입
+@instrument("insert_chat_message")
 def insert_chat_message(session_id, sender, message):
-    """사용자 또는 챗봇이 보낸 메시지를 저장"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO chat_messages (session_id, sender, message) 
-                    VALUES (%s, %s, %s);
-                """,
-                    (session_id, sender, message),
-                )
-                conn.commit()
-        except Exception as e:
-            print(f"Error inserting chat message: {e}")
-        finally:
-            release_connection(conn)
+    """사용자 또는 챗봇이 보낸 메시지를 journal에 넣고 message_uid 반환 (DB 저장은 백그라운드)"""
+    if session_id is None:
+        raise ValueError("session_id is required to store a chat message.")
+    return message_journal.append(session_id, sender, message)
+
+
+# 등록된 조회 쿼리 실행 공통 처리 (dict 리스트 반환)
+def _fetch_all(name, params, error_message):
+    try:
+        return get_backend().query(name, params)
+    except PoolTimeoutError:
+        raise  # 풀 고갈은 호출부에서 처리
+    except Exception as e:
+        print(f"{error_message}: {e}")
+    return []
+
+
+# 결과 행이 없는 쿼리 실행 공통 처리 (삭제 등)
+def _execute(name, params, error_message):
+    try:
+        get_backend().execute(name, params)
+        return True
+    except PoolTimeoutError:
+        raise  # 풀 고갈은 호출부에서 처리
+    except Exception as e:
+        print(f"{error_message}: {e}")
+    return False
 
 
 # 특정 세션의 대화 내역 가져오기
+@instrument("get_chat_history")
 def get_chat_history(session_id):
     """특정 채팅 세션의 대화 내역을 시간순으로 조회"""
-    conn = get_connection()
-    chat_history = []
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT sender, message, timestamp 
-                    FROM chat_messages 
-                    WHERE session_id = %s 
-                    ORDER BY timestamp ASC;
-                """,
-                    (session_id,),
-                )
-                chat_history = cur.fetchall()
-        except Exception as e:
-            print(f"Error fetching chat history: {e}")
-        finally:
-            release_connection(conn)
-    return chat_history
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    return _fetch_all(
+        "get_chat_history", (session_id,), "Error fetching chat history"
+    )
 
 
 # 사용자별 전체 채팅 세션 목록 가져오기
+@instrument("get_user_chat_sessions")
 def get_user_chat_sessions(user_id):
     """사용자가 가진 모든 채팅 세션을 최신순으로 조회"""
-    conn = get_connection()
-    sessions = []
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT id, created_at 
-                    FROM chat_sessions 
-                    WHERE user_id = %s 
-                    ORDER BY created_at DESC;
-                """,
-                    (user_id,),
-                )
-                sessions = cur.fetchall()
-        except Exception as e:
-            print(f"Error fetching chat sessions: {e}")
-        finally:
-            release_connection(conn)
-    return sessions
+    return _fetch_all(
+        "get_user_chat_sessions", (user_id,), "Error fetching chat sessions"
+    )
+
+
+# 사용자가 이전 면접에서 받은 질문 가져오기 (질문 중복 제거용)
+@instrument("get_user_questions")
+def get_user_questions(user_id, limit=100):
+    """사용자가 받은 면접 질문을 최신순으로 최대 limit개 조회"""
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    rows = _fetch_all("get_user_questions", (user_id, limit), "Error fetching user questions")
+    return [row["message"] for row in rows]
 
 
 # 전체 사용자 대화 기록 조회
+@instrument("get_all_chat_sessions")
 def get_all_chat_sessions():
     """모든 사용자 채팅 세션 목록을 최신순으로 조회"""
-    conn = get_connection()
-    sessions = []
-    if conn:
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    """
-                    SELECT cs.id, u.username, cs.created_at 
-                    FROM chat_sessions cs
-                    JOIN users u ON cs.user_id = u.id
-                    ORDER BY cs.created_at DESC;
-                """
-                )
-                sessions = cur.fetchall()
-        except Exception as e:
-            print(f"Error fetching all chat sessions: {e}")
-        finally:
-            release_connection(conn)
-    return sessions
+    return _fetch_all("get_all_chat_sessions", (), "Error fetching all chat sessions")
+
+
+# keyset 페이지 조회 공통 처리 (limit + 1개를 가져와 다음 페이지 존재 여부 판단)
+def _fetch_page(name, params, limit, cursor_keys):
+    rows = _fetch_all(name, (*params, limit + 1), "Error fetching page")
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, tuple(rows[-1][key] for key in cursor_keys)
+
+
+# 특정 세션의 대화 내역을 페이지 단위로 가져오기
+@instrument("get_chat_history_page")
+def get_chat_history_page(session_id, limit=DEFAULT_PAGE_SIZE, after=None):
+    """
+    특정 채팅 세션의 대화 내역을 (timestamp, id) 기준 시간순으로 limit개씩 조회
+    :param after: 이전 페이지의 next_cursor (첫 페이지는 None)
+    :return: (메시지 리스트, next_cursor) - 마지막 페이지면 next_cursor는 None
+    """
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    if after is None:
+        return _fetch_page(
+            "get_chat_history_page", (session_id,), limit, ("timestamp", "id")
+        )
+    return _fetch_page(
+        "get_chat_history_page_after", (session_id, *after), limit, ("timestamp", "id")
+    )
+
+
+# 사용자별 채팅 세션 목록을 페이지 단위로 가져오기
+@instrument("get_user_chat_sessions_page")
+def get_user_chat_sessions_page(user_id, limit=DEFAULT_PAGE_SIZE, before=None):
+    """
+    사용자의 채팅 세션을 (created_at, id) 기준 최신순으로 limit개씩 조회
+    :param before: 이전 페이지의 next_cursor (첫 페이지는 None)
+    :return: (세션 리스트, next_cursor) - 마지막 페이지면 next_cursor는 None
+    """
+    if before is None:
+        return _fetch_page(
+            "get_user_chat_sessions_page", (user_id,), limit, ("created_at", "id")
+        )
+    return _fetch_page(
+        "get_user_chat_sessions_page_before",
+        (user_id, *before),
+        limit,
+        ("created_at", "id"),
+    )
+
+
+# 전체 사용자 채팅 세션 목록을 페이지 단위로 가져오기
+@instrument("get_all_chat_sessions_page")
+def get_all_chat_sessions_page(limit=DEFAULT_PAGE_SIZE, before=None):
+    """
+    모든 사용자 채팅 세션을 (created_at, id) 기준 최신순으로 limit개씩 조회
+    :param before: 이전 페이지의 next_cursor (첫 페이지는 None)
+    :return: (세션 리스트, next_cursor) - 마지막 페이지면 next_cursor는 None
+    """
+    if before is None:
+        return _fetch_page("get_all_chat_sessions_page", (), limit, ("created_at", "id"))
+    return _fetch_page(
+        "get_all_chat_sessions_page_before", tuple(before), limit, ("created_at", "id")
+    )
+
+
+# 서버 쪽 cursor로 결과를 chunk 단위 스트리밍
+def _stream_chunks(name, params, chunk_size):
+    """
+    결과 전체를 메모리에 올리지 않고 chunk_size개씩 나눠 반환하는 generator
+    (generator를 끝까지 소비하거나 close할 때까지 연결 하나를 점유)
+    """
+    return get_backend().stream(name, params, chunk_size)
+
+
+# 특정 세션의 대화 내역 스트리밍
+@instrument("iter_chat_history")
+def iter_chat_history(session_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """특정 채팅 세션의 대화 내역을 시간순으로 chunk_size개씩 반환"""
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    yield from _stream_chunks("get_chat_history", (session_id,), chunk_size)
+
+
+# 사용자별 채팅 세션 스트리밍
+@instrument("iter_user_chat_sessions")
+def iter_user_chat_sessions(user_id, chunk_size=DEFAULT_CHUNK_SIZE):
+    """사용자의 채팅 세션을 최신순으로 chunk_size개씩 반환"""
+    yield from _stream_chunks("get_user_chat_sessions", (user_id,), chunk_size)
+
+
+# 전체 사용자 채팅 세션 스트리밍
+@instrument("iter_all_chat_sessions")
+def iter_all_chat_sessions(chunk_size=DEFAULT_CHUNK_SIZE):
+    """모든 사용자 채팅 세션을 최신순으로 chunk_size개씩 반환"""
+    yield from _stream_chunks("get_all_chat_sessions", (), chunk_size)
 
 
 # 특정 채팅 세션의 대화 메시지 삭제
+@instrument("delete_chat_messages")
 def delete_chat_messages(session_id):
     """특정 채팅 세션의 모든 메시지를 삭제"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute(
-                    "DELETE FROM chat_messages WHERE session_id = %s;", (session_id,)
-                )
-                conn.commit()
-                print(f"Chat messages for session {session_id} deleted successfully.")
-        except Exception as e:
-            print(f"Error deleting chat messages: {e}")
-        finally:
-            release_connection(conn)
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    if _execute("delete_chat_messages", (session_id,), "Error deleting chat messages"):
+        print(f"Chat messages for session {session_id} deleted successfully.")
 
 
 # 특정 채팅 세션과 모든 대화 내역 삭제
+@instrument("delete_chat_session")
 def delete_chat_session(session_id):
-    """특정 채팅 세션의 메시지와 세션 정보를 삭제"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                # 1. 먼저 해당 세션의 메시지 삭제
-                cur.execute(
-                    "DELETE FROM chat_messages WHERE session_id = %s;", (session_id,)
-                )
-                # 2. 채팅 세션 삭제
-                cur.execute("DELETE FROM chat_sessions WHERE id = %s;", (session_id,))
-                conn.commit()
-                print(
-                    f"Chat session {session_id} and its messages deleted successfully."
-                )
-        except Exception as e:
-            print(f"Error deleting chat session: {e}")
-        finally:
-            release_connection(conn)
+    """특정 채팅 세션의 메시지와 세션 정보를 한 문장으로 삭제"""
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    # 메시지와 세션을 하나의 문장(CTE)으로 삭제
+    if _execute("delete_chat_session", (session_id,), "Error deleting chat session"):
+        print(f"Chat session {session_id} and its messages deleted successfully.")
 
 
 # 특정 사용자의 모든 채팅 세션 및 대화 삭제
+@instrument("delete_all_user_sessions")
 def delete_all_user_sessions(user_id):
-    """특정 사용자의 모든 채팅 세션과 연관된 메시지를 삭제"""
-    conn = get_connection()
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                # 1. 사용자의 모든 세션 ID 조회
-                cur.execute(
-                    "SELECT id FROM chat_sessions WHERE user_id = %s;", (user_id,)
-                )
-                sessions = cur.fetchall()
-
-                # 2. 각 세션의 메시지 삭제
-                for session in sessions:
-                    cur.execute(
-                        "DELETE FROM chat_messages WHERE session_id = %s;",
-                        (session[0],),
-                    )
-
-                # 3. 사용자의 모든 세션 삭제
-                cur.execute("DELETE FROM chat_sessions WHERE user_id = %s;", (user_id,))
-                conn.commit()
-                print(
-                    f"All chat sessions and messages for user {user_id} deleted successfully."
-                )
-        except Exception as e:
-            print(f"Error deleting all user chat sessions: {e}")
-        finally:
-            release_connection(conn)
+    """특정 사용자의 모든 채팅 세션과 연관된 메시지를 한 문장으로 삭제"""
+    message_journal.flush()  # 아직 저장되지 않은 메시지 먼저 반영
+    # 세션 삭제 결과(id)로 메시지를 한 번에 삭제 (세션별 반복 X)
+    if _execute(
+        "delete_all_user_sessions", (user_id,), "Error deleting all user chat sessions"
+    ):
+        print(f"All chat sessions and messages for user {user_id} deleted successfully.")
+
+
+# username -> user_id 캐시 (Streamlit rerun마다 DB 조회하지 않도록 프로세스 전체에서 공유)
+identity_cache = TTLCache(**IDENTITY_CACHE_CONFIG)
 
 
+def identity_cache_stats():
+    """identity 캐시 hit / miss 지표"""
+    return identity_cache.stats()
+
+
+@instrument("get_user_id")
 def get_user_id(username):
-    """사용자의 user_id를 조회"""
-    conn = get_connection()
-    user_id = None
-    if conn:
-        try:
-            with conn.cursor() as cur:
-                cur.execute("SELECT id FROM users WHERE username = %s;", (username,))
-                result = cur.fetchone()
-                if result:
-                    user_id = result[0]  # ID 값 반환
-        except Exception as e:
-            print(f"Error fetching user ID: {e}")
-        finally:
-            release_connection(conn)
+    """사용자의 user_id를 조회 (캐시에 있으면 DB 조회 생략)"""
+    user_id = identity_cache.get(username)
+    if user_id is not None:
+        return user_id
+
+    rows = _fetch_all("get_user_id", (username,), "Error fetching user ID")
+    if rows:
+        user_id = rows[0]["id"]
+        identity_cache.set(username, user_id)  # 존재하는 사용자만 캐시
     return user_id
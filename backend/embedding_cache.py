@@ -0,0 +1,285 @@
+"""
+임베딩 영구 캐시 (content-addressed)
+
+- key = sha256(모델, input_type, 텍스트) → 같은 텍스트를 다시 임베딩하지 않음 (재적재 / 반복 검색어)
+- 벡터는 차원별 memory-mapped float32 파일(vectors-<차원>.f32)의 slot에 저장하고,
+  key -> slot 색인은 같은 디렉터리의 SQLite(WAL) 파일에 저장 → 여러 프로세스가 같은 캐시를 공유
+- 차원별 최대 max_entries개, 가득 차면 가장 오래 사용하지 않은 slot을 재사용 (LRU)
+- 조회(hit)는 읽기만 하고, 사용 시각은 메모리에 모아 두었다가 touch_interval초마다 또는 다음 저장에서
+  한 번에 반영 (hit마다 UPDATE / commit을 하지 않음)
+- slot마다 key digest도 함께 기록하여, 다른 프로세스가 slot을 재사용하는 중에 읽은 벡터는 miss로 처리
+- CachedEmbeddings는 LangChain Embeddings(OpenAIEmbeddings 등)를, embed_cached()는 Pinecone inference.embed를 감쌈
+- hit / miss / eviction 지표를 stats()로 제공
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel, ConfigDict
+
+from backend.settings import EMBEDDING_CACHE_CONFIG
+
+_DIGEST_SIZE = 16  # slot 확인용 key digest 길이 (bytes)
+
+
+def cache_key(model, input_type, text):
+    """(모델, input_type, 텍스트 hash)로 만든 캐시 key"""
+    text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{model}\0{input_type}\0{text_hash}".encode()).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, path, max_entries=50000, timeout=10.0, touch_interval=60.0):
+        """
+        :param path: 캐시 디렉터리 (벡터 파일과 색인 SQLite 파일 저장)
+        :param max_entries: 벡터 차원별 최대 보관 개수 (벡터 파일 크기 = max_entries x 차원 x 4 bytes)
+        :param timeout: 다른 프로세스가 색인을 쓰는 중일 때 기다리는 최대 시간 (초)
+        :param touch_interval: 조회한 key의 사용 시각을 모아서 저장하는 간격 (초)
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self._touched = {}  # key -> 아직 저장하지 않은 마지막 사용 시각
+        self._last_touch_flush = time.monotonic()
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(path, "index.sqlite3"), timeout=timeout, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode = WAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key BLOB PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                slot INTEGER NOT NULL,
+                last_used REAL NOT NULL,
+                UNIQUE (dim, slot)
+            );
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_lru_idx ON embeddings (dim, last_used);")
+        self._conn.commit()
+        self._stores = {}  # 차원 -> (벡터 memmap, key digest memmap)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def _store(self, dim):
+        # 차원별 벡터 / digest 파일을 max_entries 크기로 만들어 memmap (이미 있으면 그대로 사용)
+        if dim not in self._stores:
+            arrays = []
+            for name, dtype, width in (
+                (f"vectors-{dim}.f32", np.float32, dim),
+                (f"keys-{dim}.bin", np.uint8, _DIGEST_SIZE),
+            ):
+                file_path = os.path.join(self.path, name)
+                size = self.max_entries * width * np.dtype(dtype).itemsize
+                fd = os.open(file_path, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    if os.fstat(fd).st_size < size:
+                        os.ftruncate(fd, size)  # 다른 프로세스가 만든 파일은 자르지 않음 (sparse file)
+                finally:
+                    os.close(fd)
+                arrays.append(
+                    np.memmap(file_path, dtype=dtype, mode="r+", shape=(self.max_entries, width))
+                )
+            self._stores[dim] = tuple(arrays)
+        return self._stores[dim]
+
+    def get_many(self, model, input_type, texts):
+        """텍스트별 캐시된 벡터(np.ndarray) 리스트 반환 (없으면 None)"""
+        keys = [cache_key(model, input_type, text) for text in texts]
+        results = [None] * len(texts)
+        with self._lock:
+            rows = {}
+            for start in range(0, len(keys), 500):  # SQLite 파라미터 수 제한
+                chunk = keys[start:start + 500]
+                rows.update(
+                    (bytes(key), (dim, slot))
+                    for key, dim, slot in self._conn.execute(
+                        f"SELECT key, dim, slot FROM embeddings WHERE key IN ({','.join('?' * len(chunk))});",
+                        chunk,
+                    )
+                )
+            hit_keys = []
+            for i, key in enumerate(keys):
+                if key not in rows:
+                    continue
+                dim, slot = rows[key]
+                vectors, digests = self._store(dim)
+                # 읽기 전후로 digest를 확인하여 다른 프로세스가 slot을 재사용(덮어쓰기)하는 중이면 miss
+                before = bytes(digests[slot])
+                vector = np.array(vectors[slot])
+                if before == bytes(digests[slot]) == key[:_DIGEST_SIZE]:
+                    results[i] = vector
+                    hit_keys.append(key)
+            if hit_keys:
+                now = time.time()
+                self._touched.update((key, now) for key in hit_keys)
+                if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+                    self._save_touched()
+            self._hits += len(hit_keys)
+            self._misses += len(keys) - len(hit_keys)
+        return results
+
+    def _save_touched(self):
+        # 사용 시각만 저장하는 별도 트랜잭션 (실패하면 다음 저장에서 다시 저장)
+        try:
+            self._conn.execute("BEGIN IMMEDIATE;")
+            self._flush_touched()
+            self._conn.commit()
+            self._touched.clear()
+        except Exception as e:
+            self._conn.rollback()
+            print(f"Error saving embedding cache access times: {e}")
+        self._last_touch_flush = time.monotonic()
+
+    def _flush_touched(self):
+        # 모아 둔 사용 시각을 한 번에 저장 (쓰기 잠금 안에서 호출, commit 후 호출부에서 _touched 비움)
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_used = MAX(last_used, ?) WHERE key = ?;",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+
+    def put_many(self, model, input_type, texts, vectors):
+        """텍스트별 벡터 저장 (가득 차면 가장 오래 사용하지 않은 slot 재사용)"""
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        keys = [cache_key(model, input_type, text) for text in texts]
+        with self._lock:
+            stored_vectors, digests = self._store(dim)
+            now = time.time()
+            try:
+                self._conn.execute("BEGIN IMMEDIATE;")  # 다른 프로세스와 slot 할당이 겹치지 않도록 쓰기 잠금
+                self._flush_touched()  # 재사용할 LRU slot을 고르기 전에 최근 사용 시각 반영
+                for key, vector in zip(keys, vectors):
+                    row = self._conn.execute(
+                        "SELECT slot FROM embeddings WHERE key = ?;", (key,)
+                    ).fetchone()
+                    if row is None:
+                        slot = self._allocate(dim)
+                        self._conn.execute(
+                            "INSERT INTO embeddings (key, dim, slot, last_used) VALUES (?, ?, ?, ?);",
+                            (key, dim, slot, now),
+                        )
+                    else:
+                        slot = row[0]
+                    digests[slot] = 0  # 덮어쓰는 동안 읽는 쪽에서 miss로 처리되도록 먼저 지움
+                    stored_vectors[slot] = vector
+                    digests[slot] = np.frombuffer(key[:_DIGEST_SIZE], dtype=np.uint8)
+                stored_vectors.flush()
+                digests.flush()
+                self._conn.commit()
+                self._touched.clear()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def _allocate(self, dim):
+        # 빈 slot이 있으면 다음 번호, 가득 찼으면 LRU 항목의 slot 재사용 (쓰기 잠금 안에서 호출)
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings WHERE dim = ?;", (dim,)).fetchone()
+        if count < self.max_entries:
+            return count
+        key, slot = self._conn.execute(
+            "SELECT key, slot FROM embeddings WHERE dim = ? ORDER BY last_used LIMIT 1;", (dim,)
+        ).fetchone()
+        self._conn.execute("DELETE FROM embeddings WHERE key = ?;", (key,))
+        self._evictions += 1
+        return slot
+
+    def clear(self):
+        """모든 항목 삭제 (벡터 파일은 다음 저장 때 덮어씀)"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM embeddings;")
+            self._conn.commit()
+
+    def stats(self):
+        """항목 수와 hit / miss / eviction 지표 (hit / miss는 이 프로세스 기준)"""
+        with self._lock:
+            entries = dict(self._conn.execute("SELECT dim, COUNT(*) FROM embeddings GROUP BY dim;"))
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+            }
+
+    def close(self):
+        """모아 둔 사용 시각을 저장하고 색인 연결 닫기"""
+        with self._lock:
+            self._save_touched()
+            self._conn.close()
+            self._stores.clear()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """설정(EMBEDDING_CACHE_CONFIG)으로 만든 프로세스 공용 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(**EMBEDDING_CACHE_CONFIG)
+        return _cache
+
+
+def embed_cached(embed, model, input_type, texts, cache=None):
+    """
+    캐시에 없는 텍스트만 embed(texts) -> 벡터 리스트로 계산하고, 입력 순서대로 벡터(list) 리스트 반환
+    """
+    cache = cache or get_cache()
+    results = cache.get_many(model, input_type, texts)
+    missing = [i for i, vector in enumerate(results) if vector is None]
+    if missing:
+        # 같은 텍스트가 여러 번 있으면 한 번만 계산
+        unique = list(dict.fromkeys(texts[i] for i in missing))
+        computed = dict(zip(unique, embed(unique)))
+        cache.put_many(model, input_type, unique, [computed[text] for text in unique])
+        for i in missing:
+            results[i] = computed[texts[i]]
+    return [list(map(float, vector)) for vector in results]
+
+
+class CachedEmbeddings(BaseModel, Embeddings):
+    """LangChain Embeddings의 결과를 영구 캐시에 저장하는 wrapper (OpenAIEmbeddings 등)"""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    embeddings: Any
+    model: str = ""
+    cache: Any = None
+
+    def _model_name(self):
+        return self.model or getattr(self.embeddings, "model", type(self.embeddings).__name__)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return embed_cached(
+            self.embeddings.embed_documents, self._model_name(), "passage", list(texts), self.cache
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        return embed_cached(
+            lambda texts: [self.embeddings.embed_query(texts[0])],
+            self._model_name(),
+            "query",
+            [text],
+            self.cache,
+        )[0]
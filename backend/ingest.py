@@ -0,0 +1,280 @@
+"""
+참고 문서(docx / txt) 적재 파이프라인
+
+- docx는 zip 안의 word/document.xml을 iterparse로 문단 단위로 읽고, txt는 빈 줄 기준 문단으로 읽음
+  (문서 전체를 메모리에 올리지 않음)
+- 문단을 chunk_size 글자 안팎의 chunk로 묶고, 다음 chunk는 이전 chunk의 끝 chunk_overlap 글자를 포함
+- chunk id = "<출처>#<본문 sha256>" → 본문이 같으면 id도 같으므로 이미 인덱스에 있는 chunk는 건너뜀,
+  문서에서 사라진 chunk는 인덱스에서 삭제 (다시 적재해도 바뀐 부분만 처리)
+- 임베딩은 embed_batch_size개씩 최대 concurrency개 batch를 동시에 요청 (대기 중인 batch 수도 제한)
+- upsert는 개수(upsert_batch_size)와 요청 크기(upsert_max_bytes)를 모두 넘지 않도록 나눠 전송
+- 실패한 batch는 max_retries번 재시도 후 실패로 기록하고 나머지는 계속 진행, 처리량 / 실패를 보고
+
+실행 예시:
+    python -m backend.ingest backend/data/referance.docx
+    python -m backend.ingest notes.txt --dry-run     # 임베딩 / 업로드 없이 chunk 수만 확인
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+from backend import retrieval_cache
+from backend.settings import INGEST_CONFIG
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Pinecone metadata에서 문서 본문을 저장하는 key (langchain_pinecone 기본값)
+TEXT_KEY = "text"
+
+
+def iter_docx_paragraphs(path):
+    """docx 문서의 문단 텍스트를 순서대로 반환 (빈 문단 제외)"""
+    with zipfile.ZipFile(path) as archive, archive.open("word/document.xml") as xml:
+        for _, element in ElementTree.iterparse(xml, events=("end",)):
+            if element.tag != f"{_W}p":
+                continue
+            text = "".join(node.text or "" for node in element.iter(f"{_W}t")).strip()
+            element.clear()  # 처리한 문단은 메모리에서 해제
+            if text:
+                yield text
+
+
+def iter_text_paragraphs(path):
+    """텍스트 파일을 빈 줄 기준 문단으로 나눠 반환"""
+    lines = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                lines.append(line.strip())
+            elif lines:
+                yield " ".join(lines)
+                lines = []
+    if lines:
+        yield " ".join(lines)
+
+
+def iter_paragraphs(path):
+    """파일 확장자에 맞는 문단 reader 선택"""
+    if os.path.splitext(path)[1].lower() == ".docx":
+        return iter_docx_paragraphs(path)
+    return iter_text_paragraphs(path)
+
+
+def iter_chunks(paragraphs, chunk_size=800, overlap=100):
+    """문단을 chunk_size 글자 이하로 묶어 반환 (이어지는 chunk는 앞 chunk의 끝 overlap 글자를 포함)"""
+    if not 0 <= overlap < chunk_size:
+        raise ValueError("overlap must be smaller than chunk_size")
+    buffer, carried = "", 0  # carried: 앞 chunk에서 이어받은(이미 반환한) 앞부분 길이
+    for paragraph in paragraphs:
+        buffer = f"{buffer}\n{paragraph}" if buffer else paragraph
+        while len(buffer) > chunk_size:
+            # chunk_size 안의 마지막 공백에서 자름 (공백이 없으면 chunk_size에서 자름)
+            cut = buffer.rfind(" ", overlap + 1, chunk_size + 1)
+            if cut <= overlap:
+                cut = chunk_size
+            yield buffer[:cut].strip()
+            buffer, carried = buffer[cut - overlap:], overlap
+    if len(buffer) > carried and buffer.strip():
+        yield buffer.strip()
+
+
+def source_name(path):
+    """chunk id 접두사로 사용할 출처 이름 (파일 이름에서 id에 쓸 수 없는 문자 제거)"""
+    return re.sub(r"[^0-9A-Za-z._-]", "_", os.path.basename(path))
+
+
+def chunk_id(source, text):
+    """출처와 본문 hash로 만든 chunk id (본문이 바뀌지 않으면 같은 id)"""
+    return f"{source}#{hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]}"
+
+
+class Ingestor:
+    def __init__(self, index, embeddings, namespace, **options):
+        """
+        :param index: Pinecone Index (list / upsert / delete 사용)
+        :param embeddings: LangChain Embeddings (검색에 사용하는 것과 같은 모델)
+        :param namespace: 적재할 Pinecone namespace
+        :param options: INGEST_CONFIG 값 변경 (chunk_size, concurrency 등)
+        """
+        self.index = index
+        self.embeddings = embeddings
+        self.namespace = namespace
+        config = dict(INGEST_CONFIG, **options)
+        self.chunk_size = config["chunk_size"]
+        self.chunk_overlap = config["chunk_overlap"]
+        self.embed_batch_size = config["embed_batch_size"]
+        self.concurrency = config["concurrency"]
+        self.upsert_batch_size = config["upsert_batch_size"]
+        self.upsert_max_bytes = config["upsert_max_bytes"]
+        self.max_retries = config["max_retries"]
+
+    def _retry(self, func, *args):
+        # 일시적인 API 오류에 대비해 지수 backoff로 재시도
+        for attempt in range(self.max_retries):
+            try:
+                return func(*args)
+            except Exception:
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(0.5 * 2 ** attempt)
+
+    def existing_ids(self, source):
+        """인덱스에 이미 있는 출처의 chunk id 집합"""
+        ids = set()
+        for page in self.index.list(prefix=f"{source}#", namespace=self.namespace):
+            ids.update(page)
+        return ids
+
+    def _embed(self, batch):
+        vectors = self._retry(self.embeddings.embed_documents, [text for _, text, _ in batch])
+        return [
+            {"id": id_, "values": list(values), "metadata": dict(metadata, **{TEXT_KEY: text})}
+            for (id_, text, metadata), values in zip(batch, vectors)
+        ]
+
+    def _upsert(self, records, report):
+        # 개수와 대략적인 요청 크기(JSON 기준)를 모두 넘지 않도록 나눠 전송
+        batch, size = [], 0
+        for record in records:
+            record_size = len(json.dumps(record))
+            if batch and (
+                len(batch) >= self.upsert_batch_size or size + record_size > self.upsert_max_bytes
+            ):
+                self._send(batch, report)
+                batch, size = [], 0
+            batch.append(record)
+            size += record_size
+        if batch:
+            self._send(batch, report)
+
+    def _send(self, batch, report):
+        try:
+            self._retry(lambda: self.index.upsert(vectors=batch, namespace=self.namespace))
+        except Exception as e:
+            report["failed"] += len(batch)
+            report["errors"].append(f"upsert: {e}")
+            return
+        report["upserted"] += len(batch)
+        report["upsert_requests"] += 1
+
+    def _collect(self, future, batch, report):
+        try:
+            records = future.result()
+        except Exception as e:
+            report["failed"] += len(batch)
+            report["errors"].append(f"embed: {e}")
+            return
+        report["embedded"] += len(records)
+        self._upsert(records, report)
+
+    def ingest(self, path, dry_run=False):
+        """파일 하나를 적재하고 결과(report dict) 반환"""
+        source = source_name(path)
+        report = {
+            "source": source,
+            "chunks": 0,
+            "unchanged": 0,
+            "embedded": 0,
+            "upserted": 0,
+            "deleted": 0,
+            "failed": 0,
+            "upsert_requests": 0,
+            "errors": [],
+        }
+        start = time.perf_counter()
+        existing = set() if dry_run else self.existing_ids(source)
+        seen = set()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = deque()  # (future, batch), 최대 concurrency * 2개만 대기
+            batch = []
+
+            def submit(batch):
+                pending.append((executor.submit(self._embed, batch), batch))
+                while len(pending) > self.concurrency * 2:
+                    self._collect(*pending.popleft(), report)
+
+            for position, text in enumerate(
+                iter_chunks(iter_paragraphs(path), self.chunk_size, self.chunk_overlap)
+            ):
+                id_ = chunk_id(source, text)
+                if id_ in seen:
+                    continue  # 같은 본문이 문서에 여러 번 있으면 한 번만 저장
+                seen.add(id_)
+                report["chunks"] += 1
+                if id_ in existing:
+                    report["unchanged"] += 1
+                    continue
+                if dry_run:
+                    continue
+                batch.append((id_, text, {"source": source, "chunk": position}))
+                if len(batch) >= self.embed_batch_size:
+                    submit(batch)
+                    batch = []
+            if batch:
+                submit(batch)
+            while pending:
+                self._collect(*pending.popleft(), report)
+
+        # 문서에서 사라진 chunk 삭제 (실패한 chunk가 있으면 다음 실행에서 다시 처리되도록 유지)
+        stale = sorted(existing - seen)
+        if stale and not report["failed"]:
+            for start_at in range(0, len(stale), 1000):
+                ids = stale[start_at:start_at + 1000]
+                try:
+                    self._retry(lambda: self.index.delete(ids=ids, namespace=self.namespace))
+                    report["deleted"] += len(ids)
+                except Exception as e:
+                    report["errors"].append(f"delete: {e}")
+
+        if report["upserted"] or report["deleted"]:
+            retrieval_cache.invalidate()  # 인덱스가 바뀌었으므로 이전 검색 결과 버림
+        report["elapsed_seconds"] = time.perf_counter() - start
+        report["chunks_per_sec"] = report["chunks"] / report["elapsed_seconds"]
+        report["embedded_per_sec"] = report["embedded"] / report["elapsed_seconds"]
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="참고 문서를 Pinecone namespace에 적재")
+    parser.add_argument("paths", nargs="+", help="docx 또는 txt 파일")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CONFIG["chunk_size"])
+    parser.add_argument("--overlap", type=int, default=INGEST_CONFIG["chunk_overlap"])
+    parser.add_argument("--concurrency", type=int, default=INGEST_CONFIG["concurrency"])
+    parser.add_argument("--dry-run", action="store_true", help="임베딩 / 업로드 없이 chunk만 계산")
+    args = parser.parse_args()
+
+    options = {
+        "chunk_size": args.chunk_size,
+        "chunk_overlap": args.overlap,
+        "concurrency": args.concurrency,
+    }
+    if args.dry_run:
+        ingestor = Ingestor(None, None, None, **options)
+    else:
+        from backend.config import PINECONE_NAMESPACE, get_embeddings, get_index
+
+        ingestor = Ingestor(get_index(), get_embeddings(), PINECONE_NAMESPACE, **options)
+
+    failed = 0
+    for path in args.paths:
+        result = ingestor.ingest(path, dry_run=args.dry_run)
+        failed += result["failed"]
+        print(
+            f"{result['source']}: {result['chunks']} chunks, {result['unchanged']} unchanged, "
+            f"{result['embedded']} embedded, {result['upserted']} upserted "
+            f"({result['upsert_requests']} requests), {result['deleted']} deleted, "
+            f"{result['failed']} failed in {result['elapsed_seconds']:.1f}s "
+            f"({result['embedded_per_sec']:.1f} embedded chunks/s)"
+        )
+        for error in result["errors"]:
+            print(f"  {error}")
+    raise SystemExit(1 if failed else 0)
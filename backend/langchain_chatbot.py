@@ -1,5 +1,8 @@
+import functools
+import time
 import uuid
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import RemoveMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import START, MessagesState, StateGraph
 import streamlit as st
 import random
@@ -8,39 +11,93 @@ from streamlit_chat import message
 from backend.config import (get_openai_client,
                             QUESTION_PROMPT,
                             EVALUATION_PROMPT,
-                            retriever, 
+                            get_retriever,
+                            get_embeddings,
                             BOT_AVATAR, USER_AVATAR,
+                            DEFAULT_MODEL,
                             QUERY)
 
-from backend.db import insert_chat_message
-
+from backend import llm_metrics
+from backend.checkpoints import create_checkpointer
+from backend.context_assembly import assemble_context, compress, get_counter, trim
+from backend.llm_cache import cached_chain, from_cache
+from backend.db import insert_chat_message, get_user_questions
+from backend.question_dedup import QuestionDeduplicator
+from backend.settings import CONTEXT_BUDGET_CONFIG, LLM_CACHE_POLICY, QUESTION_DEDUP_CONFIG, SPECULATION_CONFIG
+from backend.speculation import Speculator
+
+# 다음 질문을 평가와 동시에 미리 생성하는 작업 스레드 (프로세스 전체 공유)
+question_speculator = Speculator(max_workers=SPECULATION_CONFIG["max_workers"], name="next-question")
+
+# 미리 생성한 질문을 기다리는 최대 시간 (초), 넘으면 직접 생성
+SPECULATION_TIMEOUT = SPECULATION_CONFIG["timeout"]
+
+# 스트리밍 중 화면을 다시 그리는 최소 간격 (초), 토큰마다 다시 그리지 않도록 제한
+STREAM_RENDER_INTERVAL = 0.05
+
+
+# 세션의 질문 중복 제거기 (처음 호출할 때 사용자의 이전 면접 질문으로 초기화)
+def get_question_dedup(user_id=None):
+    if "question_dedup" not in st.session_state:
+        config = dict(QUESTION_DEDUP_CONFIG)
+        history_limit = config.pop("history_limit")
+        dedup = QuestionDeduplicator(get_embeddings(), **config)
+        if user_id is not None and history_limit:
+            try:
+                dedup.add(get_user_questions(user_id, history_limit))
+            except Exception as e:
+                print(f"Error loading previous questions: {e}")
+        st.session_state.question_dedup = dedup
+    return st.session_state.question_dedup
+
+
+# 질문 생성 문맥 조립 함수 (선택한 문맥을 토큰 예산에 맞추고, 예산이 남으면 작은 문맥을 병합)
+# 질문 응답 캐시는 문맥으로 key를 만드는데, 병합되는 문맥은 사용자마다 남은(사용하지 않은) 문맥에 따라 달라지므로
+# 캐시를 사용할 때는 병합하지 않음 (선택한 문맥이 같으면 같은 key → 사용자 간 재사용)
+def question_context_assembler():
+    return functools.partial(
+        assemble_context,
+        budget=CONTEXT_BUDGET_CONFIG["question_tokens"],
+        counter=get_counter(DEFAULT_MODEL),
+        merge=CONTEXT_BUDGET_CONFIG["merge"] and not LLM_CACHE_POLICY["question"]["enabled"],
+        min_chunk_tokens=CONTEXT_BUDGET_CONFIG["min_chunk_tokens"],
+    )
 
 
 # Streamlit 세션 상태 초기화
-def initialize_session():
+def initialize_session(user_id=None):
     if "messages" not in st.session_state:
         st.session_state.messages = []
 
+    dedup = get_question_dedup(user_id)
+
     if "generated_question" not in st.session_state:
         # RAG를 이용하여 질문 생성을 위한 관련 문서 검색
-        retrieved_docs = retriever.invoke(QUERY)  # 임시 검색 쿼리
+        retrieved_docs = get_retriever().invoke(QUERY)  # 임시 검색 쿼리
 
         
         if retrieved_docs:
-            random_doc = random.choice(retrieved_docs)
-            context = random_doc.page_content  # 검색된 문서에서 내용 가져오기
+            # 이전 면접 질문과 겹칠 가능성이 낮은 문서 중에서 선택
+            contexts = dedup.choose_contexts([doc.page_content for doc in retrieved_docs])
+            chosen = random.choice(contexts)  # 검색된 문서에서 내용 가져오기
+            # 토큰 예산에 맞춰 자르고, 남은 예산에는 다른 문서를 병합
+            context, _ = question_context_assembler()(
+                [chosen] + [content for content in contexts if content != chosen]
+            )
+            used_prompts = {chosen}
         else:
-            context = ""
+            context, used_prompts = "", set()
 
         st.session_state['context'] = context
-        st.session_state['used_prompts'] = set()  # 사용된 프롬프트 저장용
+        # 사용된 프롬프트 저장용 (병합한 문서는 보조 문맥이므로 이후 질문의 주 문맥으로 다시 사용 가능)
+        st.session_state['used_prompts'] = used_prompts
         st.session_state['used_questions'] = set()  # 생성된 질문 저장용
 
 
         llm = get_openai_client()
         
-        # 질문용 모델 체인 정의
-        question_chain = QUESTION_PROMPT | llm
+        # 질문용 모델 체인 정의 (같은 문맥으로 만든 질문은 응답 캐시에서 재사용, backend/llm_cache.py)
+        question_chain = cached_chain("question", QUESTION_PROMPT, llm)
 
         # ai_message.content 형태로 사용
         ai_message = question_chain.invoke({"context": context})
@@ -48,7 +105,7 @@ def initialize_session():
         # RAG와 함께 질문 생성
         generated_question = ai_message.content
         st.session_state['used_questions'].add(generated_question)
-        st.session_state['used_prompts'].add(context)
+        dedup.add([generated_question])
 
         st.session_state.generated_question = generated_question
 
@@ -61,35 +118,58 @@ def feedback_documents():
         st.session_state.feedback_context = st.session_state["context"]
 
 
-def initialize_evaluation_workflow():
-    """평가용 모델 체인을 기반으로 LangGraph 워크플로우 초기화"""
+def initialize_evaluation_workflow(checkpointer=None, llm=None):
+    """
+    평가용 모델 체인을 기반으로 LangGraph 워크플로우 초기화
+    (checkpointer가 없으면 설정에 맞게 생성, llm이 없으면 OpenAI 클라이언트 사용)
+    """
     # 그래프 정의
     workflow = StateGraph(state_schema=MessagesState)
 
     # 모델 평가 함수 정의
-    def call_model(state: MessagesState):
-        evaluation_chain = EVALUATION_PROMPT | get_openai_client()
+    # 토큰 스트리밍 시 노드는 별도 스레드에서 실행되므로 질문 / 문맥은 st.session_state가 아닌 config로 전달
+    def call_model(state: MessagesState, config: RunnableConfig):
+        configurable = config.get("configurable", {})
+        # 빈 답변 / "모르겠습니다" 같은 짧은 답변의 평가는 응답 캐시에서 재사용
+        evaluation_chain = cached_chain("evaluation", EVALUATION_PROMPT, llm or get_openai_client())
+        # 프롬프트 토큰 수 상한: 문맥 / 답변을 각각의 토큰 예산에 맞춰 자름 (backend/context_assembly.py)
+        counter = get_counter(DEFAULT_MODEL)
         response = evaluation_chain.invoke(
             {
-                "question": st.session_state.get("generated_question", ""),
-                "answer": state["messages"][-1].content,
-                "context": st.session_state.get("context", ""),
-            }
+                "question": configurable.get("question", ""),
+                "answer": trim(state["messages"][-1].content, CONTEXT_BUDGET_CONFIG["answer_tokens"], counter),
+                "context": trim(
+                    compress(configurable.get("context", "")), CONTEXT_BUDGET_CONFIG["evaluation_tokens"], counter
+                ),
+            },
+            config,
         )
-        return {"messages": [response]}
+        # 이전 답변 / 평가는 DB(chat_messages)에 저장되어 있으므로 checkpoint에는 이번 답변과 평가만 보관
+        stale = [RemoveMessage(id=msg.id) for msg in state["messages"][:-1]]
+        return {"messages": stale + [response]}
 
     # 노드 및 엣지 추가
     workflow.add_node("chain", call_model)
     workflow.add_edge(START, "chain")
 
-    # 체크포인트 메모리 저장
-    memory = MemorySaver()
-
-    # 워크플로우 컴파일
-    app = workflow.compile(checkpointer=memory)
+    # 워크플로우 컴파일 (checkpoint는 면접 세션(thread)마다 최신 상태만 보관, backend/checkpoints.py)
+    app = workflow.compile(checkpointer=checkpointer or create_checkpointer())
 
     return app
 
+
+# 그래프는 세션 상태에 의존하지 않으므로 프로세스 전체에서 한 번만 컴파일하여 공유
+@st.cache_resource(show_spinner=False)
+def get_evaluation_app():
+    """공용 평가 워크플로우 (질문 / 문맥은 실행할 때 config로 전달)"""
+    return initialize_evaluation_workflow()
+
+
+def evaluation_checkpoint_stats():
+    """평가 워크플로우 checkpoint 저장소 지표 (BoundedMemorySaver만 제공)"""
+    checkpointer = get_evaluation_app().checkpointer
+    return checkpointer.stats() if hasattr(checkpointer, "stats") else {}
+
 # 채팅 기록 출력 함수
 def display_chat_history():
     for i, msg in enumerate(st.session_state.messages):
@@ -104,55 +184,164 @@ def display_chat_history():
 
 
 
-def generate_question():
-    """사용자의 답변 후 새로운 질문을 생성하는 함수"""
-    question_chain = QUESTION_PROMPT | get_openai_client()
-
-    # ✅ 'AIMessage' 객체 반환 → 'str'로 변환
- 
-
-    max_retries = 5  # 새로운 질문을 찾기 위한 최대 시도 횟수
+# 다음 질문 생성 (Streamlit 상태에 접근하지 않으므로 백그라운드 스레드에서도 실행 가능)
+def pick_next_question(retriever, question_chain, fallback_context, used_prompts, used_questions, max_retries=5, dedup=None,
+                       context_assembler=None):
+    """
+    사용하지 않은 문맥으로 새 질문을 생성하여 (질문, 문맥, 사용한 문맥 집합) 반환
+    dedup(QuestionDeduplicator)이 있으면 기존 질문과 겹칠 가능성이 낮은 문맥을 먼저 사용하고,
+    표현만 바꾼 같은 질문도 중복으로 판단
+    context_assembler(question_context_assembler())가 있으면 선택한 문맥을 토큰 예산에 맞추고 다른 문맥을 병합
+    (사용한 문맥으로는 선택한 문맥만 기록, 검색 결과가 고정되어 있어 병합한 문맥까지 기록하면 새 문맥이 금방 바닥남)
+    """
+    used_prompts = set(used_prompts)
+    rejected = set()  # 이번 호출에서 중복으로 버린 질문 (응답 캐시가 다시 반환하지 않도록 전달)
     new_question = None
     new_context = None
 
-    for _ in range(max_retries):
+    for _ in range(max_retries):  # 새로운 질문을 찾기 위한 최대 시도 횟수
         # 새로운 문맥 선택
         retrieved_docs = retriever.invoke(QUERY)
-        available_docs = [doc.page_content for doc in retrieved_docs if doc.page_content not in st.session_state['used_prompts']]
-        
+        available_docs = [doc.page_content for doc in retrieved_docs if doc.page_content not in used_prompts]
+
         if available_docs:
-            new_context = random.choice(available_docs)
-            st.session_state['used_prompts'].add(new_context)
+            if dedup is not None:
+                available_docs = dedup.choose_contexts(available_docs)
+            chosen = random.choice(available_docs)
+            used_prompts.add(chosen)
+            new_context = chosen
+            if context_assembler is not None:
+                new_context, _ = context_assembler(
+                    [chosen] + [content for content in available_docs if content != chosen]
+                )
         else:
-            new_context = st.session_state.get("context", "")
+            new_context = fallback_context
 
-        ai_message = question_chain.invoke({"context": new_context})
+        ai_message = question_chain.invoke(
+            {"context": new_context},
+            {"configurable": {"avoid_responses": frozenset(used_questions) | rejected}},
+        )
         new_question = ai_message.content
+        rejected.add(new_question)
+        if dedup is not None and not from_cache(ai_message):
+            dedup.record_llm_call()
 
         # 중복된 질문인지 확인 후 새로운 질문이면 break
-        if new_question not in st.session_state['used_questions']:
-            st.session_state['used_questions'].add(new_question)
+        if dedup is not None:
+            if not dedup.is_duplicate(new_question, used_questions):
+                break
+        elif new_question not in used_questions:
             break
-    
-    # 세션 상태 업데이트
 
+    return new_question, new_context, used_prompts
+
+
+def _next_question_args():
+    # 현재 세션 상태의 복사본을 인자로 전달 (백그라운드 작업이 세션 상태를 직접 읽지 않도록)
+    return (
+        get_retriever(),
+        cached_chain("question", QUESTION_PROMPT, get_openai_client()),
+        st.session_state.get("context", ""),
+        frozenset(st.session_state.get("used_prompts", ())),
+        frozenset(st.session_state.get("used_questions", ())),
+        5,
+        get_question_dedup(),
+        question_context_assembler(),
+    )
+
+
+def start_next_question():
+    """답변 제출 직후 다음 질문을 백그라운드에서 미리 생성 (평가 응답과 동시에 실행)"""
+    discard_next_question()
+    st.session_state.next_question = question_speculator.start(
+        pick_next_question, *_next_question_args()
+    )
+
+
+def discard_next_question():
+    """미리 생성 중인 다음 질문을 버림 (면접 종료 / 새 면접 시작 시)"""
+    speculation = st.session_state.pop("next_question", None)
+    if speculation is not None:
+        speculation.discard()
+
+
+def question_dedup_stats():
+    """현재 세션의 질문 중복 제거 지표 (질문당 LLM 호출 수 등)"""
+    return get_question_dedup().stats()
+
+
+def speculation_stats():
+    """다음 질문 추측 생성 지표 (적중률, 절약한 시간)"""
+    return question_speculator.stats()
+
+
+def generate_question():
+    """사용자의 답변 후 새로운 질문을 생성하는 함수 (미리 생성된 질문이 있으면 바로 사용)"""
+    result = None
+    speculation = st.session_state.pop("next_question", None)
+    if speculation is not None:
+        result = speculation.take(timeout=SPECULATION_TIMEOUT)
+        # 미리 생성한 뒤 같은 질문이 이미 사용되었으면 새로 생성
+        if result is not None and result[0] in st.session_state.get("used_questions", set()):
+            result = None
+    if result is None:
+        result = pick_next_question(*_next_question_args())
+    new_question, new_context, used_prompts = result
+
+    # 세션 상태 업데이트
+    st.session_state.setdefault("used_prompts", set()).update(used_prompts)
+    st.session_state.setdefault("used_questions", set()).add(new_question)
+    dedup = get_question_dedup()
+    dedup.add([new_question])
+    dedup.record_delivery()
     st.session_state.generated_question = new_question
     st.session_state.context = new_context  # 새로운 문맥 업데이트
     st.session_state.messages.append({"role": "assistant", "content": new_question})
     session_id = st.session_state.get("session_id")
 
-    insert_chat_message(session_id, "bot", new_question)
+    save_message(session_id, "bot", new_question)
 
     message(new_question, is_user=False, key=f"bot_{len(st.session_state.messages)}", logo=BOT_AVATAR)
 
 
+# 면접 세션이 있을 때만 메시지를 DB에 저장 (세션 생성 전 / 생성 실패 시에는 화면에만 표시)
+def save_message(session_id, sender, text):
+    """session_id가 있으면 insert_chat_message로 저장"""
+    if session_id is not None:
+        insert_chat_message(session_id, sender, text)
+
+
+# 평가 워크플로우를 토큰 단위로 실행 (Streamlit 상태에 접근하지 않으므로 테스트에서 직접 호출 가능)
+def stream_evaluation(app, input_message, config, on_token=None, node="chain"):
+    """
+    LangGraph 워크플로우를 stream_mode="messages"로 실행하여 평가 노드의 토큰을 받을 때마다
+    on_token(지금까지의 응답)을 호출하고, (전체 응답, 지표 dict) 반환
+    """
+    start = time.perf_counter()
+    ttft = None
+    parts = []
+    for chunk, metadata in app.stream({"messages": [input_message]}, config, stream_mode="messages"):
+        if metadata.get("langgraph_node") != node or not isinstance(chunk.content, str) or not chunk.content:
+            continue
+        if ttft is None:
+            ttft = time.perf_counter() - start
+        parts.append(chunk.content)
+        if on_token is not None:
+            on_token("".join(parts))
+    stats = {"ttft": ttft, "duration": time.perf_counter() - start, "chunks": len(parts)}
+    return "".join(parts), stats
+
+
 def handle_user_input():
     """사용자 입력을 처리하는 함수"""
     if prompt := st.chat_input("답변을 입력하세요..."):
         session_id = st.session_state.get("session_id")
         
         # 사용자 입력 저장 및 출력
-        insert_chat_message(session_id, "user", prompt)
+        save_message(session_id, "user", prompt)
+
+        # 평가를 기다리는 동안 다음 질문을 미리 생성 ("계속 진행" 시 바로 표시)
+        start_next_question()
 
         # 사용자 입력 UI 표시
         st.session_state.messages.append({"role": "user", "content": prompt})
@@ -163,29 +352,38 @@ def handle_user_input():
             logo=USER_AVATAR,
         )
 
-        # LangGraph 워크플로우를 실행하여 RAG 검색 및 응답 생성
-        thread_id = uuid.uuid4()
-        config = {"configurable": {"thread_id": thread_id}}
+        # LangGraph 워크플로우를 실행하여 RAG 검색 및 응답 생성 (면접 세션 하나가 thread 하나)
+        thread_id = str(session_id) if session_id is not None else str(uuid.uuid4())
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "question": st.session_state.get("generated_question", ""),
+                "context": st.session_state.get("context", ""),
+            }
+        }
 
         input_message = {"role": "user", "content": prompt}
 
-        # LangGraph 평가 워크플로우 실행
-        if "app" not in st.session_state:
-            st.session_state.app = initialize_evaluation_workflow()
-
-        # AI 평가 수행
-        for event in st.session_state.app.stream(
-            {"messages": [input_message]}, config, stream_mode="values"
-        ):
-            response = event["messages"][-1].content
-
-            # ✅ 중복 방지: 동일한 응답이 있는지 확인
-            if not any(msg["content"] == response for msg in st.session_state.messages):
-
-                insert_chat_message(session_id, "bot", response)
-                st.session_state.messages.append({"role": "assistant", "content": response})
-                message(response, is_user=False, key=f"assistant_{len(st.session_state.messages)}", logo=BOT_AVATAR)
-
+        # AI 평가 수행 (토큰 단위로 받아 말풍선 자리에 바로 표시)
+        placeholder = st.empty()
+        last_render = 0.0
+
+        def render(text):
+            nonlocal last_render
+            now = time.monotonic()
+            if now - last_render >= STREAM_RENDER_INTERVAL:
+                placeholder.markdown(text + "▌")
+                last_render = now
+
+        response, stats = stream_evaluation(get_evaluation_app(), input_message, config, render)
+        placeholder.empty()
+        llm_metrics.record_response("evaluation", session_id=session_id, **stats)
+
+        # ✅ 중복 방지: 동일한 응답이 있는지 확인, 스트림이 끝난 뒤 한 번만 저장
+        if response and not any(msg["content"] == response for msg in st.session_state.messages):
+            save_message(session_id, "bot", response)
+            st.session_state.messages.append({"role": "assistant", "content": response})
+            message(response, is_user=False, key=f"assistant_{len(st.session_state.messages)}", logo=BOT_AVATAR)
 
         # ✅ 면접 지속 여부 선택 버튼 추가
         st.session_state.show_continue_button = True
\ No newline at end of file
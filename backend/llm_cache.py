@@ -0,0 +1,273 @@
+"""
+LLM 응답 영구 캐시 (질문 생성 / 평가)
+
+- key = sha256(모델, 프롬프트 템플릿 hash, 정규화한 입력, temperature)
+  → 템플릿을 수정하면 key가 바뀌므로 이전 응답을 사용하지 않음
+- key마다 응답을 최대 variants개까지 저장, 다 모이기 전에는 LLM을 호출하여 새 응답을 추가하고
+  다 모인 뒤에는 저장된 응답 중 하나를 무작위로 반환 (temperature에 의한 다양성 유지)
+- SQLite(WAL) 파일 하나에 저장하여 여러 프로세스가 공유, key 수가 max_entries를 넘거나
+  ttl초 동안 사용하지 않은 key는 삭제 (LRU)
+- 조회(hit)는 읽기만 하고, 사용 시각은 메모리에 모아 두었다가 touch_interval초마다 또는 다음 쓰기에서
+  한 번에 반영 (hit마다 쓰기 잠금 / commit을 하지 않음)
+- 호출 위치(site)별 정책 (LLM_CACHE_POLICY)
+  - question: 같은 문맥(context)으로 만든 질문은 사용자와 관계없이 재사용
+  - evaluation: 답변이 비었거나 "모르겠습니다"처럼 짧은 경우(max_answer_chars 이하)에만 사용
+    (긴 답변은 사용자마다 달라 재사용되지 않고, 답변 원문을 디스크에 남기지 않음)
+- 호출부에서 config["configurable"]["avoid_responses"]로 피할 응답(이미 낸 질문 등)을 전달하면
+  그 응답은 반환하지 않고 (남은 variant가 없으면) LLM을 호출
+- 실제로 LLM을 호출한 경우(miss / bypassed) 프롬프트 / 응답 토큰 수를 llm_metrics.record_usage로 기록
+"""
+
+import hashlib
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import unicodedata
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from backend import llm_metrics
+from backend.settings import LLM_CACHE_CONFIG, LLM_CACHE_POLICY
+
+
+def normalize(text):
+    """캐시 key용 입력 정규화 (유니코드 NFC, 앞뒤 공백 제거, 연속 공백 하나로)"""
+    return " ".join(unicodedata.normalize("NFC", str(text)).split())
+
+
+def cache_key(model, template, inputs, temperature):
+    """(모델, 템플릿 hash, 정규화한 입력, temperature)로 만든 캐시 key"""
+    payload = {
+        "model": model,
+        "template": hashlib.sha256(template.encode("utf-8")).hexdigest(),
+        "inputs": {name: normalize(value) for name, value in sorted(inputs.items())},
+        "temperature": temperature,
+    }
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode()).digest()
+
+
+class LLMCache:
+    def __init__(self, path, max_entries=10000, ttl=7 * 24 * 3600, timeout=10.0, touch_interval=60.0):
+        """
+        :param path: SQLite 파일 경로
+        :param max_entries: 최대 key 수 (넘으면 가장 오래 사용하지 않은 key부터 삭제)
+        :param ttl: 이 시간(초) 동안 사용하지 않은 key는 삭제
+        :param timeout: 다른 프로세스가 쓰는 중일 때 기다리는 최대 시간 (초)
+        :param touch_interval: 조회한 key의 사용 시각을 모아서 저장하는 간격 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.touch_interval = touch_interval
+        self._touched = {}  # key -> 아직 저장하지 않은 마지막 사용 시각
+        self._last_touch_flush = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode = WAL;")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key BLOB NOT NULL,
+                variant INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (key, variant)
+            );
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_lru_idx ON llm_responses (last_used);")
+        self._conn.commit()
+        self._evictions = 0
+
+    def get(self, key):
+        """key에 저장된 응답 리스트 (variant 순서)"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT content FROM llm_responses WHERE key = ? ORDER BY variant;", (key,)
+            ).fetchall()
+            if rows:
+                self._touched[key] = time.time()
+                if time.monotonic() - self._last_touch_flush >= self.touch_interval:
+                    self._save_touched()
+        return [content for (content,) in rows]
+
+    def _save_touched(self):
+        # 사용 시각만 저장하는 별도 트랜잭션 (실패하면 다음 쓰기에서 다시 저장)
+        try:
+            self._conn.execute("BEGIN IMMEDIATE;")
+            self._flush_touched()
+            self._conn.commit()
+            self._touched.clear()
+        except Exception as e:
+            self._conn.rollback()
+            print(f"Error saving LLM cache access times: {e}")
+        self._last_touch_flush = time.monotonic()
+
+    def _flush_touched(self):
+        # 모아 둔 사용 시각을 한 번에 저장 (쓰기 잠금 안에서 호출, commit 후 호출부에서 _touched 비움)
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE llm_responses SET last_used = MAX(last_used, ?) WHERE key = ?;",
+                [(last_used, key) for key, last_used in self._touched.items()],
+            )
+
+    def add(self, key, content, max_variants):
+        """key에 응답 하나 추가 (이미 max_variants개면 추가하지 않음), 추가했으면 True"""
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE;")
+                self._flush_touched()  # 삭제 대상을 고르기 전에 최근 사용 시각 반영
+                (count,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM llm_responses WHERE key = ?;", (key,)
+                ).fetchone()
+                added = count < max_variants
+                if added:
+                    self._conn.execute(
+                        "INSERT INTO llm_responses (key, variant, content, last_used) VALUES (?, ?, ?, ?);",
+                        (key, count, content, now),
+                    )
+                    if count == 0:
+                        self._evict(now)
+                self._conn.commit()
+                self._touched.clear()
+            except Exception:
+                self._conn.rollback()
+                raise
+        return added
+
+    def _evict(self, now):
+        # 유휴 시간이 ttl을 넘은 key와, key 수가 max_entries를 넘는 만큼 오래된 key 삭제 (쓰기 잠금 안에서 호출)
+        cursor = self._conn.execute("DELETE FROM llm_responses WHERE last_used < ?;", (now - self.ttl,))
+        evicted = cursor.rowcount
+        (keys,) = self._conn.execute("SELECT COUNT(DISTINCT key) FROM llm_responses;").fetchone()
+        if keys > self.max_entries:
+            cursor = self._conn.execute(
+                """
+                DELETE FROM llm_responses WHERE key IN (
+                    SELECT key FROM llm_responses GROUP BY key ORDER BY MAX(last_used) LIMIT ?
+                );
+                """,
+                (keys - self.max_entries,),
+            )
+            evicted += cursor.rowcount
+        self._evictions += evicted
+
+    def clear(self):
+        """모든 응답 삭제"""
+        with self._lock:
+            self._touched.clear()
+            self._conn.execute("DELETE FROM llm_responses;")
+            self._conn.commit()
+
+    def stats(self):
+        """저장된 key / 응답 수와 삭제한 응답 수"""
+        with self._lock:
+            keys, responses = self._conn.execute(
+                "SELECT COUNT(DISTINCT key), COUNT(*) FROM llm_responses;"
+            ).fetchone()
+        return {"keys": keys, "responses": responses, "evictions": self._evictions}
+
+    def close(self):
+        """모아 둔 사용 시각을 저장하고 연결 닫기"""
+        with self._lock:
+            self._save_touched()
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """설정(LLM_CACHE_CONFIG)으로 만든 프로세스 공용 캐시"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = LLMCache(**LLM_CACHE_CONFIG)
+        return _cache
+
+
+# 호출 위치별 hit / miss / 정책상 사용하지 않은 횟수
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _count(site, outcome):
+    with _stats_lock:
+        counts = _stats.setdefault(site, {"hits": 0, "misses": 0, "bypassed": 0})
+        counts[outcome] += 1
+
+
+def stats():
+    """호출 위치별 hit / miss / bypassed 횟수"""
+    with _stats_lock:
+        return {site: dict(counts) for site, counts in _stats.items()}
+
+
+def cacheable(site, inputs, policy=None):
+    """호출 위치 정책상 이 입력의 응답을 캐시해도 되는지 여부"""
+    policy = (policy or LLM_CACHE_POLICY).get(site)
+    if not policy or not policy["enabled"]:
+        return False
+    max_answer_chars = policy.get("max_answer_chars")
+    if max_answer_chars is not None and len(normalize(inputs.get("answer", ""))) > max_answer_chars:
+        return False
+    return True
+
+
+def _invoke_llm(site, chain, inputs, config):
+    # LLM 호출 후 usage_metadata(스트리밍은 stream_usage=True일 때 제공)의 토큰 수와 호출 시간 기록
+    start = time.perf_counter()
+    response = chain.invoke(inputs, config)
+    usage = getattr(response, "usage_metadata", None) or {}
+    llm_metrics.record_usage(
+        site,
+        usage.get("input_tokens"),
+        usage.get("output_tokens"),
+        time.perf_counter() - start,
+    )
+    return response
+
+
+def from_cache(message):
+    """cached_chain이 LLM을 호출하지 않고 캐시에서 반환한 응답인지 여부"""
+    return getattr(message, "response_metadata", {}).get("llm_cache") == "hit"
+
+
+def cached_chain(site, prompt, llm, cache=None, policy=None):
+    """
+    prompt | llm 과 같은 입력 / 출력(AIMessage)의 Runnable을 반환하되, 정책상 허용된 입력은 캐시 사용
+    :param site: 호출 위치 이름 (LLM_CACHE_POLICY의 key, 예: "question", "evaluation")
+    :param prompt: PromptTemplate (템플릿 문자열이 key에 포함)
+    :param llm: ChatOpenAI 등 chat model
+    """
+    chain = prompt | llm
+    policy = policy or LLM_CACHE_POLICY
+    model = getattr(llm, "model_name", None) or type(llm).__name__
+    # llm.bind(temperature=...)로 호출 단위로 바꾼 값도 key에 반영
+    temperature = getattr(llm, "kwargs", {}).get("temperature", getattr(llm, "temperature", None))
+
+    def invoke(inputs, config=None):
+        if not cacheable(site, inputs, policy):
+            _count(site, "bypassed")
+            return _invoke_llm(site, chain, inputs, config)
+        store = cache or get_cache()
+        key = cache_key(model, prompt.template, inputs, temperature)
+        stored = store.get(key)
+        avoid = set((config or {}).get("configurable", {}).get("avoid_responses", ()))
+        variants = [content for content in stored if content not in avoid]
+        if variants and len(stored) >= policy[site]["variants"]:
+            _count(site, "hits")
+            return AIMessage(content=random.choice(variants), response_metadata={"llm_cache": "hit"})
+        _count(site, "misses")
+        response = _invoke_llm(site, chain, inputs, config)
+        if isinstance(response.content, str) and response.content:
+            store.add(key, response.content, policy[site]["variants"])
+        return response
+
+    return RunnableLambda(invoke, name=f"cached_{site}")
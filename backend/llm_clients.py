@@ -0,0 +1,121 @@
+"""
+프로세스 공용 OpenAI 클라이언트 / HTTP 연결 풀
+
+- httpx.Client 하나를 프로세스 전체에서 공유하여 keep-alive 연결을 재사용
+  (호출마다 새 연결 / TLS handshake를 하지 않음), 연결 수 / timeout은 OPENAI_HTTP_CONFIG로 설정
+- ChatOpenAI 객체는 (모델, 파라미터)마다 하나만 만들어 재사용하고, 모두 같은 httpx.Client 사용
+  → temperature만 다른 호출도 새 연결 풀을 만들지 않음 (호출 단위 변경은 llm.bind(temperature=...) 사용)
+- httpcore trace 이벤트로 요청 수 / 새 연결 수 / TLS handshake 수를 세어 연결 재사용률 제공 (stats)
+"""
+
+import threading
+
+import httpx
+
+from backend.settings import OPENAI_HTTP_CONFIG
+
+_lock = threading.Lock()
+_http_client = None
+_chat_models = {}
+_counts = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0}
+
+
+def _count(name):
+    with _lock:
+        _counts[name] += 1
+
+
+def _trace(event_name, info):
+    # httpcore가 새 연결을 만들 때만 connect_tcp / start_tls 이벤트가 발생
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+    elif event_name == "connection.start_tls.complete":
+        _count("tls_handshakes")
+
+
+def _on_request(request):
+    _count("requests")
+    request.extensions["trace"] = _trace
+
+
+def timeout():
+    """설정(OPENAI_HTTP_CONFIG)의 httpx.Timeout"""
+    return httpx.Timeout(
+        OPENAI_HTTP_CONFIG["read_timeout"],
+        connect=OPENAI_HTTP_CONFIG["connect_timeout"],
+        pool=OPENAI_HTTP_CONFIG["pool_timeout"],
+    )
+
+
+def create_http_client(config=None):
+    """연결 수 제한 / timeout / 연결 재사용 계측을 설정한 httpx.Client 생성"""
+    config = config or OPENAI_HTTP_CONFIG
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=config["max_connections"],
+            max_keepalive_connections=config["max_keepalive_connections"],
+            keepalive_expiry=config["keepalive_expiry"],
+        ),
+        timeout=timeout(),
+        event_hooks={"request": [_on_request]},
+    )
+
+
+def get_http_client():
+    """프로세스 공용 httpx.Client (처음 사용할 때 생성)"""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = create_http_client()
+        return _http_client
+
+
+def get_chat_model(model, api_key, **params):
+    """
+    (모델, 파라미터)마다 하나만 생성하는 ChatOpenAI (공용 httpx.Client 사용)
+    :param model: 모델 이름
+    :param api_key: OpenAI API 키
+    :param params: ChatOpenAI에 전달할 값 (temperature, max_completion_tokens 등)
+    """
+    key = (model, api_key, tuple(sorted(params.items())))
+    with _lock:
+        chat_model = _chat_models.get(key)
+    if chat_model is None:
+        from langchain_openai import ChatOpenAI
+
+        chat_model = ChatOpenAI(
+            model=model,
+            api_key=api_key,
+            http_client=get_http_client(),
+            timeout=timeout(),
+            max_retries=OPENAI_HTTP_CONFIG["max_retries"],
+            **params,
+        )
+        with _lock:
+            chat_model = _chat_models.setdefault(key, chat_model)  # 동시에 만들었으면 먼저 저장된 객체 사용
+    return chat_model
+
+
+def stats():
+    """요청 수 / 새 연결 수 / TLS handshake 수와 연결 재사용률, 보관 중인 ChatOpenAI 수"""
+    with _lock:
+        counts = dict(_counts)
+        models = len(_chat_models)
+    requests = counts["requests"]
+    reused = max(requests - counts["connections_opened"], 0)
+    return {
+        **counts,
+        "reused": reused,
+        "reuse_rate": reused / requests if requests else 0.0,
+        "chat_models": models,
+    }
+
+
+def close():
+    """공용 httpx.Client를 닫고 ChatOpenAI 객체 제거 (다음 사용 시 다시 생성)"""
+    global _http_client
+    with _lock:
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        _chat_models.clear()
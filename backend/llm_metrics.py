@@ -0,0 +1,94 @@
+"""
+LLM 응답 계측 (time-to-first-token / 전체 응답 시간 / 토큰 수)
+
+- 호출 종류(예: "evaluation")별로 첫 토큰까지 걸린 시간(TTFT), 전체 응답 시간, 받은 chunk 수를
+  프로세스 내 histogram에 기록 (backend/metrics.py의 Histogram 사용)
+- LLM 호출마다 프롬프트 / 응답(completion) 토큰 수와 호출 시간을 기록 (record_usage)
+  → 문맥 토큰 예산(backend/context_assembly.py)이 응답 시간에 미치는 영향 확인
+- 턴마다 "backend.llm" logger에 JSON 한 줄로 기록하여 세션 / 턴 단위로 추적
+- snapshot()을 JSON(to_json)으로 내보내기
+"""
+
+import json
+import logging
+import threading
+
+from backend.metrics import DURATION_BUCKETS, Histogram
+
+llm_logger = logging.getLogger("backend.llm")
+
+CHUNK_BUCKETS = (1, 10, 50, 100, 250, 500, 1000, 2000, 5000)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 1500, 2000, 4000, 8000, 16000)
+
+# 계측 항목 (이름, bucket, 설명)
+SERIES = (
+    ("ttft_seconds", DURATION_BUCKETS, "Time until the first streamed token"),
+    ("duration_seconds", DURATION_BUCKETS, "Time until the response completed"),
+    ("chunks", CHUNK_BUCKETS, "Streamed chunks per response"),
+    ("prompt_tokens", TOKEN_BUCKETS, "Prompt tokens per LLM call"),
+    ("completion_tokens", TOKEN_BUCKETS, "Completion tokens per LLM call"),
+    ("call_seconds", DURATION_BUCKETS, "Time per LLM call"),
+)
+
+_histograms = {}
+_lock = threading.Lock()
+
+
+def record_response(name, ttft, duration, chunks, **fields):
+    """
+    응답 하나의 지표 기록
+    :param name: 호출 종류 (예: "evaluation")
+    :param ttft: 첫 토큰까지 걸린 시간 (초), 토큰을 받지 못했으면 None
+    :param duration: 전체 응답 시간 (초)
+    :param chunks: 받은 chunk 수
+    :param fields: 로그에 함께 남길 값 (session_id 등)
+    """
+    _record(name, {"ttft_seconds": ttft, "duration_seconds": duration, "chunks": chunks}, fields)
+
+
+def record_usage(name, prompt_tokens, completion_tokens, duration, **fields):
+    """
+    LLM 호출 하나의 토큰 수 / 호출 시간 기록
+    :param name: 호출 종류 (예: "question", "evaluation")
+    :param prompt_tokens: 프롬프트 토큰 수, 모르면 None
+    :param completion_tokens: 응답 토큰 수, 모르면 None
+    :param duration: 호출 시간 (초)
+    :param fields: 로그에 함께 남길 값
+    """
+    values = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "call_seconds": duration,
+    }
+    _record(name, values, fields)
+
+
+def _record(name, values, fields):
+    with _lock:
+        histograms = _histograms.setdefault(
+            name, {series: Histogram(buckets) for series, buckets, _ in SERIES}
+        )
+        for series, value in values.items():
+            if value is not None:
+                histograms[series].observe(value)
+    llm_logger.info(json.dumps({"call": name, **values, **fields}, default=str))
+
+
+def snapshot():
+    """호출 종류별 histogram"""
+    with _lock:
+        return {
+            name: {series: histogram.snapshot() for series, histogram in histograms.items()}
+            for name, histograms in _histograms.items()
+        }
+
+
+def reset():
+    """모든 지표 초기화"""
+    with _lock:
+        _histograms.clear()
+
+
+def to_json(indent=None):
+    """snapshot을 JSON 문자열로 반환"""
+    return json.dumps({"calls": snapshot()}, indent=indent)
@@ -0,0 +1,240 @@
+"""
+로컬 벡터 인덱스 (Pinecone namespace의 프로세스 메모리 사본)
+
+- Pinecone namespace의 벡터 / 문서를 한 번 내려받아 파일(.npz)로 저장하고, 앱은 파일을 읽어 메모리에서 검색
+- 벡터는 단위 길이로 정규화하여 cosine 유사도 = 내적, top-k / MMR 검색을 NumPy 행렬 연산으로 수행
+- quantize=True면 벡터를 int8(벡터별 scale)로 저장하여 메모리를 float32 대비 약 1/4로 제한
+  (검색 시 float32로 변환하므로 검색 시간은 조금 늘어남)
+- LocalRetriever는 Pinecone retriever와 같은 LangChain retriever 인터페이스 (RETRIEVAL_BACKEND=local로 전환)
+- Pinecone 없이 동작하므로 테스트에서 원격 인덱스 대신 사용 가능
+
+실행 예시:
+    python -m backend.local_index snapshot --quantize     # Pinecone namespace -> backend/data/vector_index.npz
+    python -m backend.local_index info                    # 문서 수 / 차원 / 메모리 사용량
+    python -m backend.local_index bench --queries 1000    # 검색 지연 시간 측정
+"""
+
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from backend.settings import LOCAL_INDEX_CONFIG
+
+# Pinecone metadata에서 문서 본문이 저장된 key (langchain_pinecone / pinecone_db 기본값)
+TEXT_KEY = "text"
+
+
+def _normalize(vectors):
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _quantize(vectors):
+    # 벡터마다 최대 절댓값이 127이 되도록 scale을 정해 int8로 변환
+    scales = np.abs(vectors).max(axis=1, initial=0) / 127
+    scales[scales == 0] = 1
+    quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+    return quantized, scales.astype(np.float32)
+
+
+class LocalVectorIndex:
+    def __init__(self, ids, vectors, metadatas, quantize=False):
+        """
+        :param ids: 벡터 id 리스트
+        :param vectors: (문서 수, 차원) 벡터 배열 (내부에서 단위 길이로 정규화)
+        :param metadatas: 벡터별 metadata dict 리스트 (본문은 TEXT_KEY)
+        :param quantize: True면 int8로 저장하여 메모리 절약 (점수에 약간의 오차)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1 if len(ids) else 0)
+        vectors = _normalize(vectors)
+        self.ids = list(ids)
+        self.metadatas = list(metadatas)
+        self.quantized = quantize
+        if quantize:
+            self._vectors, self._scales = _quantize(vectors)
+        else:
+            self._vectors, self._scales = vectors, None
+
+    @property
+    def dimension(self):
+        """벡터 차원"""
+        return self._vectors.shape[1]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _rows(self, positions):
+        # 지정한 행의 float32 벡터 (int8이면 scale을 곱해 복원)
+        rows = self._vectors[positions].astype(np.float32)
+        if self._scales is not None:
+            rows *= self._scales[positions, None]
+        return rows
+
+    def scores(self, query_vector):
+        """모든 문서와 질의 벡터의 cosine 유사도"""
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        scores = self._vectors @ query
+        if self._scales is not None:
+            scores = scores * self._scales
+        return scores
+
+    def search(self, query_vector, k=4):
+        """유사도가 높은 순서로 (위치, 점수) k개 반환"""
+        if not len(self):
+            return []
+        scores = self.scores(query_vector)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]  # 전체 정렬 없이 상위 k개 선택
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top]
+
+    def mmr_search(self, query_vector, k=4, fetch_k=20, lambda_mult=0.5):
+        """
+        MMR(maximal marginal relevance) 검색: 상위 fetch_k개 후보에서 질의와 유사하면서
+        이미 고른 문서와는 덜 겹치는 문서를 k개 선택하여 위치 리스트 반환
+        """
+        candidates = [i for i, _ in self.search(query_vector, fetch_k)]
+        if not candidates:
+            return []
+        vectors = _normalize(self._rows(candidates))
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        relevance = vectors @ query
+        similarity = vectors @ vectors.T
+
+        selected = [int(np.argmax(relevance))]
+        while len(selected) < min(k, len(candidates)):
+            redundancy = similarity[:, selected].max(axis=1)
+            mmr = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+            mmr[selected] = -np.inf
+            selected.append(int(np.argmax(mmr)))
+        return [candidates[i] for i in selected]
+
+    def document(self, position):
+        """위치의 문서를 LangChain Document로 반환"""
+        metadata = dict(self.metadatas[position])
+        text = metadata.pop(TEXT_KEY, "")
+        return Document(page_content=text, metadata=metadata, id=self.ids[position])
+
+    def stats(self):
+        """문서 수 / 차원 / 벡터 메모리 사용량"""
+        nbytes = self._vectors.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+        return {
+            "documents": len(self),
+            "dimension": self.dimension if len(self) else 0,
+            "quantized": self.quantized,
+            "vector_bytes": nbytes,
+        }
+
+    def save(self, path):
+        """벡터와 문서를 .npz 파일 하나로 저장 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {
+            "ids": np.array(self.ids, dtype=str),
+            "vectors": self._vectors,
+            "metadatas": np.array(json.dumps(self.metadatas, ensure_ascii=False)),
+        }
+        if self._scales is not None:
+            arrays["scales"] = self._scales
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """save()로 저장한 파일 읽기"""
+        with np.load(path, allow_pickle=False) as data:
+            index = cls.__new__(cls)
+            index.ids = data["ids"].tolist()
+            index.metadatas = json.loads(str(data["metadatas"]))
+            index._vectors = data["vectors"]
+            index._scales = data["scales"] if "scales" in data else None
+            index.quantized = index._scales is not None
+        return index
+
+    @classmethod
+    def from_pinecone(cls, index, namespace, quantize=False, batch_size=100):
+        """Pinecone index의 namespace 전체를 내려받아 로컬 인덱스 생성"""
+        ids, vectors, metadatas = [], [], []
+        for page in index.list(namespace=namespace):  # id 목록을 page 단위로 조회
+            page = list(page)
+            for start in range(0, len(page), batch_size):
+                fetched = index.fetch(ids=page[start:start + batch_size], namespace=namespace)
+                for vector_id, vector in fetched.vectors.items():
+                    ids.append(vector_id)
+                    vectors.append(vector.values)
+                    metadatas.append(dict(vector.metadata or {}))
+        return cls(ids, np.array(vectors, dtype=np.float32), metadatas, quantize=quantize)
+
+
+class LocalRetriever(BaseRetriever):
+    """LocalVectorIndex 검색을 LangChain retriever로 제공 (Pinecone retriever와 같은 search_type / search_kwargs)"""
+
+    index: Any
+    embeddings: Embeddings
+    search_type: str = "similarity"
+    search_kwargs: Dict[str, Any] = {}
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        query_vector = self.embeddings.embed_query(query)
+        k = self.search_kwargs.get("k", 4)
+        if self.search_type == "mmr":
+            positions = self.index.mmr_search(
+                query_vector,
+                k=k,
+                fetch_k=self.search_kwargs.get("fetch_k", 20),
+                lambda_mult=self.search_kwargs.get("lambda_mult", 0.5),
+            )
+        else:
+            positions = [i for i, _ in self.index.search(query_vector, k)]
+        return [self.index.document(i) for i in positions]
+
+
+def _benchmark(index, queries):
+    rng = np.random.default_rng(0)
+    query_vectors = rng.standard_normal((queries, index.dimension)).astype(np.float32)
+    results = {}
+    for name, search in (
+        ("top-k", lambda q: index.search(q, 5)),
+        ("mmr", lambda q: index.mmr_search(q, 5, 20, 0.7)),
+    ):
+        latencies = []
+        for query in query_vectors:
+            start = time.perf_counter()
+            search(query)
+            latencies.append(time.perf_counter() - start)
+        cuts = statistics.quantiles(latencies, n=100)
+        results[name] = {"p50_ms": cuts[49] * 1000, "p99_ms": cuts[98] * 1000}
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 벡터 인덱스 관리")
+    parser.add_argument("command", choices=["snapshot", "info", "bench"])
+    parser.add_argument("--path", default=LOCAL_INDEX_CONFIG["path"], help="인덱스 파일 경로")
+    parser.add_argument("--quantize", action="store_true", help="int8로 저장 (snapshot)")
+    parser.add_argument("--queries", type=int, default=1000, help="측정할 검색 횟수 (bench)")
+    args = parser.parse_args()
+
+    if args.command == "snapshot":
+        from backend.config import PINECONE_NAMESPACE, get_index
+
+        local = LocalVectorIndex.from_pinecone(get_index(), PINECONE_NAMESPACE, quantize=args.quantize)
+        local.save(args.path)
+        print(f"Saved {len(local)} vectors to {args.path}: {local.stats()}")
+    else:
+        local = LocalVectorIndex.load(args.path)
+        print(local.stats())
+        if args.command == "bench":
+            for name, result in _benchmark(local, args.queries).items():
+                print(f"  {name:<6} p50 {result['p50_ms']:.3f} ms  p99 {result['p99_ms']:.3f} ms")
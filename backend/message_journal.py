@@ -0,0 +1,293 @@
+"""
+채팅 메시지 write-behind journal
+
+- insert_chat_message 호출 시 메시지를 큐에 넣고 바로 반환 (UI 스레드에서 DB commit 대기 X)
+- 백그라운드 스레드가 큐에 쌓인 메시지를 batch로 모아 한 번에 저장
+- 메시지마다 클라이언트에서 message_uid(UUID)와 timestamp를 부여하므로
+  같은 메시지를 여러 번 저장해도 한 번만 들어감 (ON CONFLICT DO NOTHING)
+- DB에 저장할 수 없는 동안에는 로컬 spool 파일(JSON Lines)에 추가 기록하고,
+  DB가 복구되면 spool 파일을 다시 읽어 저장 (replay)
+- 제약 조건 위반 등 행 자체의 오류(row_errors)는 다시 시도해도 실패하므로 spool하지 않음
+  → batch를 한 행씩 다시 저장하고, 거부된 행만 dead-letter 파일(rejected_path)로 옮김
+  (잘못된 행 하나 때문에 spool replay가 계속 실패하여 이후 메시지가 모두 spool되는 것을 방지)
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+
+class MessageJournal:
+    def __init__(
+        self,
+        writer,
+        spool_path,
+        batch_size=100,
+        flush_interval=0.2,
+        retry_interval=5.0,
+        rejected_path=None,
+        row_errors=(),
+    ):
+        """
+        :param writer: 메시지 dict 리스트를 받아 DB에 저장하는 함수 (실패 시 예외 발생)
+        :param spool_path: DB 장애 시 메시지를 보관할 append-only 파일 경로
+        :param batch_size: 한 번에 저장할 최대 메시지 수
+        :param flush_interval: 큐가 비어 있을 때 다음 메시지를 기다리는 시간 (초)
+        :param retry_interval: DB 저장 실패 후 다시 시도하기까지의 최소 간격 (초)
+        :param rejected_path: 저장이 거부된 메시지를 기록할 dead-letter 파일 경로 (기본값 spool_path + ".rejected")
+        :param row_errors: 행 자체의 오류로 writer가 발생시키는 예외 타입들 (연결 오류 등 그 밖의 예외만 spool)
+        """
+        self._writer = writer
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.rejected_path = rejected_path or spool_path + ".rejected"
+        self.row_errors = tuple(row_errors)
+
+        self._queue = queue.Queue()
+        self._cond = threading.Condition()
+        self._spool_lock = threading.Lock()
+        self._rejected_lock = threading.Lock()
+        self._pending = 0  # 큐에 들어갔지만 아직 처리(저장 또는 spool)되지 않은 메시지 수
+        self._thread = None
+        self._stopped = False
+        self._last_failure = 0.0
+
+        # 지표
+        self._written = 0
+        self._batches = 0
+        self._spooled = 0
+        self._replayed = 0
+        self._rejected = 0
+        self._failures = 0
+        self._last_error = None
+
+    def append(self, session_id, sender, message):
+        """메시지를 큐에 추가하고 message_uid 반환"""
+        row = {
+            "message_uid": str(uuid.uuid4()),
+            "session_id": session_id,
+            "sender": sender,
+            "message": message,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError("Message journal is closed.")
+            self._pending += 1
+            self._ensure_worker()
+        self._queue.put(row)
+        return row["message_uid"]
+
+    def spool(self, rows, error):
+        """
+        다른 경로(비동기 계층 등)에서 DB에 저장하지 못한 메시지를 spool 파일에 기록
+        (DB가 복구되면 백그라운드 스레드가 journal의 메시지와 함께 replay)
+        """
+        self._record_failure(error)
+        self._append_spool(rows)
+        with self._cond:
+            if not self._stopped:
+                self._ensure_worker()
+
+    def reject(self, rows, error):
+        """다시 시도해도 저장할 수 없는 메시지를 dead-letter 파일에 기록 (spool / replay 대상에서 제외)"""
+        with self._cond:
+            self._rejected += len(rows)
+            self._last_error = str(error)
+        print(f"Rejected {len(rows)} chat messages, moving to {self.rejected_path}: {error}")
+        try:
+            with self._rejected_lock:
+                self._append_rows(self.rejected_path, rows, error=str(error))
+        except Exception as e:
+            print(f"Error writing {len(rows)} rejected chat messages: {e}")
+
+    def flush(self, timeout=5.0):
+        """큐에 쌓인 메시지가 모두 처리될 때까지 대기 (시간 내 완료 시 True)"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=5.0):
+        """남은 메시지를 처리하고 백그라운드 스레드 종료"""
+        self.flush(timeout)
+        with self._cond:
+            self._stopped = True
+            thread = self._thread
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def replay_spool(self):
+        """spool 파일의 메시지를 DB에 저장하고 (거부된 행은 dead-letter 파일로), 성공하면 파일을 비움"""
+        with self._spool_lock:
+            rows = self._read_spool()
+            if not rows:
+                return 0
+            replayed = 0
+            for start in range(0, len(rows), self.batch_size):
+                replayed += self._write_rows(rows[start : start + self.batch_size])
+            os.remove(self.spool_path)
+        with self._cond:
+            self._replayed += replayed
+        print(f"Replayed {replayed} spooled chat messages.")
+        return replayed
+
+    def stats(self):
+        """journal 처리 현황"""
+        with self._cond:
+            return {
+                "pending": self._pending,
+                "written": self._written,
+                "batches": self._batches,
+                "spooled": self._spooled,
+                "replayed": self._replayed,
+                "rejected": self._rejected,
+                "failures": self._failures,
+                "last_error": self._last_error,
+                "spool_exists": os.path.exists(self.spool_path),
+            }
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name="message-journal", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                row = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._maybe_replay()
+                continue
+            if row is None:
+                return
+
+            batch = [row]
+            while len(batch) < self.batch_size:
+                try:
+                    row = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if row is None:
+                    self._queue.put(None)  # 종료 신호는 현재 batch 처리 후 반영
+                    break
+                batch.append(row)
+
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        written = None
+        # spool에 남은 메시지를 먼저 저장해야 새 메시지를 DB에 바로 저장
+        if self._db_available() and self._maybe_replay():
+            try:
+                written = self._write_rows(batch)
+            except Exception as e:
+                self._record_failure(e)
+
+        if written is None:
+            try:
+                self._append_spool(batch)
+            except Exception as e:
+                # spool 파일도 쓸 수 없는 경우에만 메시지 유실
+                print(f"Error spooling {len(batch)} chat messages: {e}")
+
+        with self._cond:
+            if written is not None:
+                self._written += written
+                self._batches += 1
+            self._pending -= len(batch)
+            self._cond.notify_all()
+
+    def _write_rows(self, rows):
+        """
+        rows를 저장하고 저장한 메시지 수 반환
+        (row_errors면 한 행씩 다시 저장하여 거부된 행만 dead-letter 파일로, 그 밖의 예외는 그대로 전달)
+        """
+        try:
+            self._writer(rows)
+            return len(rows)
+        except self.row_errors as e:
+            if len(rows) == 1:
+                self.reject(rows, e)
+                return 0
+        written = 0
+        for row in rows:
+            try:
+                self._writer([row])
+                written += 1
+            except self.row_errors as e:
+                self.reject([row], e)
+        return written
+
+    def _db_available(self):
+        return time.monotonic() - self._last_failure >= self.retry_interval
+
+    def _maybe_replay(self):
+        """spool이 비어 있거나 replay에 성공하면 True"""
+        if not os.path.exists(self.spool_path):
+            return True
+        if not self._db_available():
+            return False
+        try:
+            self.replay_spool()
+            return True
+        except Exception as e:
+            self._record_failure(e)
+            return False
+
+    def _record_failure(self, error):
+        self._last_failure = time.monotonic()
+        with self._cond:
+            self._failures += 1
+            self._last_error = str(error)
+        print(f"Error writing chat messages, spooling to {self.spool_path}: {error}")
+
+    def _append_spool(self, batch):
+        with self._spool_lock:
+            self._append_rows(self.spool_path, batch)
+        with self._cond:
+            self._spooled += len(batch)
+
+    def _append_rows(self, path, rows, **extra):
+        with open(path, "a", encoding="utf-8") as f:
+            for row in rows:
+                record = dict(row, timestamp=row["timestamp"].isoformat(), **extra)
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _read_spool(self):
+        if not os.path.exists(self.spool_path):
+            return []
+        rows = []
+        with open(self.spool_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # 프로세스 중단으로 잘린 마지막 줄 등은 건너뜀
+                    print("Skipping malformed line in message spool.")
+                    continue
+                record["timestamp"] = datetime.fromisoformat(record["timestamp"])
+                rows.append(record)
+        return rows
+
+
+def register_shutdown(journal):
+    """프로세스 종료 시 남은 메시지를 저장하도록 등록"""
+    atexit.register(journal.close)
+    return journal
@@ -0,0 +1,363 @@
+"""
+DB 접근 함수 계측 (histogram + slow query log)
+
+- @instrument("get_chat_history") 로 감싼 함수마다 전체 소요 시간, 풀 대기 시간,
+  쿼리 실행 시간, 반환 행 수, 오류 횟수를 프로세스 내 histogram에 기록
+- 풀 대기 / 쿼리 실행 시간은 호출 중인 함수(contextvar)에 누적되므로
+  db.py 내부 helper를 거쳐도 바깥 함수 기준으로 집계
+- async_db.py의 coroutine / async generator도 같은 decorator로 계측 (동시에 실행 중인 task의 시간은 섞이지 않음)
+- threshold 보다 느린 호출은 "backend.slow_query" logger에 JSON 한 줄로 기록
+  (파라미터는 값이 아닌 타입 / 길이만 기록)
+- snapshot()을 JSON(to_json) 또는 Prometheus text 형식(to_prometheus)으로 내보내기
+- 프로세스 메모리(RSS / 최대 RSS)도 함께 내보냄 (process_memory)
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+slow_query_logger = logging.getLogger("backend.slow_query")
+
+# histogram bucket 상한 (초)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROW_BUCKETS = (0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000)
+
+# 계측 항목 (이름, bucket, 설명)
+SERIES = (
+    ("duration_seconds", DURATION_BUCKETS, "Total time spent in the DB function"),
+    ("pool_wait_seconds", DURATION_BUCKETS, "Time spent waiting for a pooled connection"),
+    ("execute_seconds", DURATION_BUCKETS, "Time spent executing SQL statements"),
+    ("rows", ROW_BUCKETS, "Rows returned by the DB function"),
+)
+
+# 느린 호출 기준 (초, configure()로 변경)
+_slow_threshold = 0.2
+
+# 현재 실행 중인 계측 함수의 누적 값 (스레드 / asyncio task별로 분리)
+_current_call = ContextVar("db_call", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        """
+        :param buckets: bucket 상한 값 (오름차순)
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """값 하나 기록"""
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """누적 bucket 개수, 합계, 개수"""
+        cumulative, total = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            cumulative.append((bound, total))
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+
+class _FunctionMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.slow = 0
+        self.histograms = {name: Histogram(buckets) for name, buckets, _ in SERIES}
+
+
+_metrics = {}
+_lock = threading.Lock()
+
+
+def configure(slow_threshold=0.2):
+    """느린 호출 기준 시간(초) 설정"""
+    global _slow_threshold
+    _slow_threshold = slow_threshold
+
+
+def add_pool_wait(seconds):
+    """현재 계측 중인 호출에 풀 대기 시간 누적 (저장소가 연결을 대여할 때 호출)"""
+    call = _current_call.get()
+    if call is not None:
+        call["pool_wait"] += seconds
+
+
+def add_execute(seconds, error=False):
+    """현재 계측 중인 호출에 쿼리 실행 시간 누적 (queries.timed에서 호출)"""
+    call = _current_call.get()
+    if call is not None:
+        call["execute"] += seconds
+        call["statements"] += 1
+        call["error"] = call["error"] or error
+
+
+def _shape(value):
+    # 값 대신 타입과 길이만 남김
+    if isinstance(value, (str, bytes, list, tuple, set, dict)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shape(args, kwargs):
+    """파라미터 타입 / 길이 요약 (값은 기록하지 않음)"""
+    shape = [_shape(arg) for arg in args]
+    shape += [f"{key}={_shape(value)}" for key, value in sorted(kwargs.items())]
+    return shape
+
+
+def _count_rows(result):
+    # 조회 결과 리스트 또는 (리스트, next_cursor) 페이지만 행 수로 집계
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and len(result) == 2 and isinstance(result[0], list):
+        return len(result[0])
+    return None
+
+
+def _record(name, call, elapsed, rows, error, args, kwargs):
+    error = error or call["error"]
+    slow = elapsed >= _slow_threshold
+    with _lock:
+        metrics = _metrics.setdefault(name, _FunctionMetrics())
+        metrics.calls += 1
+        metrics.errors += error
+        metrics.slow += slow
+        metrics.histograms["duration_seconds"].observe(elapsed)
+        metrics.histograms["pool_wait_seconds"].observe(call["pool_wait"])
+        metrics.histograms["execute_seconds"].observe(call["execute"])
+        if rows is not None:
+            metrics.histograms["rows"].observe(rows)
+
+    if slow:
+        slow_query_logger.warning(
+            json.dumps(
+                {
+                    "function": name,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "pool_wait_ms": round(call["pool_wait"] * 1000, 3),
+                    "execute_ms": round(call["execute"] * 1000, 3),
+                    "statements": call["statements"],
+                    "rows": rows,
+                    "error": bool(error),
+                    "params": param_shape(args, kwargs),
+                },
+                ensure_ascii=False,
+            )
+        )
+
+
+def _new_call():
+    return {"pool_wait": 0.0, "execute": 0.0, "statements": 0, "error": False}
+
+
+def instrument(name):
+    """
+    DB 접근 함수 계측 decorator
+    (일반 함수, generator, coroutine, async generator 지원 - generator는 끝까지 소비한 시점 기준)
+    """
+
+    def decorator(func):
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def async_gen_wrapper(*args, **kwargs):
+                call, rows, error = _new_call(), 0, False
+                start = time.perf_counter()
+                agen = func(*args, **kwargs)
+                try:
+                    while True:
+                        # 다음 chunk를 가져오는 동안에만 호출 컨텍스트 설정
+                        token = _current_call.set(call)
+                        try:
+                            chunk = await agen.__anext__()
+                        except StopAsyncIteration:
+                            break
+                        finally:
+                            _current_call.reset(token)
+                        rows += len(chunk)
+                        yield chunk
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    await agen.aclose()
+                    _record(name, call, time.perf_counter() - start, rows, error, args, kwargs)
+
+            return async_gen_wrapper
+
+        if inspect.isgeneratorfunction(func):
+
+            @functools.wraps(func)
+            def gen_wrapper(*args, **kwargs):
+                call, rows, error = _new_call(), 0, False
+                start = time.perf_counter()
+                gen = func(*args, **kwargs)
+                try:
+                    while True:
+                        # 다음 chunk를 가져오는 동안에만 호출 컨텍스트 설정
+                        token = _current_call.set(call)
+                        try:
+                            chunk = next(gen)
+                        except StopIteration:
+                            break
+                        finally:
+                            _current_call.reset(token)
+                        rows += len(chunk)
+                        yield chunk
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    gen.close()
+                    _record(name, call, time.perf_counter() - start, rows, error, args, kwargs)
+
+            return gen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                call, result, error = _new_call(), None, False
+                token = _current_call.set(call)
+                start = time.perf_counter()
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                except Exception:
+                    error = True
+                    raise
+                finally:
+                    _current_call.reset(token)
+                    elapsed = time.perf_counter() - start
+                    _record(name, call, elapsed, _count_rows(result), error, args, kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            call, result, error = _new_call(), None, False
+            token = _current_call.set(call)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                return result
+            except Exception:
+                error = True
+                raise
+            finally:
+                _current_call.reset(token)
+                elapsed = time.perf_counter() - start
+                _record(name, call, elapsed, _count_rows(result), error, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def snapshot():
+    """함수별 호출 / 오류 / 느린 호출 횟수와 histogram"""
+    with _lock:
+        return {
+            name: {
+                "calls": metrics.calls,
+                "errors": metrics.errors,
+                "slow": metrics.slow,
+                **{
+                    series: histogram.snapshot()
+                    for series, histogram in metrics.histograms.items()
+                },
+            }
+            for name, metrics in _metrics.items()
+        }
+
+
+def reset():
+    """모든 지표 초기화"""
+    with _lock:
+        _metrics.clear()
+
+
+def process_memory():
+    """현재 프로세스의 RSS와 최대 RSS (bytes, 확인할 수 없으면 None)"""
+    rss = peak = None
+    try:
+        with open("/proc/self/statm") as f:  # Linux: 두 번째 값이 상주 page 수
+            rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux는 KB 단위
+    except ImportError:  # Windows
+        pass
+    return {"rss_bytes": rss, "max_rss_bytes": peak}
+
+
+def to_json(indent=None):
+    """snapshot을 JSON 문자열로 반환"""
+    return json.dumps(
+        {
+            "slow_threshold_seconds": _slow_threshold,
+            "process": process_memory(),
+            "functions": snapshot(),
+        },
+        indent=indent,
+    )
+
+
+def to_prometheus(prefix="chatbot_db"):
+    """snapshot을 Prometheus text exposition 형식으로 반환"""
+    data = snapshot()
+    lines = []
+
+    for counter, help_text in (
+        ("calls", "DB function calls"),
+        ("errors", "DB function calls that raised or hit an SQL error"),
+        ("slow", "DB function calls slower than the slow query threshold"),
+    ):
+        metric = f"{prefix}_{counter}_total"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, values in sorted(data.items()):
+            lines.append(f'{metric}{{function="{name}"}} {values[counter]}')
+
+    for series, _, help_text in SERIES:
+        metric = f"{prefix}_{series}"
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for name, values in sorted(data.items()):
+            histogram = values[series]
+            for bound, count in histogram["buckets"]:
+                lines.append(f'{metric}_bucket{{function="{name}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{function="{name}"}} {histogram["sum"]}')
+            lines.append(f'{metric}_count{{function="{name}"}} {histogram["count"]}')
+
+    memory = process_memory()
+    for name, help_text in (
+        ("rss_bytes", "Resident set size of the process"),
+        ("max_rss_bytes", "Peak resident set size of the process"),
+    ):
+        value = memory[name]
+        if value is not None:
+            metric = f"{prefix}_process_{name}"
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,310 @@
+"""
+DB 스키마 버전 관리 (migration)
+
+- users / chat_sessions / chat_messages 테이블과 조회 경로별 인덱스를 버전 순서대로 적용
+- 적용된 버전은 schema_migrations 테이블에 기록되므로 여러 번 실행해도 안전 (idempotent)
+- 여러 프로세스가 동시에 실행해도 advisory lock으로 한 번만 적용
+- CREATE INDEX CONCURRENTLY가 중간에 실패하면 INVALID 인덱스가 남고 IF NOT EXISTS가 이를 통과시키므로,
+  만들기 전에 같은 이름의 INVALID 인덱스를 삭제하고 만든 뒤 유효한지 확인 (유효하지 않으면 migration 실패)
+- PostgreSQL 저장소 전용 (SQLite 저장소는 첫 연결 시 스키마를 직접 생성)
+- check 명령은 등록된 주요 쿼리(backend/queries.py)를 EXPLAIN 하여 hot table에 Seq Scan이 있으면 실패
+
+실행 예시:
+    python -m backend.migrations upgrade   # 미적용 migration 적용
+    python -m backend.migrations status    # 적용 현황 출력
+    python -m backend.migrations check     # 쿼리 실행 계획 점검 (Seq Scan 발견 시 exit 1)
+"""
+
+import argparse
+import json
+import re
+import sys
+from datetime import datetime, timezone
+
+from psycopg2 import extensions
+
+from backend import queries
+from backend.db import db_connection
+
+# migration 동시 실행 방지용 advisory lock 키
+MIGRATION_LOCK_ID = 7_245_001
+
+# (버전, 설명, SQL 리스트, CONCURRENTLY 사용 여부)
+# CONCURRENTLY 인덱스는 트랜잭션 밖에서 실행해야 하므로 autocommit으로 실행
+MIGRATIONS = [
+    (
+        1,
+        "base schema",
+        [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                id SERIAL PRIMARY KEY,
+                username VARCHAR(50) NOT NULL UNIQUE,
+                password TEXT NOT NULL,
+                is_active BOOLEAN NOT NULL DEFAULT TRUE,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS chat_sessions (
+                id SERIAL PRIMARY KEY,
+                user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS chat_messages (
+                id SERIAL PRIMARY KEY,
+                session_id INTEGER NOT NULL REFERENCES chat_sessions (id) ON DELETE CASCADE,
+                sender VARCHAR(10) NOT NULL,
+                message TEXT NOT NULL,
+                timestamp TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """,
+        ],
+        False,
+    ),
+    (
+        2,
+        "client-side message ids for the write-behind journal",
+        [
+            "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS message_uid UUID;",
+            """
+            CREATE UNIQUE INDEX IF NOT EXISTS chat_messages_message_uid_key
+            ON chat_messages (message_uid);
+            """,
+        ],
+        False,
+    ),
+    (
+        3,
+        "hot-path indexes",
+        [
+            # get_chat_history(_page): session_id 조건 + (timestamp, id) 정렬
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS chat_messages_session_ts_idx
+            ON chat_messages (session_id, timestamp, id);
+            """,
+            # get_user_chat_sessions(_page): user_id 조건 + (created_at, id) 최신순
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS chat_sessions_user_created_idx
+            ON chat_sessions (user_id, created_at DESC, id DESC);
+            """,
+            # get_all_chat_sessions(_page): 전체 세션 최신순
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS chat_sessions_created_idx
+            ON chat_sessions (created_at DESC, id DESC);
+            """,
+            # purge 작업: 비활성 사용자 조회
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS users_inactive_idx
+            ON users (id) WHERE is_active = FALSE;
+            """,
+            # authenticate / get_user_id: username 조회 (기존 DB에 UNIQUE가 없는 경우 대비)
+            """
+            DO $$
+            BEGIN
+                IF NOT EXISTS (
+                    SELECT 1
+                    FROM pg_index i
+                    JOIN pg_attribute a
+                      ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+                    WHERE i.indrelid = 'users'::regclass AND a.attname = 'username'
+                ) THEN
+                    CREATE UNIQUE INDEX users_username_idx ON users (username);
+                END IF;
+            END
+            $$;
+            """,
+        ],
+        True,
+    ),
+]
+
+# CONCURRENTLY로 만드는 인덱스 이름
+_CONCURRENT_INDEX = re.compile(
+    r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.IGNORECASE
+)
+
+# Seq Scan이 나오면 안 되는 테이블
+HOT_TABLES = {"users", "chat_sessions", "chat_messages"}
+
+_NOW = datetime.now(timezone.utc)
+
+# check 명령에서 실행 계획을 확인할 등록 쿼리와 예시 파라미터 (backend/queries.py)
+EXPLAIN_SAMPLES = {
+    "authenticate": ("",),
+    "get_user_id": ("",),
+    "create_chat_session": (0,),
+    "insert_chat_messages": (
+        ["00000000-0000-0000-0000-000000000000"], [0], ["user"], [""], [_NOW]
+    ),
+    "deactivate_user": ("",),
+    "get_chat_history": (0,),
+    "get_chat_history_page": (0, 51),
+    "get_chat_history_page_after": (0, _NOW, 0, 51),
+    "get_user_chat_sessions": (0,),
+    "get_user_chat_sessions_page": (0, 51),
+    "get_user_chat_sessions_page_before": (0, _NOW, 0, 51),
+    "get_user_questions": (0, 100),
+    "get_all_chat_sessions": (),
+    "get_all_chat_sessions_page": (51,),
+    "get_all_chat_sessions_page_before": (_NOW, 0, 51),
+    "delete_chat_messages": (0,),
+    "delete_chat_session": (0,),
+    "delete_all_user_sessions": (0,),
+    "purge_pending_users": (),
+    "purge_messages_batch": (0, 1000),
+    "purge_sessions_batch": (0, 1000),
+}
+
+
+def explain_queries():
+    """실행 계획을 확인할 (이름, SQL, 파라미터) 목록"""
+    return [
+        (name, *queries.to_pyformat(name, params))
+        for name, params in EXPLAIN_SAMPLES.items()
+    ]
+
+
+def _ensure_migrations_table(cur):
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        """
+    )
+
+
+def _index_valid(cur, name):
+    # 인덱스가 없으면 None, 있으면 pg_index.indisvalid
+    cur.execute(
+        """
+        SELECT i.indisvalid
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE c.relname = %s AND pg_table_is_visible(c.oid);
+        """,
+        (name,),
+    )
+    row = cur.fetchone()
+    return None if row is None else row[0]
+
+
+def _create_index_concurrently(cur, statement, name):
+    # 이전 실행이 실패하여 남은 INVALID 인덱스는 삭제 후 다시 생성
+    if _index_valid(cur, name) is False:
+        print(f"Dropping invalid index {name}")
+        cur.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name};")
+    cur.execute(statement)
+    if not _index_valid(cur, name):
+        raise RuntimeError(f"Index {name} is invalid after CREATE INDEX CONCURRENTLY")
+
+
+def applied_versions():
+    """적용된 migration 버전 목록"""
+    with db_connection() as conn:
+        with conn.cursor() as cur:
+            _ensure_migrations_table(cur)
+            cur.execute("SELECT version FROM schema_migrations ORDER BY version;")
+            versions = [row[0] for row in cur.fetchall()]
+        conn.commit()
+    return versions
+
+
+def upgrade():
+    """미적용 migration을 버전 순서대로 적용하고, 적용한 버전 목록 반환"""
+    applied = []
+    with db_connection() as conn:
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_lock(%s);", (MIGRATION_LOCK_ID,))
+                try:
+                    _ensure_migrations_table(cur)
+                    cur.execute("SELECT version FROM schema_migrations;")
+                    done = {row[0] for row in cur.fetchall()}
+
+                    for version, description, statements, concurrent in MIGRATIONS:
+                        if version in done:
+                            continue
+                        print(f"Applying migration {version}: {description}")
+                        if not concurrent:
+                            cur.execute("BEGIN;")
+                        for statement in statements:
+                            match = _CONCURRENT_INDEX.search(statement)
+                            if match:
+                                _create_index_concurrently(cur, statement, match.group(1))
+                            else:
+                                cur.execute(statement)
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, description) VALUES (%s, %s);",
+                            (version, description),
+                        )
+                        if not concurrent:
+                            cur.execute("COMMIT;")
+                        applied.append(version)
+                finally:
+                    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                        # 실패한 트랜잭션 정리
+                        cur.execute("ROLLBACK;")
+                    cur.execute("SELECT pg_advisory_unlock(%s);", (MIGRATION_LOCK_ID,))
+        finally:
+            conn.autocommit = False
+    return applied
+
+
+def _find_seq_scans(plan, found):
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in HOT_TABLES:
+        found.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        _find_seq_scans(child, found)
+    return found
+
+
+def check():
+    """
+    주요 쿼리의 실행 계획을 확인하여 hot table Seq Scan 목록 반환
+    (작은 테이블에서는 인덱스가 있어도 Seq Scan을 고르므로 enable_seqscan = off로 확인)
+    """
+    problems = {}
+    with db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SET LOCAL enable_seqscan = off;")
+                for name, query, params in explain_queries():
+                    cur.execute("EXPLAIN (FORMAT JSON) " + query, params)
+                    plan = cur.fetchone()[0]
+                    if isinstance(plan, str):
+                        plan = json.loads(plan)
+                    seq_scans = _find_seq_scans(plan[0]["Plan"], [])
+                    if seq_scans:
+                        problems[name] = sorted(set(seq_scans))
+        finally:
+            conn.rollback()  # EXPLAIN만 수행하므로 변경 사항 없음
+    return problems
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DB 스키마 migration 관리")
+    parser.add_argument("command", choices=["upgrade", "status", "check"])
+    args = parser.parse_args()
+
+    if args.command == "upgrade":
+        applied = upgrade()
+        print(f"Applied migrations: {applied}" if applied else "Schema is up to date.")
+    elif args.command == "status":
+        done = set(applied_versions())
+        for version, description, _, _ in MIGRATIONS:
+            mark = "applied" if version in done else "pending"
+            print(f"{version:>3}  {mark:<8} {description}")
+    else:
+        problems = check()
+        for name, tables in problems.items():
+            print(f"❌ {name}: Seq Scan on {', '.join(tables)}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ {len(explain_queries())} queries use index paths on hot tables.")
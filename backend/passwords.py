@@ -0,0 +1,213 @@
+"""
+비밀번호 해싱 (bcrypt, 별도 프로세스에서 실행)
+
+- bcrypt는 의도적으로 느린 CPU 작업이므로 Streamlit 스크립트 스레드에서 직접 실행하지 않고
+  최대 workers개 프로세스로 제한된 process pool에서 실행 (로그인이 몰려도 다른 세션이 멈추지 않음)
+- 동시에 대기할 수 있는 해싱 작업 수를 max_pending으로 제한하여 과부하 시 호출부에서 대기
+- cost(rounds)는 설정으로 조정하고, calibrate_cost()로 목표 지연 시간에 맞는 값을 계산
+- 저장된 해시의 cost가 현재 설정과 다르면 needs_rehash()가 True
+  (로그인 성공 시 hash_password_async()로 기다리지 않고 재해싱)
+- 해싱 작업이 timeout 안에 끝나지 않으면 concurrent.futures.TimeoutError (호출부는 UNAVAILABLE_ERRORS로 처리)
+
+실행 예시: python -m backend.passwords calibrate --target-ms 250
+"""
+
+import argparse
+import multiprocessing
+import threading
+import time
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+from backend.settings import PASSWORD_HASH_CONFIG
+
+# 현재 설정 (configure()로 변경)
+_rounds = PASSWORD_HASH_CONFIG["rounds"]
+_workers = PASSWORD_HASH_CONFIG["workers"]
+_max_pending = PASSWORD_HASH_CONFIG["max_pending"]
+_timeout = PASSWORD_HASH_CONFIG["timeout"]
+
+_executor = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(_max_pending)
+
+# 해싱 작업을 처리하지 못한 경우의 예외 (timeout 초과, process pool 실패)
+# Python 3.10에서는 concurrent.futures.TimeoutError가 내장 TimeoutError의 하위 클래스가 아니므로 따로 포함
+UNAVAILABLE_ERRORS = (futures.TimeoutError, TimeoutError, BrokenProcessPool)
+
+
+def _hash(password, rounds):
+    # process pool에서 실행 (pickle 가능한 모듈 함수)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode(), hashed.encode("utf-8"))
+
+
+def configure(rounds=None, workers=None, max_pending=None, timeout=None):
+    """cost / process 수 / 최대 대기 작업 수 / 대기 시간 설정 (변경 시 process pool 재생성)"""
+    global _rounds, _workers, _max_pending, _timeout, _slots
+    if rounds is not None:
+        if not 4 <= rounds <= 31:
+            raise ValueError("bcrypt rounds must be between 4 and 31")
+        _rounds = rounds
+    if timeout is not None:
+        _timeout = timeout
+    if max_pending is not None:
+        _max_pending = max_pending
+        _slots = threading.BoundedSemaphore(max_pending)
+    if workers is not None:
+        _workers = workers
+        shutdown()
+
+
+def current_rounds():
+    """새 해시에 사용할 cost"""
+    return _rounds
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # Streamlit 서버는 여러 스레드를 사용하므로 fork 대신 forkserver / spawn으로 프로세스 생성
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context(
+                    "forkserver" if "forkserver" in methods else "spawn"
+                )
+                _executor = ProcessPoolExecutor(max_workers=_workers, mp_context=context)
+    return _executor
+
+
+def shutdown():
+    """process pool 종료 (다음 호출 시 다시 생성)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(func, *args):
+    if _workers <= 0:
+        return func(*args)  # workers=0이면 호출 스레드에서 직접 실행
+
+    with _slots:  # 대기 중인 작업이 max_pending개를 넘으면 여기서 대기
+        try:
+            future = _get_executor().submit(func, *args)
+            try:
+                return future.result(timeout=_timeout)
+            except futures.TimeoutError:
+                future.cancel()  # 아직 시작하지 않았으면 실행하지 않음
+                raise
+        except BrokenProcessPool as e:
+            # worker 프로세스가 죽은 경우 pool을 다시 만들고 이번 요청은 직접 처리
+            print(f"Password hashing pool failed, retrying inline: {e}")
+            shutdown()
+            return func(*args)
+
+
+def hash_password(password, rounds=None):
+    """비밀번호를 bcrypt로 해싱 (rounds를 생략하면 현재 설정값 사용)"""
+    return _run(_hash, password, rounds or _rounds)
+
+
+def hash_password_async(password, callback, rounds=None):
+    """
+    해싱을 process pool에 제출하고 기다리지 않음, 끝나면 결과 처리 스레드에서 callback(해시) 호출
+    (대기 중인 작업이 max_pending개면 제출하지 않고 None, workers=0이면 직접 실행, 그 외에는 Future 반환)
+    """
+    rounds = rounds or _rounds
+    if _workers <= 0:
+        callback(_hash(password, rounds))
+        return None
+
+    slots = _slots  # configure()로 교체되어도 같은 semaphore에 반환
+    if not slots.acquire(blocking=False):
+        return None
+    try:
+        future = _get_executor().submit(_hash, password, rounds)
+    except Exception as e:
+        slots.release()
+        print(f"Error submitting password hashing: {e}")
+        shutdown()
+        return None
+
+    def done(future):
+        slots.release()
+        try:
+            callback(future.result())
+        except Exception as e:
+            print(f"Error in background password hashing: {e}")
+
+    future.add_done_callback(done)
+    return future
+
+
+def hash_passwords(passwords, rounds=None):
+    """비밀번호 여러 개를 process pool의 모든 worker에 나눠 해싱 (대량 등록용, 입력 순서대로 반환)"""
+    passwords = list(passwords)
+    rounds = rounds or _rounds
+    if _workers <= 0 or len(passwords) < 2:
+        return [_hash(password, rounds) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (_workers * 4))  # worker 간 분배와 IPC 횟수의 균형
+    try:
+        return list(
+            _get_executor().map(_hash, passwords, [rounds] * len(passwords), chunksize=chunksize)
+        )
+    except BrokenProcessPool as e:
+        print(f"Password hashing pool failed, retrying inline: {e}")
+        shutdown()
+        return [_hash(password, rounds) for password in passwords]
+
+
+def verify_password(password, hashed):
+    """비밀번호가 해시와 일치하는지 확인"""
+    return _run(_check, password, hashed)
+
+
+def hash_rounds(hashed):
+    """bcrypt 해시 문자열에 기록된 cost ($2b$12$... -> 12)"""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    """저장된 해시의 cost가 현재 설정과 다르면 True"""
+    return hash_rounds(hashed) != _rounds
+
+
+def calibrate_cost(target_ms=250.0, min_rounds=10, max_rounds=16):
+    """
+    이 서버에서 해시 한 번이 target_ms 안에 끝나는 가장 큰 cost 계산
+    (cost가 1 오를 때마다 시간이 약 2배가 되므로 target을 넘는 첫 값 직전에서 멈춤)
+    """
+    chosen = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        _hash("calibration-password", rounds)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="bcrypt cost 보정")
+    parser.add_argument("command", choices=["calibrate"])
+    parser.add_argument("--target-ms", type=float, default=250.0, help="해시 한 번의 목표 시간")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=16)
+    args = parser.parse_args()
+
+    rounds = calibrate_cost(args.target_ms, args.min_rounds, args.max_rounds)
+    print(f"Recommended BCRYPT_ROUNDS = {rounds} (target {args.target_ms:.0f} ms)")
@@ -1,6 +1,9 @@
 from pinecone.grpc import PineconeGRPC as Pinecone
 from pinecone import ServerlessSpec
 from dotenv import load_dotenv
+from backend import retrieval_cache
+from backend.embedding_cache import embed_cached
+from backend.pinecone_retriever import query_concurrently
 
 # .env 파일 로드
 load_dotenv()
@@ -60,30 +63,43 @@ class PineconeWrapper:
         # 인덱스 객체 가져오기
         self.index = self.pc.Index(self.index_name)
 
-    def upsert_data(self, data, model="multilingual-e5-large"):
+    def embed(self, texts, model="multilingual-e5-large", input_type="passage", **parameters):
         """
-        주어진 데이터를 임베딩 후 업서트
+        Pinecone inference로 텍스트를 임베딩 (영구 캐시에 있는 텍스트는 API 호출 생략)
+        :return: 입력 순서대로 벡터(list) 리스트
+        """
+        def compute(missing):
+            response = self.pc.inference.embed(
+                model=model, inputs=missing, parameters={"input_type": input_type, **parameters}
+            )
+            return [item["values"] for item in response]
+
+        return embed_cached(compute, model, input_type, texts)
+
+    def upsert_data(self, data, model="multilingual-e5-large", batch_size=96):
+        """
+        주어진 데이터를 임베딩 후 업서트 (요청 크기 제한을 넘지 않도록 batch_size개씩 나눠 처리)
         :param data: [{"id": ..., "text": ...}, ...] 형태의 데이터 리스트
         :param model: 사용 할 임베딩 모델 이름
+        :param batch_size: 한 번에 임베딩 / 업서트할 개수 (문서 전체 적재는 backend/ingest.py 사용)
         """
-        # 임베딩 수행: data의 "text" 항목들을 embed
-        texts = [item["text"] for item in data]
-        embeddings = self.pc.inference.embed(
-            model=model,
-            inputs=texts,
-            parameters={"input_type": "passage", "truncate": "END"},
-        )
-        records = []
-        for item, emb in zip(data, embeddings):
-            records.append(
-                {
-                    "id": item["id"],
-                    "values": emb["values"],
-                    "metadata": {"text": item["text"]},
-                }
-            )
-        # 업서트 수행 (namespace 사용)
-        self.index.upsert(vectors=records, namespace=self.namespace)
+        for start in range(0, len(data), batch_size):
+            batch = data[start:start + batch_size]
+            # 임베딩 수행: data의 "text" 항목들을 embed (이미 임베딩한 텍스트는 캐시 사용)
+            texts = [item["text"] for item in batch]
+            embeddings = self.embed(texts, model, "passage", truncate="END")
+            records = []
+            for item, values in zip(batch, embeddings):
+                records.append(
+                    {
+                        "id": item["id"],
+                        "values": values,
+                        "metadata": {"text": item["text"]},
+                    }
+                )
+            # 업서트 수행 (namespace 사용)
+            self.index.upsert(vectors=records, namespace=self.namespace)
+        retrieval_cache.invalidate()  # 이전 인덱스 기준 검색 결과 버림
         print("✅ 데이터 업서트 완료.")
 
     def query(self, query_text, model="multilingual-e5-large", top_k=3):
@@ -94,18 +110,38 @@ class PineconeWrapper:
         :param top_k: 반환할 상위 유사 벡터 수
         :return: 검색 결과 (dict)
         """
-        query_embedding = self.pc.inference.embed(
-            model=model, inputs=[query_text], parameters={"input_type": "query"}
-        )
+        query_embedding = self.embed([query_text], model, "query")
         results = self.index.query(
             namespace=self.namespace,
-            vector=query_embedding[0].values,
+            vector=query_embedding[0],
             top_k=top_k,
             include_values=False,
             include_metadata=True,
         )
         return results
 
+    def query_many(self, query_texts, model="multilingual-e5-large", top_k=3, **query_kwargs):
+        """
+        여러 쿼리를 임베딩 요청 한 번으로 임베딩하고, 인덱스 검색은 같은 gRPC 채널로 동시에 실행
+        :param query_texts: 검색할 문장 리스트
+        :param model: 사용 할 임베딩 모델 이름 (query 용)
+        :param top_k: 쿼리별 반환할 상위 유사 벡터 수
+        :param query_kwargs: index.query에 전달할 추가 값 (filter 등)
+        :return: 입력 순서대로 검색 결과 리스트
+        """
+        if not query_texts:
+            return []
+        query_embeddings = self.embed(list(query_texts), model, "query")
+        return query_concurrently(
+            self.index,
+            query_embeddings,
+            self.namespace,
+            top_k=top_k,
+            include_values=False,
+            include_metadata=True,
+            **query_kwargs,
+        )
+
 
 # main.py에서 실행할 것
 
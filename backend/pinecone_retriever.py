@@ -0,0 +1,113 @@
+"""
+Pinecone gRPC 클라이언트 기반 검색
+
+- 여러 질의 벡터의 index.query를 프로세스 공용 스레드 풀에서 동시에 실행하고 입력 순서대로 결과 반환
+  (gRPC index 객체 하나가 채널 하나를 재사용하며, 채널은 동시 요청을 다중화)
+- PineconeRetriever는 LangChain retriever 인터페이스로 같은 index 객체를 사용 (RETRIEVAL_BACKEND=grpc)
+- search_many()로 여러 주제의 검색어를 임베딩 요청 한 번 + 동시 조회로 처리
+- MMR은 fetch_k개 후보의 벡터를 받아 LocalVectorIndex.mmr_search로 선택 (local 검색과 같은 방식)
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from backend.local_index import TEXT_KEY, LocalVectorIndex
+from backend.settings import PINECONE_QUERY_CONFIG
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """index.query를 동시에 실행할 프로세스 공용 스레드 풀 (처음 사용할 때 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=PINECONE_QUERY_CONFIG["max_workers"], thread_name_prefix="pinecone-query"
+            )
+        return _executor
+
+
+def query_concurrently(index, vectors, namespace, **query_kwargs):
+    """
+    질의 벡터마다 index.query를 동시에 실행
+    :param index: Pinecone index (gRPC index 권장, 스레드 간 공유 가능)
+    :param vectors: 질의 벡터 리스트
+    :param namespace: 검색할 namespace
+    :param query_kwargs: index.query에 전달할 값 (top_k, filter, include_metadata 등)
+    :return: 입력 순서대로 QueryResponse 리스트 (하나라도 실패하면 예외)
+    """
+    if len(vectors) == 1:  # 하나면 스레드 전환 없이 바로 조회
+        return [index.query(vector=list(vectors[0]), namespace=namespace, **query_kwargs)]
+    futures = [
+        get_executor().submit(index.query, vector=list(vector), namespace=namespace, **query_kwargs)
+        for vector in vectors
+    ]
+    return [future.result() for future in futures]
+
+
+def _document(match):
+    metadata = dict(match.metadata or {})
+    text = metadata.pop(TEXT_KEY, "")
+    return Document(page_content=text, metadata=metadata, id=match.id)
+
+
+class PineconeRetriever(BaseRetriever):
+    """Pinecone index(gRPC)를 직접 조회하는 retriever (langchain_pinecone retriever와 같은 search_type / search_kwargs)"""
+
+    index: Any
+    embeddings: Embeddings
+    namespace: str = ""
+    search_type: str = "similarity"
+    search_kwargs: Dict[str, Any] = {}
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return self._search([self.embeddings.embed_query(query)])[0]
+
+    def search_many(self, queries: List[str]) -> List[List[Document]]:
+        """여러 검색어를 한 번에 검색하여 입력 순서대로 문서 리스트 반환"""
+        if not queries:
+            return []
+        # OpenAI 임베딩은 질의 / 문서 구분이 없으므로 검색어 전체를 요청 한 번으로 계산
+        return self._search(self.embeddings.embed_documents(list(queries)))
+
+    def _search(self, query_vectors):
+        k = self.search_kwargs.get("k", 4)
+        mmr = self.search_type == "mmr"
+        responses = query_concurrently(
+            self.index,
+            query_vectors,
+            self.namespace,
+            top_k=self.search_kwargs.get("fetch_k", 20) if mmr else k,
+            filter=self.search_kwargs.get("filter"),
+            include_values=mmr,
+            include_metadata=True,
+        )
+        results = []
+        for query_vector, response in zip(query_vectors, responses):
+            matches = list(response.matches)
+            if mmr and matches:
+                candidates = LocalVectorIndex(
+                    [match.id for match in matches],
+                    [match.values for match in matches],
+                    [dict(match.metadata or {}) for match in matches],
+                )
+                positions = candidates.mmr_search(
+                    query_vector,
+                    k=k,
+                    fetch_k=len(matches),
+                    lambda_mult=self.search_kwargs.get("lambda_mult", 0.5),
+                )
+                results.append([candidates.document(i) for i in positions])
+            else:
+                results.append([_document(match) for match in matches[:k]])
+        return results
@@ -0,0 +1,215 @@
+"""
+스레드 안전 DB Connection Pool
+
+- Streamlit은 브라우저 세션마다 별도 스레드에서 스크립트를 실행하므로
+  여러 스레드가 동시에 연결을 가져가고 반환해도 안전해야 함
+- 풀이 가득 차면 None을 반환하는 대신 timeout 동안 대기하고, 초과 시 PoolTimeoutError 발생
+- 끊어진 연결은 반환/대여 시점에 폐기하고 새 연결로 교체 (self-healing)
+- 대여 중인 연결 수, 대기 시간, 고갈 횟수 등의 지표를 stats()로 제공
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2 import extensions
+
+
+class PoolError(Exception):
+    """Connection Pool 사용 중 발생하는 오류"""
+
+
+class PoolTimeoutError(PoolError):
+    """지정한 시간 안에 연결을 얻지 못했을 때 발생"""
+
+
+class ConnectionPool:
+    def __init__(self, connect, minconn=1, maxconn=5, timeout=10.0, max_idle=300.0):
+        """
+        :param connect: 새 DB 연결을 만들어 반환하는 함수
+        :param minconn: 미리 열어 둘 연결 수
+        :param maxconn: 동시에 열 수 있는 최대 연결 수
+        :param timeout: 연결을 기다리는 기본 최대 시간 (초)
+        :param max_idle: 이 시간(초) 이상 쉬고 있던 연결은 대여 전에 상태를 확인
+        """
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError("0 <= minconn <= maxconn, maxconn >= 1 이어야 합니다.")
+
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.timeout = timeout
+        self.max_idle = max_idle
+
+        self._cond = threading.Condition()
+        self._idle = []  # [(conn, 마지막 반환 시각)]
+        self._in_use = {}  # id(conn) -> conn
+        self._total = 0  # 대여 중 + 대기 중 + 생성 중인 연결 수
+        self._closed = False
+
+        # 지표
+        self._checkouts = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+        self._exhaustion_events = 0
+        self._timeouts = 0
+        self._connects = 0
+        self._discarded = 0
+
+        for _ in range(minconn):
+            try:
+                conn = self._open()
+            except Exception as e:
+                print(f"Error opening initial pool connection: {e}")
+                break
+            self._total += 1
+            self._idle.append((conn, time.monotonic()))
+
+    def _open(self):
+        conn = self._connect()
+        with self._cond:
+            self._connects += 1
+        return conn
+
+    def _is_usable(self, conn, last_used):
+        """대여 전 연결 상태 확인 (오래 쉰 연결은 SELECT 1로 점검)"""
+        if conn.closed:
+            return False
+        if time.monotonic() - last_used < self.max_idle:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1;")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self, timeout=None):
+        """풀에서 연결을 대여 (timeout 초 안에 못 얻으면 PoolTimeoutError)"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise PoolError("Connection pool is closed.")
+                    if self._idle:
+                        conn, last_used = self._idle.pop()
+                        break
+                    if self._total < self.maxconn:
+                        self._total += 1
+                        conn, last_used = None, None
+                        break
+                    if not waited:
+                        self._exhaustion_events += 1
+                        waited = True
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"{timeout:.1f}초 안에 DB 연결을 얻지 못했습니다 "
+                            f"(최대 {self.maxconn}개 모두 사용 중)."
+                        )
+                    self._cond.wait(remaining)
+
+            # 네트워크 작업(연결 생성/점검)은 lock 밖에서 수행
+            if conn is None:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._is_usable(conn, last_used):
+                self._close_quietly(conn)
+                with self._cond:
+                    self._total -= 1
+                    self._discarded += 1
+                    self._cond.notify()
+                continue
+
+            wait = time.monotonic() - start
+            with self._cond:
+                self._in_use[id(conn)] = conn
+                self._checkouts += 1
+                self._wait_time_total += wait
+                self._wait_time_max = max(self._wait_time_max, wait)
+            return conn
+
+    def putconn(self, conn, discard=False):
+        """연결을 풀에 반환 (끊어졌거나 discard=True면 폐기)"""
+        with self._cond:
+            if self._in_use.pop(id(conn), None) is None:
+                raise PoolError("This connection was not checked out from the pool.")
+
+        if not discard and not conn.closed:
+            # 진행 중인 트랜잭션이 남아 있으면 정리한 뒤 반환
+            try:
+                if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except psycopg2.Error:
+                discard = True
+
+        with self._cond:
+            if discard or conn.closed or self._closed:
+                self._close_quietly(conn)
+                self._total -= 1
+                self._discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """with 문에서 사용할 수 있는 연결 대여 (연결 오류 시 해당 연결은 폐기)"""
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def closeall(self):
+        """대기 중인 연결을 모두 닫고 풀을 종료 (대여 중인 연결은 반환 시 닫힘)"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def stats(self):
+        """현재 풀 상태와 누적 지표"""
+        with self._cond:
+            return {
+                "maxconn": self.maxconn,
+                "size": self._total,
+                "idle": len(self._idle),
+                "checked_out": len(self._in_use),
+                "checkouts": self._checkouts,
+                "wait_time_total": self._wait_time_total,
+                "wait_time_max": self._wait_time_max,
+                "wait_time_avg": (
+                    self._wait_time_total / self._checkouts if self._checkouts else 0.0
+                ),
+                "exhaustion_events": self._exhaustion_events,
+                "timeouts": self._timeouts,
+                "connects": self._connects,
+                "discarded": self._discarded,
+            }
@@ -0,0 +1,137 @@
+"""
+사용자 대량 등록 (bootcamp 기수 단위 계정 생성)
+
+- CSV(username,password 헤더) 또는 JSONL({"username", "password"}) 파일에서 사용자 목록을 읽음
+- batch_size명씩 나눠 비밀번호를 process pool의 모든 worker에서 병렬 해싱 (backend/passwords.py)
+- batch마다 한 트랜잭션, 한 번의 다중 행 INSERT로 저장하므로 연결은 batch당 한 번만 대여
+- 이미 있는 username / 파일 안의 중복 / 잘못된 행은 batch를 중단하지 않고 행 단위 결과로 보고
+
+실행 예시:
+    python -m backend.provisioning cohort.csv --batch-size 500 --report conflicts.jsonl
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+
+from backend import passwords
+from backend.db import identity_cache
+from backend.metrics import instrument
+from backend.storage import get_backend
+
+# users.username 컬럼 길이 (VARCHAR(50))
+MAX_USERNAME_LENGTH = 50
+
+
+# 파일 형식(.csv / .jsonl)에 맞춰 사용자 행을 하나씩 읽음
+def read_users(path):
+    """(줄 번호, {"username", "password"}) 를 순서대로 반환하는 generator"""
+    if os.path.splitext(path)[1].lower() == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            for line, row in enumerate(csv.DictReader(f), start=2):  # 1번 줄은 헤더
+                yield line, row
+    else:
+        with open(path, encoding="utf-8") as f:
+            for line, text in enumerate(f, start=1):
+                if not text.strip():
+                    continue
+                try:
+                    row = json.loads(text)
+                except json.JSONDecodeError:
+                    row = None
+                yield line, row if isinstance(row, dict) else None
+
+
+# 저장 전에 걸러낼 행인지 확인 (문제가 있으면 사유 문자열 반환)
+def _invalid_reason(row):
+    if row is None:
+        return "invalid row"
+    username, password = row.get("username"), row.get("password")
+    if not isinstance(username, str) or not username.strip():
+        return "missing username"
+    if not isinstance(password, str) or not password:
+        return "missing password"
+    if len(username.strip()) > MAX_USERNAME_LENGTH:
+        return "username too long"
+    return None
+
+
+# batch 하나를 해싱 후 저장하고, 저장되지 않은 행은 conflicts에 추가
+def _register_batch(batch, created, conflicts):
+    hashed = passwords.hash_passwords([row["password"] for _, row in batch])
+    rows = get_backend().register_users(
+        [(row["username"], password) for (_, row), password in zip(batch, hashed)]
+    )
+    ids = {row["username"]: row["id"] for row in rows}
+    for line, row in batch:
+        username = row["username"]
+        if username in ids:
+            identity_cache.set(username, ids[username])
+            created.append({"line": line, "username": username, "id": ids[username]})
+        else:
+            conflicts.append({"line": line, "username": username, "reason": "username already exists"})
+
+
+# 사용자 대량 등록
+@instrument("register_users")
+def register_users(users, batch_size=500):
+    """
+    (줄 번호, {"username", "password"}) 목록을 batch_size명씩 등록하고 결과 반환
+    {"created": [{"line", "username", "id"}], "conflicts": [{"line", "username", "reason"}], ...}
+    """
+    created, conflicts, seen, batch = [], [], set(), []
+    start = time.perf_counter()
+    for line, row in users:
+        reason = _invalid_reason(row)
+        if reason is None:
+            row = {"username": row["username"].strip(), "password": row["password"]}
+            if row["username"] in seen:
+                reason = "duplicate username in input"
+        if reason is not None:
+            username = row.get("username") if isinstance(row, dict) else None
+            conflicts.append({"line": line, "username": username, "reason": reason})
+            continue
+
+        seen.add(row["username"])
+        batch.append((line, row))
+        if len(batch) >= batch_size:
+            _register_batch(batch, created, conflicts)
+            batch = []
+    if batch:
+        _register_batch(batch, created, conflicts)
+
+    conflicts.sort(key=lambda conflict: conflict["line"])
+    return {
+        "created": created,
+        "conflicts": conflicts,
+        "elapsed_seconds": time.perf_counter() - start,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CSV / JSONL 파일로 사용자 대량 등록")
+    parser.add_argument("path", help="username,password 헤더의 CSV 또는 JSONL 파일")
+    parser.add_argument("--batch-size", type=int, default=500, help="한 트랜잭션으로 저장할 사용자 수")
+    parser.add_argument("--report", help="등록하지 못한 행을 저장할 JSONL 파일 경로")
+    args = parser.parse_args()
+
+    try:
+        result = register_users(read_users(args.path), args.batch_size)
+    finally:
+        passwords.shutdown()
+
+    created, conflicts = len(result["created"]), len(result["conflicts"])
+    elapsed = result["elapsed_seconds"]
+    print(
+        f"Registered {created} users, {conflicts} conflicts in {elapsed:.1f}s "
+        f"({created / elapsed if elapsed else 0:.0f} users/s)"
+    )
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            for conflict in result["conflicts"]:
+                f.write(json.dumps(conflict, ensure_ascii=False) + "\n")
+    else:
+        for conflict in result["conflicts"]:
+            print(f"  line {conflict['line']}: {conflict['username']} ({conflict['reason']})")
@@ -0,0 +1,182 @@
+"""
+탈퇴(비활성화) 사용자 데이터 일괄 삭제 (purge) 작업
+
+- is_active = FALSE인 사용자의 채팅 메시지와 세션을 batch_size개씩 나눠 삭제
+- batch마다 commit하므로 긴 lock이나 한 번에 큰 WAL이 생기지 않음
+- 이미 삭제된 데이터는 다시 조회되지 않으므로 중간에 멈춰도 다음 실행에서 이어서 진행 (resumable)
+- 진행 상황(처리 사용자 수, 삭제 행 수, 초당 삭제 행 수)을 progress()로 제공
+- 실행 중에 다시 시작을 요청하면(실행 중 탈퇴한 사용자) 현재 실행이 끝나기 전에 대상 사용자를 다시 조회하여 이어서 처리
+- 사용자마다 삭제 전에 메시지 journal을 먼저 저장 (삭제 후 저장되어 남거나 FK 위반이 되는 메시지 방지)
+
+실행 예시: python -m backend.purge --batch-size 1000
+"""
+
+import argparse
+import threading
+import time
+
+from backend.db import message_journal
+from backend.storage import get_backend
+
+class PurgeJob:
+    def __init__(self, batch_size=1000, pause=0.05):
+        """
+        :param batch_size: 한 번의 DELETE(트랜잭션)로 지울 최대 행 수
+        :param pause: batch 사이 대기 시간 (초), 다른 요청에 DB 자원을 양보
+        """
+        self.batch_size = batch_size
+        self.pause = pause
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._running = False
+        self._rerun = False  # 실행 중에 start()가 호출되어 대상 사용자를 다시 조회해야 함
+        self._reset_progress()
+
+    def _reset_progress(self):
+        self._state = "idle"
+        self._users_total = 0
+        self._users_done = 0
+        self._messages_deleted = 0
+        self._sessions_deleted = 0
+        self._batches = 0
+        self._started_at = None
+        self._finished_at = None
+        self._current_user = None
+        self._last_error = None
+
+    def start(self):
+        """
+        백그라운드 스레드에서 purge 실행
+        이미 실행 중이면 False를 반환하고, 실행 중인 작업이 끝나기 전에 대상 사용자를 다시 조회하도록 요청
+        """
+        with self._lock:
+            if self._running:
+                self._rerun = True
+                return False
+            self._running = True
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="purge-job", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self, timeout=None):
+        """현재 batch가 끝나면 중단 (다음 실행 시 이어서 진행)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self):
+        """비활성 사용자 데이터를 모두 정리하고 진행 상황 반환"""
+        with self._lock:
+            self._reset_progress()
+            self._running = True
+            self._state = "running"
+            self._started_at = time.monotonic()
+
+        try:
+            while True:
+                with self._lock:
+                    self._rerun = False
+                for user_id in self._pending_users():
+                    if self._stop.is_set():
+                        break
+                    with self._lock:
+                        self._current_user = user_id
+                    self._purge_user(user_id)
+                    with self._lock:
+                        self._users_done += 1
+                # 실행 중에 탈퇴한 사용자가 있으면 다시 조회 (확인과 종료 표시를 같은 lock 안에서 수행)
+                with self._lock:
+                    if self._stop.is_set() or not self._rerun:
+                        self._running = False
+                        break
+            state = "stopped" if self._stop.is_set() else "done"
+        except Exception as e:
+            print(f"Error purging inactive user data: {e}")
+            with self._lock:
+                self._last_error = str(e)
+                self._running = False
+            state = "failed"
+
+        with self._lock:
+            self._state = state
+            self._current_user = None
+            self._finished_at = time.monotonic()
+        progress = self.progress()
+        print(
+            f"Purge {state}: {progress['users_done']}/{progress['users_total']} users, "
+            f"{progress['rows_deleted']} rows in {progress['elapsed']:.1f}s "
+            f"({progress['rows_per_sec']:.0f} rows/s)"
+        )
+        return progress
+
+    def _pending_users(self):
+        rows = get_backend().query("purge_pending_users")
+        user_ids = [row["id"] for row in rows]
+        with self._lock:
+            self._users_total += len(user_ids)
+        return user_ids
+
+    def _purge_user(self, user_id):
+        # journal에 남은 메시지를 먼저 저장해야 삭제 대상에 포함됨
+        # (시간 내 저장하지 못한 메시지는 삭제된 세션을 참조하므로 journal이 dead-letter 파일로 옮김)
+        message_journal.flush()
+        # 메시지를 먼저 모두 지운 뒤 세션 삭제 (FK 순서)
+        for name, counter in (
+            ("purge_messages_batch", "_messages_deleted"),
+            ("purge_sessions_batch", "_sessions_deleted"),
+        ):
+            while not self._stop.is_set():
+                deleted = self._delete_batch(name, user_id)
+                with self._lock:
+                    setattr(self, counter, getattr(self, counter) + deleted)
+                    self._batches += 1
+                if deleted < self.batch_size:
+                    break
+                time.sleep(self.pause)
+
+    def _delete_batch(self, name, user_id):
+        # batch마다 별도 트랜잭션으로 commit
+        return get_backend().execute(name, (user_id, self.batch_size))
+
+    def progress(self):
+        """진행 상황과 처리량"""
+        with self._lock:
+            if self._started_at is None:
+                elapsed = 0.0
+            else:
+                elapsed = (self._finished_at or time.monotonic()) - self._started_at
+            rows = self._messages_deleted + self._sessions_deleted
+            return {
+                "state": self._state,
+                "users_total": self._users_total,
+                "users_done": self._users_done,
+                "current_user": self._current_user,
+                "messages_deleted": self._messages_deleted,
+                "sessions_deleted": self._sessions_deleted,
+                "rows_deleted": rows,
+                "batches": self._batches,
+                "elapsed": elapsed,
+                "rows_per_sec": rows / elapsed if elapsed > 0 else 0.0,
+                "last_error": self._last_error,
+            }
+
+
+# 프로세스 공용 purge 작업 (회원 탈퇴 시 백그라운드로 실행)
+purge_job = PurgeJob()
+
+
+def start_purge_job():
+    """공용 purge 작업을 백그라운드에서 시작 (이미 실행 중이면 그대로 둠)"""
+    return purge_job.start()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="비활성 사용자 채팅 데이터 일괄 삭제")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--pause", type=float, default=0.05)
+    args = parser.parse_args()
+
+    PurgeJob(batch_size=args.batch_size, pause=args.pause).run()
@@ -0,0 +1,304 @@
+"""
+자주 실행되는 SQL 쿼리 등록소 (prepared statement registry)
+
+- db.py / accounts.py / purge.py의 주요 쿼리를 이름으로 등록하고, 연결(connection)마다 처음 한 번만
+  PREPARE 한 뒤 이후에는 EXECUTE로 실행 (매 호출마다 parse / plan 하지 않음)
+- 쿼리는 PostgreSQL 기본 placeholder($1, $2, ...)로 작성하여 동기(psycopg2 PREPARE)와
+  비동기(asyncpg, 자체 statement cache 사용) 계층이 같은 SQL을 공유
+  (SQLite 저장소는 ?n placeholder로 바꿔 사용, 문법이 다른 쿼리만 backend/storage/sqlite.py에서 재정의)
+- 쿼리별 실행 횟수, 누적/최대 실행 시간을 stats()로 제공
+- PgBouncer transaction 모드처럼 prepared statement를 쓸 수 없는 환경에서는
+  secrets.toml [postgres] PREPARED_STATEMENTS = false 로 끄면 일반 쿼리로 실행
+"""
+
+import re
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+from psycopg2 import errors
+
+from backend import metrics
+
+QUERIES = {
+    # accounts.py
+    "authenticate": """
+        SELECT id, password FROM users WHERE username = $1 AND is_active = TRUE;
+    """,
+    "register_user": """
+        INSERT INTO users (username, password) VALUES ($1, $2) RETURNING id;
+    """,
+    # 대량 등록: 배열 파라미터(unnest)로 한 번에 저장, 이미 있는 username은 건너뛰고 저장된 행만 반환
+    "register_users": """
+        INSERT INTO users (username, password)
+        SELECT * FROM unnest($1::text[], $2::text[])
+        ON CONFLICT (username) DO NOTHING
+        RETURNING id, username;
+    """,
+    # 로그인 시 cost가 바뀐 해시 교체 (그 사이 비밀번호가 바뀌었으면 갱신하지 않음)
+    "update_password_hash": """
+        UPDATE users SET password = $2 WHERE id = $1 AND password = $3;
+    """,
+    "deactivate_user": """
+        UPDATE users SET is_active = FALSE WHERE username = $1;
+    """,
+    "get_user_id": """
+        SELECT id FROM users WHERE username = $1;
+    """,
+    # 채팅 세션 / 메시지 저장
+    "create_chat_session": """
+        INSERT INTO chat_sessions (user_id) VALUES ($1) RETURNING id;
+    """,
+    # 배열 파라미터(unnest)로 여러 행을 한 번에 저장하므로 행 수와 관계없이 같은 statement 재사용
+    "insert_chat_messages": """
+        INSERT INTO chat_messages (message_uid, session_id, sender, message, timestamp)
+        SELECT * FROM unnest($1::uuid[], $2::int[], $3::text[], $4::text[], $5::timestamptz[])
+        ON CONFLICT (message_uid) DO NOTHING;
+    """,
+    # 대화 내역 조회
+    "get_chat_history": """
+        SELECT id, sender, message, timestamp
+        FROM chat_messages
+        WHERE session_id = $1
+        ORDER BY timestamp ASC, id ASC;
+    """,
+    "get_chat_history_page": """
+        SELECT id, sender, message, timestamp
+        FROM chat_messages
+        WHERE session_id = $1
+        ORDER BY timestamp ASC, id ASC
+        LIMIT $2;
+    """,
+    "get_chat_history_page_after": """
+        SELECT id, sender, message, timestamp
+        FROM chat_messages
+        WHERE session_id = $1 AND (timestamp, id) > ($2, $3)
+        ORDER BY timestamp ASC, id ASC
+        LIMIT $4;
+    """,
+    # 세션 목록 조회
+    "get_user_chat_sessions": """
+        SELECT id, created_at
+        FROM chat_sessions
+        WHERE user_id = $1
+        ORDER BY created_at DESC, id DESC;
+    """,
+    "get_user_chat_sessions_page": """
+        SELECT id, created_at
+        FROM chat_sessions
+        WHERE user_id = $1
+        ORDER BY created_at DESC, id DESC
+        LIMIT $2;
+    """,
+    "get_user_chat_sessions_page_before": """
+        SELECT id, created_at
+        FROM chat_sessions
+        WHERE user_id = $1 AND (created_at, id) < ($2, $3)
+        ORDER BY created_at DESC, id DESC
+        LIMIT $4;
+    """,
+    "get_all_chat_sessions": """
+        SELECT cs.id, u.username, cs.created_at
+        FROM chat_sessions cs
+        JOIN users u ON cs.user_id = u.id
+        ORDER BY cs.created_at DESC, cs.id DESC;
+    """,
+    "get_all_chat_sessions_page": """
+        SELECT cs.id, u.username, cs.created_at
+        FROM chat_sessions cs
+        JOIN users u ON cs.user_id = u.id
+        ORDER BY cs.created_at DESC, cs.id DESC
+        LIMIT $1;
+    """,
+    "get_all_chat_sessions_page_before": """
+        SELECT cs.id, u.username, cs.created_at
+        FROM chat_sessions cs
+        JOIN users u ON cs.user_id = u.id
+        WHERE (cs.created_at, cs.id) < ($1, $2)
+        ORDER BY cs.created_at DESC, cs.id DESC
+        LIMIT $3;
+    """,
+    # 사용자가 이전 면접에서 받은 질문 (최신순)
+    # 평가도 sender = 'bot'이므로, 바로 앞 메시지가 사용자 답변이 아닌 bot 메시지만 질문으로 판단
+    "get_user_questions": """
+        SELECT message
+        FROM (
+            SELECT
+                m.message, m.sender, m.timestamp, m.id,
+                LAG(m.sender) OVER (PARTITION BY m.session_id ORDER BY m.timestamp, m.id) AS previous_sender
+            FROM chat_messages m
+            JOIN chat_sessions cs ON m.session_id = cs.id
+            WHERE cs.user_id = $1
+        ) messages
+        WHERE sender = 'bot' AND (previous_sender IS NULL OR previous_sender <> 'user')
+        ORDER BY timestamp DESC, id DESC
+        LIMIT $2;
+    """,
+    # 삭제
+    "delete_chat_messages": """
+        DELETE FROM chat_messages WHERE session_id = $1;
+    """,
+    "delete_chat_session": """
+        WITH deleted_messages AS (
+            DELETE FROM chat_messages WHERE session_id = $1
+        )
+        DELETE FROM chat_sessions WHERE id = $1;
+    """,
+    "delete_all_user_sessions": """
+        WITH deleted_sessions AS (
+            DELETE FROM chat_sessions WHERE user_id = $1 RETURNING id
+        )
+        DELETE FROM chat_messages
+        WHERE session_id IN (SELECT id FROM deleted_sessions);
+    """,
+    # purge 작업 (backend/purge.py)
+    "purge_pending_users": """
+        SELECT u.id
+        FROM users u
+        WHERE u.is_active = FALSE
+          AND EXISTS (SELECT 1 FROM chat_sessions s WHERE s.user_id = u.id)
+        ORDER BY u.id;
+    """,
+    "purge_messages_batch": """
+        DELETE FROM chat_messages
+        WHERE id IN (
+            SELECT m.id
+            FROM chat_messages m
+            JOIN chat_sessions s ON m.session_id = s.id
+            JOIN users u ON s.user_id = u.id
+            WHERE s.user_id = $1 AND u.is_active = FALSE
+            LIMIT $2
+        );
+    """,
+    "purge_sessions_batch": """
+        DELETE FROM chat_sessions
+        WHERE id IN (
+            SELECT s.id
+            FROM chat_sessions s
+            JOIN users u ON s.user_id = u.id
+            WHERE s.user_id = $1 AND u.is_active = FALSE
+              AND NOT EXISTS (SELECT 1 FROM chat_messages m WHERE m.session_id = s.id)
+            LIMIT $2
+        );
+    """,
+}
+
+PLACEHOLDER = re.compile(r"\$(\d+)")
+
+# prepared statement 사용 여부 (configure()로 변경)
+_use_prepared = True
+
+# 연결별로 PREPARE 완료한 쿼리 이름 (연결이 닫혀 사라지면 자동 제거)
+_prepared = weakref.WeakKeyDictionary()
+_prepared_lock = threading.Lock()
+
+# 쿼리별 실행 지표
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def configure(use_prepared=True):
+    """prepared statement 사용 여부 설정"""
+    global _use_prepared
+    _use_prepared = use_prepared
+
+
+def sql(name):
+    """등록된 쿼리의 SQL ($1, $2, ... placeholder)"""
+    return QUERIES[name]
+
+
+def param_count(name):
+    """쿼리에 필요한 파라미터 수"""
+    return max((int(n) for n in PLACEHOLDER.findall(QUERIES[name])), default=0)
+
+
+def pyformat(query, params=()):
+    """$n placeholder SQL을 psycopg2 형식(%s)으로 바꾸고, 순서에 맞게 파라미터 재배열"""
+    order = [int(n) - 1 for n in PLACEHOLDER.findall(query)]
+    return PLACEHOLDER.sub("%s", query), tuple(params[i] for i in order)
+
+
+def to_pyformat(name, params=()):
+    """등록된 쿼리를 psycopg2 형식(%s) SQL과 파라미터로 변환"""
+    return pyformat(QUERIES[name], params)
+
+
+def _statement_name(name):
+    return f"q_{name}"
+
+
+def _stat(name):
+    # _stats_lock을 잡은 상태에서 호출
+    return _stats.setdefault(
+        name, {"calls": 0, "prepares": 0, "total_time": 0.0, "max_time": 0.0}
+    )
+
+
+@contextmanager
+def timed(name):
+    """쿼리 실행 시간 기록 (동기 / 비동기 계층 공용)"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        with _stats_lock:
+            stat = _stat(name)
+            stat["calls"] += 1
+            stat["total_time"] += elapsed
+            stat["max_time"] = max(stat["max_time"], elapsed)
+        metrics.add_execute(elapsed, error=error)  # 계측 중인 DB 함수에 실행 시간 누적
+
+
+def _prepare(cur, name):
+    conn = cur.connection
+    with _prepared_lock:
+        names = _prepared.setdefault(conn, set())
+        if name in names:
+            return
+    cur.execute(f"PREPARE {_statement_name(name)} AS {QUERIES[name]}")
+    with _prepared_lock:
+        names.add(name)
+    with _stats_lock:
+        _stat(name)["prepares"] += 1
+
+
+def execute(cur, name, params=()):
+    """등록된 쿼리를 이름으로 실행 (연결마다 처음 한 번 PREPARE 후 EXECUTE)"""
+    if not _use_prepared:
+        query, ordered = to_pyformat(name, params)
+        with timed(name):
+            cur.execute(query, ordered)
+        return
+
+    _prepare(cur, name)
+    count = param_count(name)
+    if len(params) != count:
+        raise ValueError(f"{name} expects {count} parameters, got {len(params)}")
+    args = f" ({', '.join(['%s'] * count)})" if count else ""
+    try:
+        with timed(name):
+            cur.execute(f"EXECUTE {_statement_name(name)}{args};", tuple(params))
+    except errors.InvalidSqlStatementName:
+        # 서버 쪽에서 statement가 사라진 경우 다음 호출에서 다시 PREPARE
+        with _prepared_lock:
+            _prepared.get(cur.connection, set()).discard(name)
+        raise
+
+
+def stats():
+    """쿼리별 실행 횟수, PREPARE 횟수, 누적/평균/최대 실행 시간"""
+    with _stats_lock:
+        return {
+            name: dict(
+                stat,
+                avg_time=stat["total_time"] / stat["calls"] if stat["calls"] else 0.0,
+            )
+            for name, stat in _stats.items()
+        }
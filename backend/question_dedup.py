@@ -0,0 +1,120 @@
+"""
+의미 기반 면접 질문 중복 제거
+
+- 생성한 질문을 임베딩하여 이미 낸 질문(현재 세션 + 선택적으로 사용자의 이전 면접 질문)과 cosine 유사도를 비교,
+  threshold 이상이면 표현만 바꾼 같은 질문으로 보고 사용자에게 보여주기 전에 버림
+- 문자열이 완전히 같은 질문은 임베딩 없이 바로 버림
+- 질문을 생성하기 전에 후보 문맥(검색된 문서)을 이미 낸 질문과 비교하여, 겹칠 가능성이 낮은 문맥을 우선 사용
+  → 중복으로 버려지는 LLM 호출 수를 줄임
+- 이미 낸 질문 벡터는 (질문 수, 차원) 행렬 하나로 보관하여 비교를 행렬 곱 한 번으로 계산
+- 임베딩은 영구 캐시(CachedEmbeddings)를 거치므로 같은 문맥 / 질문은 다시 요청하지 않음
+- 지표: 전달한 질문 수, LLM 호출 수(질문당 평균, 응답 캐시에서 받은 질문은 제외), 완전 중복 / 의미 중복으로 버린 수
+"""
+
+import threading
+
+import numpy as np
+
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+class QuestionDeduplicator:
+    def __init__(self, embeddings, threshold=0.9, context_threshold=0.85, max_questions=500):
+        """
+        :param embeddings: LangChain Embeddings (질문 / 문맥 임베딩)
+        :param threshold: 이 값 이상으로 유사한 질문은 중복으로 판단
+        :param context_threshold: 이미 낸 질문과 이 값 이상으로 유사한 문맥은 후순위로 사용
+        :param max_questions: 비교에 사용할 최대 질문 수 (넘으면 오래된 질문부터 제외)
+        """
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.context_threshold = context_threshold
+        self.max_questions = max_questions
+        self._lock = threading.Lock()
+        self._questions = []
+        self._vectors = None  # (질문 수, 차원), 단위 길이
+
+        self._delivered = 0
+        self._llm_calls = 0
+        self._exact_rejections = 0
+        self._semantic_rejections = 0
+
+    def __len__(self):
+        return len(self._questions)
+
+    def add(self, questions):
+        """이미 낸 질문 추가 (이후 생성한 질문과 비교)"""
+        questions = [question for question in questions if question]
+        if not questions:
+            return
+        vectors = _normalize(self.embeddings.embed_documents(questions))
+        with self._lock:
+            self._questions = (self._questions + questions)[-self.max_questions:]
+            if self._vectors is None:
+                self._vectors = vectors
+            else:
+                self._vectors = np.vstack([self._vectors, vectors])
+            self._vectors = self._vectors[-self.max_questions:]
+
+    def _similarity(self, vectors):
+        # 각 벡터와 가장 비슷한 기존 질문의 유사도 (기존 질문이 없으면 -1)
+        with self._lock:
+            known = self._vectors
+        if known is None:
+            return np.full(len(vectors), -1.0, dtype=np.float32)
+        return (_normalize(vectors) @ known.T).max(axis=1)
+
+    def similarity(self, question):
+        """기존 질문 중 가장 비슷한 질문과의 cosine 유사도"""
+        return float(self._similarity([self.embeddings.embed_query(question)])[0])
+
+    def record_llm_call(self):
+        """질문 생성에 LLM을 실제로 호출했음을 기록 (응답 캐시 hit은 기록하지 않음)"""
+        with self._lock:
+            self._llm_calls += 1
+
+    def is_duplicate(self, question, used_questions=()):
+        """생성한 질문이 기존 질문과 (문자열 또는 의미가) 같은지 여부"""
+        with self._lock:
+            exact = question in used_questions or question in self._questions
+            if exact:
+                self._exact_rejections += 1
+        if exact:
+            return True
+        if self.similarity(question) >= self.threshold:
+            with self._lock:
+                self._semantic_rejections += 1
+            return True
+        return False
+
+    def choose_contexts(self, contexts):
+        """
+        기존 질문과 겹칠 가능성이 낮은 문맥만 반환
+        (모두 context_threshold 이상이면 가장 덜 겹치는 문맥 하나)
+        """
+        if not contexts or not len(self):
+            return list(contexts)
+        scores = self._similarity(self.embeddings.embed_documents(list(contexts)))
+        preferred = [context for context, score in zip(contexts, scores) if score < self.context_threshold]
+        return preferred or [contexts[int(np.argmin(scores))]]
+
+    def record_delivery(self):
+        """질문 하나를 사용자에게 전달했음을 기록"""
+        with self._lock:
+            self._delivered += 1
+
+    def stats(self):
+        """중복 제거 지표 (llm_calls_per_question = 전달한 질문 하나당 질문 생성 LLM 호출 수)"""
+        with self._lock:
+            return {
+                "questions": len(self._questions),
+                "delivered": self._delivered,
+                "llm_calls": self._llm_calls,
+                "llm_calls_per_question": self._llm_calls / self._delivered if self._delivered else 0.0,
+                "exact_rejections": self._exact_rejections,
+                "semantic_rejections": self._semantic_rejections,
+            }
@@ -0,0 +1,83 @@
+"""
+검색(retriever) 결과 캐시
+
+- 질문 생성은 모든 사용자가 같은 검색어(QUERY)로 검색하므로 결과를 프로세스 전체에서 공유
+  (캐시 hit 시 embedding 요청과 Pinecone MMR 조회를 모두 생략)
+- key = (검색어, search_type, search_kwargs, namespace, index 버전), LRU + TTL 제한 (backend/cache.py)
+- 인덱스를 다시 적재하면 invalidate()로 버전을 올려 이전 결과를 사용하지 않음
+  (다른 프로세스에서 적재한 경우에는 RETRIEVAL_INDEX_VERSION 변경 또는 TTL 만료로 반영)
+"""
+
+import threading
+from typing import Any, Dict, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from backend.cache import TTLCache
+from backend.settings import RETRIEVAL_CACHE_CONFIG
+
+_cache = TTLCache(maxsize=RETRIEVAL_CACHE_CONFIG["maxsize"], ttl=RETRIEVAL_CACHE_CONFIG["ttl"])
+_version_lock = threading.Lock()
+_generation = 0  # invalidate() 호출마다 증가
+
+
+def index_version():
+    """현재 인덱스 버전 (설정값 + 이 프로세스에서 invalidate한 횟수)"""
+    return f"{RETRIEVAL_CACHE_CONFIG['index_version']}.{_generation}"
+
+
+def invalidate():
+    """인덱스를 다시 적재한 뒤 호출, 이전 버전의 검색 결과를 모두 버림"""
+    global _generation
+    with _version_lock:
+        _generation += 1
+        _cache.clear()
+
+
+def stats():
+    """캐시 크기 / hit / miss 지표와 현재 인덱스 버전"""
+    return dict(_cache.stats(), index_version=index_version())
+
+
+def _freeze(value):
+    # dict / list 인자를 캐시 key로 쓸 수 있도록 hashable 값으로 변환
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class CachedRetriever(BaseRetriever):
+    """다른 retriever의 검색 결과를 프로세스 공용 캐시에 저장하는 retriever"""
+
+    retriever: BaseRetriever
+    namespace: str = ""
+    search_type: str = "similarity"
+    search_kwargs: Dict[str, Any] = {}
+
+    def cache_key(self, query):
+        """검색 결과를 구분하는 key (검색 조건 또는 인덱스 버전이 다르면 다른 결과)"""
+        return (
+            query,
+            self.search_type,
+            _freeze(self.search_kwargs),
+            self.namespace,
+            index_version(),
+        )
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        key = self.cache_key(query)
+        documents = _cache.get(key)
+        if documents is None:
+            documents = self.retriever.invoke(
+                query, config={"callbacks": run_manager.get_child()}
+            )
+            if key[-1] == index_version():  # 검색 중 invalidate되었으면 저장하지 않음
+                _cache.set(key, documents)
+        # 호출부에서 metadata 등을 수정해도 캐시된 결과는 바뀌지 않도록 복사본 반환
+        return [document.model_copy(deep=True) for document in documents]
@@ -0,0 +1,143 @@
+"""
+secrets 없이 읽을 수 있는 설정 (DB 계층, 비밀번호 해싱, 검색 결과 캐시)
+
+- backend/config.py의 값은 secrets.toml에서 읽으므로,
+  SQLite 저장소로 테스트 / 벤치마크할 때도 쓰는 db.py / accounts.py 설정은 이 모듈에 둠
+- 배포 환경마다 다른 값은 환경 변수(.env 가능)로 지정
+- backend/config.py에서도 같은 이름으로 다시 제공
+"""
+
+import os
+
+# 채팅 메시지 write-behind journal 설정 (DB 장애 시 spool 파일에 보관 후 재저장,
+# 제약 조건 위반 등으로 저장이 거부된 메시지는 rejected_path에 기록)
+MESSAGE_JOURNAL_CONFIG = {
+    "spool_path": os.path.join(os.path.dirname(__file__), "data", "message_spool.jsonl"),
+    "rejected_path": os.path.join(os.path.dirname(__file__), "data", "message_rejected.jsonl"),
+    "batch_size": 100,
+    "flush_interval": 0.2,
+    "retry_interval": 5.0,
+}
+
+# username -> user_id 캐시 설정 (프로세스 공용 LRU + TTL)
+IDENTITY_CACHE_CONFIG = {
+    "maxsize": 10000,
+    "ttl": 600.0,
+}
+
+# 비밀번호 해싱 설정 (backend/passwords.py)
+# rounds는 `python -m backend.passwords calibrate`로 서버에 맞는 값을 확인한 뒤 BCRYPT_ROUNDS로 지정
+PASSWORD_HASH_CONFIG = {
+    "rounds": int(os.getenv("BCRYPT_ROUNDS", 12)),
+    "workers": int(os.getenv("PASSWORD_HASH_WORKERS", min(4, os.cpu_count() or 1))),
+    "max_pending": int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64)),
+    "timeout": 30.0,
+}
+
+# 검색(retriever) 결과 캐시 설정 (backend/retrieval_cache.py)
+# 다른 프로세스에서 인덱스를 다시 적재했다면 RETRIEVAL_INDEX_VERSION을 바꿔 기존 결과를 사용하지 않음
+RETRIEVAL_CACHE_CONFIG = {
+    "maxsize": 256,
+    "ttl": float(os.getenv("RETRIEVAL_CACHE_TTL", 3600)),
+    "index_version": os.getenv("RETRIEVAL_INDEX_VERSION", "1"),
+}
+
+# 검색 대상: pinecone(원격, REST) / grpc(원격, gRPC 클라이언트, backend/pinecone_retriever.py)
+#           / local(로컬 벡터 인덱스 파일, backend/local_index.py)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "pinecone")
+
+# 여러 검색어를 동시에 조회할 때 사용할 최대 스레드 수 (backend/pinecone_retriever.py)
+PINECONE_QUERY_CONFIG = {
+    "max_workers": int(os.getenv("PINECONE_QUERY_WORKERS", 8)),
+}
+LOCAL_INDEX_CONFIG = {
+    "path": os.getenv(
+        "LOCAL_INDEX_PATH", os.path.join(os.path.dirname(__file__), "data", "vector_index.npz")
+    ),
+}
+
+# 임베딩 영구 캐시 설정 (backend/embedding_cache.py), 여러 프로세스가 같은 디렉터리를 공유
+EMBEDDING_CACHE_CONFIG = {
+    "path": os.getenv(
+        "EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(__file__), "data", "embedding_cache")
+    ),
+    "max_entries": int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", 50000)),
+}
+
+# 참고 문서 적재 설정 (backend/ingest.py)
+# upsert_max_bytes는 Pinecone 요청 크기 제한(2MB)보다 여유 있게 설정
+INGEST_CONFIG = {
+    "chunk_size": 800,
+    "chunk_overlap": 100,
+    "embed_batch_size": 64,
+    "concurrency": 4,
+    "upsert_batch_size": 100,
+    "upsert_max_bytes": 1_500_000,
+    "max_retries": 3,
+}
+
+# 면접 질문 중복 제거 설정 (backend/question_dedup.py)
+# threshold 이상 유사한 질문은 중복으로 버림, history_limit개까지 사용자의 이전 면접 질문도 비교 (0이면 현재 세션만)
+QUESTION_DEDUP_CONFIG = {
+    "threshold": float(os.getenv("QUESTION_DEDUP_THRESHOLD", 0.9)),
+    "context_threshold": float(os.getenv("QUESTION_DEDUP_CONTEXT_THRESHOLD", 0.85)),
+    "max_questions": 500,
+    "history_limit": int(os.getenv("QUESTION_DEDUP_HISTORY", 100)),
+}
+
+# 평가 워크플로우 checkpoint 저장소 (backend/checkpoints.py)
+# memory: thread(면접 세션)마다 최신 checkpoint만 보관, max_threads / ttl(초)로 제한
+# postgres: langgraph-checkpoint-postgres 설치 필요, DB_CONFIG의 PostgreSQL에 저장
+CHECKPOINT_CONFIG = {
+    "backend": os.getenv("CHECKPOINT_BACKEND", "memory"),
+    "max_threads": int(os.getenv("CHECKPOINT_MAX_THREADS", 1000)),
+    "ttl": float(os.getenv("CHECKPOINT_TTL", 3600)),
+    "pool_size": 4,
+}
+
+# LLM 응답 캐시 설정 (backend/llm_cache.py), ttl(초) 동안 사용하지 않은 응답은 삭제
+LLM_CACHE_CONFIG = {
+    "path": os.getenv(
+        "LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "data", "llm_cache.sqlite3")
+    ),
+    "max_entries": int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000)),
+    "ttl": float(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600)),
+}
+
+# 호출 위치별 캐시 사용 정책 (variants: key마다 보관할 응답 수, 다 모인 뒤부터 캐시 사용)
+# evaluation은 답변이 max_answer_chars 이하(빈 답변, "모르겠습니다" 등)일 때만 사용
+_LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_POLICY = {
+    "question": {"enabled": _LLM_CACHE_ENABLED, "variants": 5},
+    "evaluation": {"enabled": _LLM_CACHE_ENABLED, "variants": 3, "max_answer_chars": 30},
+}
+
+# OpenAI HTTP 연결 풀 설정 (backend/llm_clients.py), timeout 단위는 초
+OPENAI_HTTP_CONFIG = {
+    "max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", 20)),
+    "max_keepalive_connections": int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", 10)),
+    "keepalive_expiry": float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", 60)),
+    "connect_timeout": float(os.getenv("OPENAI_CONNECT_TIMEOUT", 5)),
+    "read_timeout": float(os.getenv("OPENAI_READ_TIMEOUT", 60)),
+    "pool_timeout": float(os.getenv("OPENAI_POOL_TIMEOUT", 10)),
+    "max_retries": int(os.getenv("OPENAI_MAX_RETRIES", 2)),
+}
+
+# 다음 질문 추측 실행 설정 (backend/speculation.py)
+# max_workers: 동시에 미리 생성할 질문 수 (동시 면접 세션 수에 맞춤, 넘치는 요청은 take() 시 직접 생성)
+# timeout: 생성 중인 질문을 기다리는 최대 시간 (초), 넘으면 직접 생성
+SPECULATION_CONFIG = {
+    "max_workers": int(os.getenv("SPECULATION_WORKERS", 4)),
+    "timeout": float(os.getenv("SPECULATION_TIMEOUT", 30)),
+}
+
+# 프롬프트 문맥 토큰 예산 (backend/context_assembly.py)
+# question_tokens: 질문 생성 문맥 (작은 chunk는 예산까지 병합), evaluation_tokens / answer_tokens: 평가 프롬프트의 문맥 / 답변
+# merge는 질문 응답 캐시(LLM_CACHE_POLICY["question"])를 사용하지 않을 때만 적용 (병합한 문맥은 사용자마다 달라 캐시 적중 X)
+CONTEXT_BUDGET_CONFIG = {
+    "question_tokens": int(os.getenv("CONTEXT_QUESTION_TOKENS", 800)),
+    "evaluation_tokens": int(os.getenv("CONTEXT_EVALUATION_TOKENS", 1200)),
+    "answer_tokens": int(os.getenv("CONTEXT_ANSWER_TOKENS", 1000)),
+    "merge": os.getenv("CONTEXT_MERGE_CHUNKS", "true").lower() == "true",
+    "min_chunk_tokens": 50,
+}
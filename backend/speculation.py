@@ -0,0 +1,134 @@
+"""
+추측 실행(speculative execution)
+
+- 사용자가 다음에 요청할 가능성이 높은 작업(예: 다음 면접 질문 생성)을 미리 백그라운드 스레드에서 시작
+- 실제로 요청되면 take()로 결과를 바로 받고, 아직 실행 중이면 남은 시간만 대기
+- 필요 없어지면 discard()로 버림 (아직 시작 전이면 취소, 실행 중이면 결과만 무시)
+- 요청 시 작업 스레드가 모두 바빠 아직 시작도 못 했으면 취소하고 호출부에서 바로 실행 (실패 / 대기 대신 miss)
+- 지표: 시작 / 적중(요청 시 이미 완료) / 대기 후 사용 / 미시작(miss) / 실패 / 버림 횟수, 적중률, 절약한 시간
+
+작업 함수는 백그라운드 스레드에서 실행되므로 st.session_state 등 Streamlit 상태에 접근하지 않아야 함
+(필요한 값은 시작할 때 인자로 전달)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Speculation:
+    def __init__(self, speculator, started_at):
+        """
+        :param speculator: 이 작업을 시작한 Speculator (지표 기록용)
+        :param started_at: 작업 시작 시각 (time.monotonic)
+        """
+        self._speculator = speculator
+        self._future = None  # Speculator.start에서 작업 제출 후 설정
+        self.started_at = started_at
+        self.finished_at = None
+        self._settled = False  # take / discard는 한 번만 반영
+
+    def done(self):
+        """작업이 끝났는지 여부"""
+        return self._future.done()
+
+    def take(self, timeout=None):
+        """
+        결과 반환 (실행 중이면 timeout초까지 대기)
+        작업이 아직 시작 전이거나, 실패하거나 시간 안에 끝나지 않으면 None (호출부에서 직접 실행)
+        """
+        # 대기열에 있던 작업을 기다리면 직접 실행하는 것보다 늦으므로 취소하고 miss로 기록
+        if self._future.cancel():
+            self._settle("misses")
+            return None
+        ready = self._future.done()
+        wait_start = time.monotonic()
+        try:
+            result = self._future.result(timeout)
+        except Exception as e:
+            print(f"Speculative task failed: {e}")
+            self._settle("failed")
+            return None
+        waited = time.monotonic() - wait_start
+
+        # 추측 실행이 없었다면 작업 시간 전체를 기다렸어야 하므로, 실제 대기 시간과의 차이가 절약한 시간
+        duration = (self.finished_at or time.monotonic()) - self.started_at
+        self._settle("hits" if ready else "waits", saved=max(duration - waited, 0.0))
+        return result
+
+    def discard(self):
+        """결과를 사용하지 않음 (시작 전이면 취소)"""
+        self._future.cancel()
+        self._settle("discarded")
+
+    def _settle(self, outcome, saved=0.0):
+        if not self._settled:
+            self._settled = True
+            self._speculator._record(outcome, saved)
+
+
+class Speculator:
+    def __init__(self, max_workers=4, name="speculation"):
+        """
+        :param max_workers: 동시에 실행할 최대 추측 작업 수 (LLM / 검색 호출은 I/O 대기이므로 스레드 사용)
+        :param name: 작업 스레드 이름 접두사
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._lock = threading.Lock()
+        self._started = 0
+        self._hits = 0
+        self._waits = 0
+        self._misses = 0
+        self._failed = 0
+        self._discarded = 0
+        self._time_saved = 0.0
+
+    def start(self, func, *args, **kwargs):
+        """func(*args, **kwargs)를 백그라운드에서 시작하고 Speculation 반환"""
+        speculation = Speculation(self, time.monotonic())
+
+        def run():
+            try:
+                return func(*args, **kwargs)
+            finally:
+                speculation.finished_at = time.monotonic()
+
+        with self._lock:
+            self._started += 1
+        speculation._future = self._executor.submit(run)
+        return speculation
+
+    def _record(self, outcome, saved):
+        with self._lock:
+            if outcome == "hits":
+                self._hits += 1
+            elif outcome == "waits":
+                self._waits += 1
+            elif outcome == "misses":
+                self._misses += 1
+            elif outcome == "failed":
+                self._failed += 1
+            else:
+                self._discarded += 1
+            self._time_saved += saved
+
+    def stats(self):
+        """추측 실행 지표 (hit_rate = 결과를 요청했을 때 이미 완료되어 있던 비율)"""
+        with self._lock:
+            used = self._hits + self._waits
+            requested = used + self._misses + self._failed
+            return {
+                "started": self._started,
+                "hits": self._hits,
+                "waits": self._waits,
+                "misses": self._misses,
+                "failed": self._failed,
+                "discarded": self._discarded,
+                "hit_rate": self._hits / requested if requested else 0.0,
+                "time_saved_seconds": self._time_saved,
+                "avg_time_saved_seconds": self._time_saved / used if used else 0.0,
+            }
+
+    def shutdown(self, wait=False):
+        """작업 스레드 종료 (대기 중인 작업은 취소)"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,71 @@
+"""
+저장소(storage backend) 선택
+
+- DB_BACKEND 환경 변수(.env 가능)로 저장소 선택: postgres (기본값) / sqlite
+- sqlite 사용 시 SQLITE_PATH 환경 변수로 파일 경로 지정 (기본값 backend/data/chatbot.sqlite3)
+- get_backend()는 처음 호출할 때 저장소를 만들고 프로세스 전체에서 공유
+- 테스트 / 벤치마크에서는 use_backend()로 저장소를 바꿔 같은 코드를 실행
+
+예시: DB_BACKEND=sqlite python -m pytest tests/test_db.py
+"""
+
+import os
+import threading
+
+from backend.storage.base import (  # noqa: F401
+    DataError,
+    IntegrityError,
+    StorageBackend,
+    StorageError,
+)
+
+DEFAULT_SQLITE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "data", "chatbot.sqlite3"
+)
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name, **options):
+    """이름으로 저장소 생성 (postgres / sqlite)"""
+    if name == "postgres":
+        from backend.storage.postgres import PostgresBackend
+
+        return PostgresBackend(**options)
+    if name == "sqlite":
+        from backend.storage.sqlite import SQLiteBackend
+
+        options.setdefault("path", os.getenv("SQLITE_PATH", DEFAULT_SQLITE_PATH))
+        return SQLiteBackend(**options)
+    raise ValueError(f"Unknown storage backend: {name!r} (postgres / sqlite)")
+
+
+def get_backend():
+    """프로세스 공용 저장소 반환 (없으면 DB_BACKEND 설정으로 생성)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(os.getenv("DB_BACKEND", "postgres").lower())
+    return _backend
+
+
+def use_backend(name, **options):
+    """사용할 저장소를 바꾸고 새 저장소 반환 (기존 저장소는 닫음)"""
+    global _backend
+    backend = create_backend(name, **options)
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    if previous is not None:
+        previous.close()
+    return backend
+
+
+def close_backend():
+    """현재 저장소를 닫음 (다음 get_backend() 호출 시 다시 생성)"""
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, None
+    if previous is not None:
+        previous.close()
@@ -0,0 +1,69 @@
+"""
+저장소(storage backend) 공통 인터페이스
+
+- db.py / accounts.py / purge.py는 SQL 실행을 이 인터페이스로만 수행
+- 쿼리는 backend/queries.py에 등록된 이름으로 실행하고, 결과는 컬럼 이름을 key로 하는 dict 리스트
+- 구현체: PostgresBackend (운영), SQLiteBackend (로컬 테스트 / 벤치마크)
+"""
+
+
+class StorageError(Exception):
+    """저장소 사용 중 발생하는 오류"""
+
+
+class IntegrityError(StorageError):
+    """UNIQUE / FK 등 제약 조건 위반 (예: 중복 username)"""
+
+
+class DataError(StorageError):
+    """컬럼 타입 / 길이 등에 맞지 않는 값"""
+
+
+class StorageBackend:
+    # 저장소 이름 (postgres, sqlite)
+    name = None
+
+    def connection(self, timeout=None):
+        """with 문에서 사용할 DB-API 연결 대여 (사용 후 자동 반환)"""
+        raise NotImplementedError
+
+    def getconn(self, timeout=None):
+        """DB-API 연결 대여 (putconn으로 반환)"""
+        raise NotImplementedError
+
+    def putconn(self, conn, discard=False):
+        """getconn으로 대여한 연결 반환"""
+        raise NotImplementedError
+
+    def query(self, name, params=(), commit=False):
+        """등록된 쿼리를 실행하고 결과 행(dict) 리스트 반환 (commit=True면 INSERT ... RETURNING 등 반영)"""
+        raise NotImplementedError
+
+    def execute(self, name, params=()):
+        """결과 행이 없는 등록 쿼리(UPDATE / DELETE) 실행 후 commit, 변경된 행 수 반환"""
+        raise NotImplementedError
+
+    def stream(self, name, params, chunk_size):
+        """등록된 조회 쿼리 결과를 chunk_size개씩 나눠 반환하는 generator"""
+        raise NotImplementedError
+
+    def write_messages(self, rows):
+        """채팅 메시지 여러 개를 한 트랜잭션으로 저장 (이미 저장된 message_uid는 무시)"""
+        raise NotImplementedError
+
+    def register_users(self, rows):
+        """(username, 해싱된 비밀번호) 여러 개를 한 트랜잭션으로 저장, 새로 저장된 행({"id", "username"}) 리스트 반환
+        (이미 있는 username은 오류 없이 건너뜀)"""
+        raise NotImplementedError
+
+    def run_sql(self, sql, params=()):
+        """등록되지 않은 $n placeholder SQL 실행 후 commit (테스트 / 관리 작업용), 결과 행 리스트 반환"""
+        raise NotImplementedError
+
+    def stats(self):
+        """연결 / 풀 지표"""
+        raise NotImplementedError
+
+    def close(self):
+        """열린 연결을 모두 닫음"""
+        raise NotImplementedError
@@ -0,0 +1,149 @@
+"""
+PostgreSQL 저장소 (운영 환경)
+
+- secrets.toml의 [postgres] 설정으로 스레드 안전 Connection Pool(backend/pool.py)을 만들어 사용
+- 등록된 쿼리는 연결마다 한 번 PREPARE 후 EXECUTE (backend/queries.py)
+- 풀 대기 시간은 계측 중인 DB 함수(backend/metrics.py)에 누적
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+
+import psycopg2
+import streamlit as st
+from psycopg2.extras import RealDictCursor
+
+from backend import metrics, queries
+from backend.pool import ConnectionPool
+from backend.storage.base import DataError, IntegrityError, StorageBackend
+
+
+class PostgresBackend(StorageBackend):
+    name = "postgres"
+
+    def __init__(self):
+        # 설정은 이 저장소를 선택했을 때만 읽음 (SQLite 사용 시 secrets 불필요)
+        from backend.config import (
+            DB_CONFIG,
+            DB_POOL_CONFIG,
+            DB_PREPARED_STATEMENTS,
+            DB_SLOW_QUERY_THRESHOLD,
+        )
+
+        self._db_config = DB_CONFIG
+        queries.configure(use_prepared=DB_PREPARED_STATEMENTS)
+        metrics.configure(slow_threshold=DB_SLOW_QUERY_THRESHOLD)
+        self.pool = ConnectionPool(self._connect, **DB_POOL_CONFIG)
+        print("Database connection pool created successfully.")
+
+    def _connect(self):
+        return psycopg2.connect(
+            dbname=self._db_config["database"],
+            user=self._db_config["user"],
+            password=self._db_config["password"],
+            host=self._db_config["host"],
+            port=self._db_config["port"],
+            sslmode=st.secrets["postgres"].get("SSL_MODE", "require"),  # 기본값 'require'
+        )
+
+    def getconn(self, timeout=None):
+        start = time.perf_counter()
+        try:
+            return self.pool.getconn(timeout)
+        finally:
+            metrics.add_pool_wait(time.perf_counter() - start)  # 계측 중인 호출에 풀 대기 시간 누적
+
+    def putconn(self, conn, discard=False):
+        self.pool.putconn(conn, discard=discard)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True  # 연결 오류 시 해당 연결은 폐기
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def _run(self, conn, run, commit):
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                run(cur)
+                rows = cur.fetchall() if cur.description else []
+                count = cur.rowcount
+            if commit:
+                conn.commit()
+            return rows, count
+        except psycopg2.IntegrityError as e:
+            conn.rollback()
+            raise IntegrityError(str(e)) from e
+        except psycopg2.DataError as e:
+            conn.rollback()
+            raise DataError(str(e)) from e
+
+    def query(self, name, params=(), commit=False):
+        with self.connection() as conn:
+            rows, _ = self._run(conn, lambda cur: queries.execute(cur, name, params), commit)
+        return [dict(row) for row in rows]
+
+    def execute(self, name, params=()):
+        with self.connection() as conn:
+            _, count = self._run(conn, lambda cur: queries.execute(cur, name, params), True)
+        return count
+
+    def stream(self, name, params, chunk_size):
+        # named cursor는 EXECUTE를 사용할 수 없으므로 등록된 SQL을 그대로 실행
+        query, ordered = queries.to_pyformat(name, params)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(
+                    name=f"stream_{uuid.uuid4().hex}", cursor_factory=RealDictCursor
+                ) as cur:
+                    cur.itersize = chunk_size
+                    with queries.timed(name):
+                        cur.execute(query, ordered)
+                    while True:
+                        rows = cur.fetchmany(chunk_size)
+                        if not rows:
+                            break
+                        yield rows
+            finally:
+                conn.rollback()  # named cursor용 트랜잭션 종료
+
+    def write_messages(self, rows):
+        # 컬럼별 배열로 전달하여 행 수와 관계없이 같은 prepared statement 사용
+        params = (
+            [row["message_uid"] for row in rows],
+            [row["session_id"] for row in rows],
+            [row["sender"] for row in rows],
+            [row["message"] for row in rows],
+            [row["timestamp"] for row in rows],
+        )
+        with self.connection() as conn:
+            self._run(
+                conn, lambda cur: queries.execute(cur, "insert_chat_messages", params), True
+            )
+
+    def register_users(self, rows):
+        params = ([username for username, _ in rows], [password for _, password in rows])
+        with self.connection() as conn:
+            created, _ = self._run(
+                conn, lambda cur: queries.execute(cur, "register_users", params), True
+            )
+        return [dict(row) for row in created]
+
+    def run_sql(self, sql, params=()):
+        query, ordered = queries.pyformat(sql, params)
+        with self.connection() as conn:
+            rows, _ = self._run(conn, lambda cur: cur.execute(query, ordered), True)
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        return dict(self.pool.stats(), backend=self.name)
+
+    def close(self):
+        self.pool.closeall()
@@ -0,0 +1,266 @@
+"""
+SQLite 저장소 (로컬 테스트 / 벤치마크용 내장 엔진)
+
+- 네트워크나 secrets 없이 db.py / accounts.py의 데이터 경로 전체를 실행
+- WAL 모드로 열어 읽기와 쓰기가 서로를 막지 않음 (동시에 쓰는 스레드는 busy_timeout 동안 대기)
+- sqlite3 연결은 동시에 여러 스레드가 쓸 수 없으므로 사용 중이 아닌 연결을 목록에 보관했다가 재사용
+- backend/queries.py의 $n placeholder를 SQLite의 ?n 으로 바꿔 실행하고,
+  문법이 다른 쿼리(배열 unnest, 데이터 변경 CTE)만 SQLITE_QUERIES에서 재정의
+- 첫 연결 시 스키마를 만들고, 시각은 UTC 기준 마이크로초 단위 문자열로 저장하여 정렬 순서 유지
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+from backend import queries
+from backend.storage.base import DataError, IntegrityError, StorageBackend
+
+SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL,
+        is_active BOOLEAN NOT NULL DEFAULT TRUE,
+        created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now'))
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_sessions (
+        id INTEGER PRIMARY KEY,
+        user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+        created_at TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now'))
+    );
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER PRIMARY KEY,
+        message_uid TEXT UNIQUE,
+        session_id INTEGER NOT NULL REFERENCES chat_sessions (id) ON DELETE CASCADE,
+        sender TEXT NOT NULL,
+        message TEXT NOT NULL,
+        timestamp TIMESTAMP NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f000', 'now'))
+    );
+    """,
+    # backend/migrations.py의 hot-path 인덱스와 같은 조회 경로
+    "CREATE INDEX IF NOT EXISTS chat_messages_session_ts_idx ON chat_messages (session_id, timestamp, id);",
+    "CREATE INDEX IF NOT EXISTS chat_sessions_user_created_idx ON chat_sessions (user_id, created_at DESC, id DESC);",
+    "CREATE INDEX IF NOT EXISTS chat_sessions_created_idx ON chat_sessions (created_at DESC, id DESC);",
+]
+
+# PostgreSQL 전용 문법을 쓰는 등록 쿼리의 SQLite 버전 (여러 문장은 한 트랜잭션으로 실행)
+SQLITE_QUERIES = {
+    "insert_chat_messages": """
+        INSERT OR IGNORE INTO chat_messages (message_uid, session_id, sender, message, timestamp)
+        VALUES (?1, ?2, ?3, ?4, ?5);
+    """,
+    "register_users": """
+        INSERT INTO users (username, password) VALUES (?1, ?2)
+        ON CONFLICT (username) DO NOTHING
+        RETURNING id, username;
+    """,
+    "delete_chat_session": (
+        "DELETE FROM chat_messages WHERE session_id = ?1;",
+        "DELETE FROM chat_sessions WHERE id = ?1;",
+    ),
+    "delete_all_user_sessions": (
+        """
+        DELETE FROM chat_messages
+        WHERE session_id IN (SELECT id FROM chat_sessions WHERE user_id = ?1);
+        """,
+        "DELETE FROM chat_sessions WHERE user_id = ?1;",
+    ),
+}
+
+_PLACEHOLDER = re.compile(r"\$(\d+)")
+
+
+def _adapt_datetime(value):
+    # UTC 기준 고정 길이 문자열로 저장 (문자열 비교 = 시간 비교)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(" ", "microseconds")
+
+
+def _convert_timestamp(value):
+    return datetime.fromisoformat(value.decode()).replace(tzinfo=timezone.utc)
+
+
+sqlite3.register_adapter(datetime, _adapt_datetime)
+sqlite3.register_adapter(uuid.UUID, str)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, path, timeout=10.0):
+        """
+        :param path: 데이터베이스 파일 경로 (없으면 생성)
+        :param timeout: 다른 스레드가 쓰는 중일 때 기다리는 최대 시간 (초)
+        """
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._idle = []  # 대여 가능한 연결
+        self._connections = []  # 열려 있는 모든 연결
+        self._closed = False
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self.connection() as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.timeout,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # 반환된 연결을 다른 스레드가 이어서 사용
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA synchronous = NORMAL;")  # WAL에서는 checkpoint 때만 fsync
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    def getconn(self, timeout=None):
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("SQLite backend is closed.")
+            if self._idle:
+                return self._idle.pop()
+        conn = self._connect()
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def putconn(self, conn, discard=False):
+        if conn.in_transaction:
+            conn.rollback()  # 남은 트랜잭션 정리 후 반환
+        with self._lock:
+            if not discard and not self._closed:
+                self._idle.append(conn)
+                return
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+        finally:
+            self.putconn(conn)
+
+    def _statements(self, name):
+        statements = SQLITE_QUERIES.get(name, queries.sql(name))
+        if isinstance(statements, str):
+            statements = (statements,)
+        return [_PLACEHOLDER.sub(r"?\1", statement) for statement in statements]
+
+    def _run(self, name, statements, params, commit):
+        rows, count = [], 0
+        with self.connection() as conn:
+            try:
+                with queries.timed(name) if name else nullcontext():
+                    for statement in statements:
+                        cur = conn.execute(statement, params)
+                        rows = cur.fetchall()
+                        count += max(cur.rowcount, 0)
+                if commit:
+                    conn.commit()
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                raise IntegrityError(str(e)) from e
+        return [dict(row) for row in rows], count
+
+    def query(self, name, params=(), commit=False):
+        rows, _ = self._run(name, self._statements(name), tuple(params), commit)
+        return rows
+
+    def execute(self, name, params=()):
+        _, count = self._run(name, self._statements(name), tuple(params), True)
+        return count
+
+    def stream(self, name, params, chunk_size):
+        (statement,) = self._statements(name)
+        with self.connection() as conn:
+            with queries.timed(name):
+                cur = conn.execute(statement, tuple(params))
+            try:
+                while True:
+                    rows = cur.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield [dict(row) for row in rows]
+            finally:
+                cur.close()
+
+    def write_messages(self, rows):
+        (statement,) = self._statements("insert_chat_messages")
+        params = [
+            (
+                row["message_uid"],
+                row["session_id"],
+                row["sender"],
+                row["message"],
+                row["timestamp"],
+            )
+            for row in rows
+        ]
+        with self.connection() as conn:
+            try:
+                with queries.timed("insert_chat_messages"):
+                    conn.executemany(statement, params)
+                conn.commit()
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                raise IntegrityError(str(e)) from e
+            except sqlite3.DataError as e:
+                conn.rollback()
+                raise DataError(str(e)) from e
+
+    def register_users(self, rows):
+        # RETURNING은 executemany와 함께 쓸 수 없으므로 한 트랜잭션 안에서 행마다 실행
+        (statement,) = self._statements("register_users")
+        created = []
+        with self.connection() as conn:
+            try:
+                with queries.timed("register_users"):
+                    for row in rows:
+                        created.extend(dict(r) for r in conn.execute(statement, tuple(row)))
+                conn.commit()
+            except sqlite3.IntegrityError as e:
+                conn.rollback()
+                raise IntegrityError(str(e)) from e
+        return created
+
+    def run_sql(self, sql, params=()):
+        rows, _ = self._run(None, [_PLACEHOLDER.sub(r"?\1", sql)], tuple(params), True)
+        return rows
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.name,
+                "path": self.path,
+                "connections": len(self._connections),
+                "idle": len(self._idle),
+            }
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            connections, self._connections = self._connections, []
+            self._idle = []
+        for conn in connections:
+            conn.close()
@@ -0,0 +1,99 @@
+"""
+cold start(import) 시간 측정
+
+- 새 Python 프로세스에서 `python -X importtime -c "import <module>"`을 실행하여
+  전체 import 시간과 누적 시간이 가장 큰 모듈을 출력
+- 매번 새 프로세스를 사용하므로 이미 import된 모듈의 영향 없이 Streamlit 페이지의 cold start와 같은 조건
+- --repeat 번 실행한 중앙값을 사용, 이전 결과(--json으로 저장)를 --baseline으로 주면 전후 비교
+
+실행 예시:
+    python -m benchmarks.import_profile
+    python -m benchmarks.import_profile backend.config backend.langchain_chatbot --json after.json --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DEFAULT_MODULES = ["backend.config", "backend.langchain_chatbot", "backend.accounts"]
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_importtime(stderr):
+    # "import time: self [us] | cumulative | imported package" 형식의 줄을 (모듈, 누적 us)로 변환
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((name.rstrip()[1:], int(cumulative)))  # 하위 모듈은 앞에 공백 2칸씩 추가
+    return entries
+
+
+def profile(module, repeat=3, top=10):
+    """module 하나의 cold import 시간(ms)과 누적 시간이 큰 하위 모듈 목록 반환"""
+    totals, entries, error = [], [], None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+        )
+        entries = _parse_importtime(proc.stderr)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1]  # 예: secrets / 네트워크가 필요한 경우
+            break
+        top_level = [us for name, us in entries if not name.startswith(" ")]
+        totals.append(sum(top_level) / 1000)
+
+    slowest = sorted(
+        ((name.strip(), us / 1000) for name, us in entries), key=lambda item: -item[1]
+    )[:top]
+    return {
+        "module": module,
+        "import_ms": statistics.median(totals) if totals else None,
+        "error": error,
+        "slowest": slowest,
+    }
+
+
+def _print_result(result, baseline=None):
+    if result["error"]:
+        print(f"\n{result['module']}: import failed ({result['error']})")
+        return
+    line = f"\n{result['module']}: {result['import_ms']:,.0f} ms"
+    before = (baseline or {}).get(result["module"])
+    if before and before.get("import_ms"):
+        line += f" (baseline {before['import_ms']:,.0f} ms, {result['import_ms'] - before['import_ms']:+,.0f} ms)"
+    elif before and before.get("error"):
+        line += f" (baseline failed: {before['error']})"
+    print(line)
+    for name, ms in result["slowest"]:
+        print(f"  {ms:>9,.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈별 cold import 시간 측정")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument("--top", type=int, default=10, help="출력할 느린 하위 모듈 수")
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {result["module"]: result for result in json.load(f)}
+
+    results = [profile(module, args.repeat, args.top) for module in args.modules]
+    for result in results:
+        _print_result(result, baseline)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,87 @@
+"""
+긴 면접에서 평가 워크플로우 checkpoint가 차지하는 메모리 벤치마크
+
+- legacy: 브라우저 세션마다 그래프 + MemorySaver를 새로 만들고 답변마다 새 thread_id 사용 (이전 방식)
+- shared: 프로세스 공용 그래프 + BoundedMemorySaver, 면접 세션 = thread_id (backend/checkpoints.py)
+- 방식마다 별도 프로세스에서 세션 수 x 답변 수만큼 평가를 실행하고 RSS 증가량과 보관 중인 checkpoint 수 비교
+- 평가 모델은 고정 응답을 스트리밍하는 GenericFakeChatModel (OpenAI 호출 없음)
+
+실행 예시:
+    python -m benchmarks.interview_memory --sessions 20 --turns 30
+"""
+
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from backend.checkpoints import BoundedMemorySaver
+from backend.langchain_chatbot import initialize_evaluation_workflow, stream_evaluation
+from backend.metrics import process_memory
+
+ANSWER = "파이썬의 GIL은 한 번에 하나의 스레드만 바이트코드를 실행하도록 하는 잠금입니다. " * 20
+EVALUATION = "평가: 핵심 개념은 정확합니다. 모범답안: I/O 작업에서는 GIL이 해제되므로 " * 40
+
+
+def run(mode, sessions, turns, max_threads):
+    """방식 하나로 평가를 실행하고 RSS 증가량 / checkpoint 수 반환"""
+    llm = GenericFakeChatModel(messages=itertools.cycle([AIMessage(content=EVALUATION)]))
+    shared = initialize_evaluation_workflow(BoundedMemorySaver(max_threads=max_threads), llm)
+    savers = []
+    before = process_memory()["rss_bytes"]
+    for session in range(sessions):
+        if mode == "legacy":
+            saver = MemorySaver()
+            savers.append(saver)  # 이전 방식: 브라우저 세션이 살아 있는 동안 st.session_state.app이 보관
+            app = initialize_evaluation_workflow(saver, llm)
+        else:
+            app = shared
+        for turn in range(turns):
+            thread_id = f"{session}-{turn}" if mode == "legacy" else str(session)
+            config = {"configurable": {"thread_id": thread_id, "question": "Q", "context": "C"}}
+            stream_evaluation(app, {"role": "user", "content": ANSWER}, config)
+    if mode == "legacy":
+        checkpoints = sum(
+            len(checkpoints)
+            for saver in savers
+            for namespaces in saver.storage.values()
+            for checkpoints in namespaces.values()
+        )
+    else:
+        checkpoints = shared.checkpointer.stats()["checkpoints"]
+    return {
+        "mode": mode,
+        "rss_growth_mb": (process_memory()["rss_bytes"] - before) / 2**20,
+        "checkpoints": checkpoints,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="평가 워크플로우 checkpoint 메모리 벤치마크")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--max-threads", type=int, default=1000)
+    parser.add_argument("--mode", choices=["legacy", "shared"], help="지정하면 현재 프로세스에서 한 방식만 실행")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.mode, args.sessions, args.turns, args.max_threads)))
+    else:
+        # RSS는 해제된 메모리를 바로 반환하지 않으므로 방식마다 새 프로세스에서 측정
+        for mode in ("legacy", "shared"):
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.interview_memory", "--mode", mode,
+                 "--sessions", str(args.sessions), "--turns", str(args.turns),
+                 "--max-threads", str(args.max_threads)],
+                capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"{mode:<7} sessions={args.sessions} turns={args.turns}: "
+                f"RSS +{result['rss_growth_mb']:.1f} MB, {result['checkpoints']} checkpoints"
+            )
@@ -0,0 +1,88 @@
+"""
+동시 로그인 지연 시간(p50 / p95 / p99)과 처리량 벤치마크
+
+- accounts.authenticate 전체 경로(사용자 조회 + bcrypt 검증)를 여러 스레드에서 동시에 실행
+- --workers 값을 여러 개 주면 bcrypt 실행 방식별로 비교 (0 = 호출 스레드에서 직접 실행)
+- 기본값은 SQLite 저장소(임시 파일)이므로 네트워크 / secrets 없이 실행 가능
+
+실행 예시:
+    python -m benchmarks.login_benchmark --workers 0 4 --concurrency 16 --logins 200
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import metrics, passwords, storage
+from backend.accounts import authenticate, register_user
+
+USERS = 20
+PASSWORD = "BenchmarkPassword123!"
+USERNAMES = [f"bench_login_{i}" for i in range(USERS)]
+
+
+def _login(username):
+    start = time.perf_counter()
+    user = authenticate(username, PASSWORD)
+    if user is None:
+        raise RuntimeError(f"login failed for {username}")
+    return time.perf_counter() - start
+
+
+def run(workers, logins=200, concurrency=16):
+    """bcrypt worker 수 하나에 대해 동시 로그인 벤치마크 실행"""
+    passwords.configure(workers=workers)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(_login, USERNAMES[:concurrency]))  # process pool / 연결 준비
+        start = time.perf_counter()
+        latencies = list(pool.map(_login, (USERNAMES[i % USERS] for i in range(logins))))
+        elapsed = time.perf_counter() - start
+
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "workers": workers,
+        "rounds": passwords.current_rounds(),
+        "concurrency": concurrency,
+        "logins": logins,
+        "logins_per_sec": logins / elapsed,
+        "p50_ms": cuts[49] * 1000,
+        "p95_ms": cuts[94] * 1000,
+        "p99_ms": cuts[98] * 1000,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="동시 로그인 지연 시간 / 처리량 벤치마크")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, help="bcrypt cost (기본값 BCRYPT_ROUNDS)")
+    parser.add_argument("--backend", default="sqlite", choices=["postgres", "sqlite"])
+    args = parser.parse_args()
+
+    options = {}
+    if args.backend == "sqlite":
+        options["path"] = os.path.join(tempfile.mkdtemp(), "login_benchmark.sqlite3")
+    backend = storage.use_backend(args.backend, **options)
+    metrics.configure(slow_threshold=float("inf"))  # 모든 로그인이 느린 호출로 기록되지 않도록
+    if args.rounds:
+        passwords.configure(rounds=args.rounds)
+    try:
+        for username in USERNAMES:
+            register_user(username, PASSWORD)
+        for workers in args.workers:
+            result = run(workers, args.logins, args.concurrency)
+            print(
+                f"workers={result['workers']:<3} rounds={result['rounds']} "
+                f"concurrency={result['concurrency']}: "
+                f"{result['logins_per_sec']:8.1f} logins/s  "
+                f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+                f"p99 {result['p99_ms']:7.1f} ms"
+            )
+    finally:
+        backend.run_sql("DELETE FROM users WHERE username LIKE 'bench_login_%';")
+        passwords.shutdown()
+        storage.close_backend()
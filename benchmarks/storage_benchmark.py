@@ -0,0 +1,152 @@
+"""
+저장소(storage backend)별 메시지 저장 / 대화 내역 조회 처리량 벤치마크
+
+- db.py의 실제 데이터 경로(insert_chat_message -> journal batch 저장, get_chat_history,
+  get_chat_history_page)를 선택한 저장소마다 같은 순서로 실행하여 비교
+- SQLite 저장소는 임시 파일에서 실행하므로 네트워크 / secrets 없이 로컬에서 회귀 확인 가능
+
+실행 예시:
+    python -m benchmarks.storage_benchmark --backend sqlite
+    python -m benchmarks.storage_benchmark --backend postgres sqlite --messages 20000 --json result.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import uuid
+
+from backend import db, storage
+
+
+def _percentile(samples, q):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+def _latency_summary(samples):
+    return {
+        "p50_ms": _percentile(samples, 50) * 1000,
+        "p95_ms": _percentile(samples, 95) * 1000,
+        "max_ms": max(samples) * 1000 if samples else 0.0,
+    }
+
+
+def _cleanup(backend, username):
+    db.message_journal.flush(timeout=60)
+    backend.run_sql(
+        """
+        DELETE FROM chat_messages
+        WHERE session_id IN (
+            SELECT s.id FROM chat_sessions s JOIN users u ON s.user_id = u.id
+            WHERE u.username = $1
+        );
+        """,
+        (username,),
+    )
+    backend.run_sql(
+        "DELETE FROM chat_sessions WHERE user_id IN (SELECT id FROM users WHERE username = $1);",
+        (username,),
+    )
+    backend.run_sql("DELETE FROM users WHERE username = $1;", (username,))
+
+
+def run(backend_name, messages=5000, sessions=10, reads=200, page_size=50):
+    """저장소 하나에 대해 벤치마크를 실행하고 결과 dict 반환"""
+    options = {}
+    if backend_name == "sqlite":
+        options["path"] = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+    backend = storage.use_backend(backend_name, **options)
+    db.identity_cache.clear()
+
+    username = f"bench_{uuid.uuid4().hex[:12]}"
+    user_id = backend.run_sql(
+        "INSERT INTO users (username, password) VALUES ($1, $2) RETURNING id;",
+        (username, "benchmark"),
+    )[0]["id"]
+    try:
+        session_ids = [db.create_chat_session(user_id) for _ in range(sessions)]
+
+        # 메시지 저장: journal에 넣고 모두 DB에 반영될 때까지의 처리량
+        start = time.perf_counter()
+        for i in range(messages):
+            db.insert_chat_message(session_ids[i % sessions], "user", f"benchmark message {i}")
+        db.message_journal.flush(timeout=600)
+        insert_elapsed = time.perf_counter() - start
+
+        # 대화 내역 전체 조회
+        latencies, rows = [], 0
+        start = time.perf_counter()
+        for i in range(reads):
+            call_start = time.perf_counter()
+            rows += len(db.get_chat_history(session_ids[i % sessions]))
+            latencies.append(time.perf_counter() - call_start)
+        history_elapsed = time.perf_counter() - start
+
+        # keyset 페이지 조회로 한 세션 끝까지 읽기
+        page_latencies, page_rows, cursor = [], 0, None
+        start = time.perf_counter()
+        while True:
+            call_start = time.perf_counter()
+            page, cursor = db.get_chat_history_page(session_ids[0], page_size, after=cursor)
+            page_latencies.append(time.perf_counter() - call_start)
+            page_rows += len(page)
+            if cursor is None:
+                break
+        page_elapsed = time.perf_counter() - start
+
+        return {
+            "backend": backend_name,
+            "messages": messages,
+            "sessions": sessions,
+            "insert_messages_per_sec": messages / insert_elapsed,
+            "history_reads_per_sec": reads / history_elapsed,
+            "history_rows_per_sec": rows / history_elapsed,
+            "history_latency": _latency_summary(latencies),
+            "page_rows_per_sec": page_rows / page_elapsed,
+            "page_latency": _latency_summary(page_latencies),
+            "journal": db.message_journal.stats(),
+        }
+    finally:
+        _cleanup(backend, username)
+        storage.close_backend()
+
+
+def _print_result(result):
+    print(f"\n[{result['backend']}] {result['messages']} messages / {result['sessions']} sessions")
+    print(f"  insert            {result['insert_messages_per_sec']:>12,.0f} msg/s")
+    print(
+        f"  get_chat_history  {result['history_reads_per_sec']:>12,.1f} calls/s "
+        f"({result['history_rows_per_sec']:,.0f} rows/s, "
+        f"p50 {result['history_latency']['p50_ms']:.2f} ms, "
+        f"p95 {result['history_latency']['p95_ms']:.2f} ms)"
+    )
+    print(
+        f"  history pages     {result['page_rows_per_sec']:>12,.0f} rows/s "
+        f"(p50 {result['page_latency']['p50_ms']:.2f} ms, "
+        f"p95 {result['page_latency']['p95_ms']:.2f} ms)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장소별 DB 처리량 벤치마크")
+    parser.add_argument("--backend", nargs="+", default=["sqlite"], choices=["postgres", "sqlite"])
+    parser.add_argument("--messages", type=int, default=5000, help="저장할 메시지 수")
+    parser.add_argument("--sessions", type=int, default=10, help="메시지를 나눠 담을 세션 수")
+    parser.add_argument("--reads", type=int, default=200, help="get_chat_history 호출 횟수")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--json", help="결과를 저장할 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.backend:
+        result = run(name, args.messages, args.sessions, args.reads, args.page_size)
+        _print_result(result)
+        results.append(result)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, default=str)
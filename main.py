@@ -23,10 +23,11 @@ if not st.session_state["authenticated"]:
         )
 
         if st.button("로그인"):
-            if authenticate(input_username, input_password):
+            user = authenticate(input_username, input_password)
+            if user:
                 st.session_state["authenticated"] = True  # 로그인 상태 유지
                 st.session_state["username"] = input
-                login_user(input_username)  # 세션 상태 업데이트
+                login_user(user["username"], user["id"])  # 세션 상태 업데이트
                 st.success(f"🎉 환영합니다, {input_username}님!")
                 st.rerun()  # 화면 새로고침하여 UI 반영
             else:
@@ -40,8 +41,11 @@ if not st.session_state["authenticated"]:
             if not new_username or not new_password:
                 st.error("🚨 사용자명과 비밀번호를 입력해주세요!")
             else : 
-                if register_user(new_username, new_password):
+                registered = register_user(new_username, new_password)
+                if registered:
                     st.success("✅ 회원가입 성공! 로그인해주세요.")
+                elif registered is None:
+                    st.error("⏳ 요청이 많아 처리하지 못했습니다. 잠시 후 다시 시도해주세요.")
                 else:
                     st.error("❌ 이미 존재하는 아이디입니다.")
 
@@ -4,8 +4,8 @@ from backend.langchain_chatbot import (
     display_chat_history,
     handle_user_input,
     feedback_documents,
-    initialize_evaluation_workflow,
     generate_question,
+    discard_next_question,
 )
 from backend.db import create_chat_session, get_user_id
 from backend.utils import show_sidebar
@@ -20,26 +20,30 @@ if "authenticated" not in st.session_state or not st.session_state["authenticate
     st.warning("🚨 채팅을 사용하려면 먼저 로그인하세요.")
     st.stop()  # 로그인 안 했으면 실행 중지
 
-# 사용자 ID 가져오기
+# 사용자 ID 가져오기 (로그인 시 저장한 값 사용, 없으면 캐시된 조회)
 username = st.session_state["user"]
-user_id = get_user_id(username)
+user_id = st.session_state.get("user_id") or get_user_id(username)
 
 
 # "면접 시작하기" 버튼을 눌렀을 때 새로운 세션 생성
 if st.button("면접 시작하기"):
-    st.session_state.session_id = create_chat_session(user_id)  # 새로운 세션 생성
+    discard_next_question()  # 이전 면접에서 미리 생성 중이던 질문은 사용하지 않음
+    session_id = create_chat_session(user_id)  # 새로운 세션 생성
+    if session_id is None:
+        st.error("🚨 면접 세션을 만들지 못했습니다. 잠시 후 다시 시도해주세요.")
+        st.stop()
+    st.session_state.session_id = session_id
     st.session_state.interview_started = True
     st.session_state.show_continue_button = False  # 새 질문 생성 시 버튼 숨김
     st.session_state.first_question_asked = False  # 첫 질문 여부 초기화
-    initialize_session()  # 세션 초기화
+    initialize_session(user_id)  # 세션 초기화
     generate_question()  # 첫 질문 생성
     st.rerun()  # 페이지 새로고침하여 UI 갱신
 
 # 세션 상태 초기화 (최초 실행 시)
 if "initialized" not in st.session_state:
-    initialize_session()
+    initialize_session(user_id)
     feedback_documents()
-    st.session_state.app = initialize_evaluation_workflow()
     st.session_state.initialized = True
 
 # 채팅 기록 출력
@@ -62,6 +66,7 @@ if st.session_state.get("show_continue_button", False):
     with col2:
         if st.button("종료하고 저장"):
             st.write("면접을 종료합니다.")
+            discard_next_question()  # 미리 생성한 다음 질문 버림
 
             # 기존 대화 기록 삭제
             st.session_state.chat_history = []
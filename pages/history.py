@@ -1,12 +1,54 @@
 import streamlit as st
-from backend.db import get_user_chat_sessions, get_chat_history, get_user_id
+from backend.db import get_user_chat_sessions_page, get_chat_history_page, get_user_id
 from backend.accounts import is_authenticated
 from backend.utils import show_sidebar
 
+# 한 번에 불러올 세션 / 메시지 수
+SESSION_PAGE_SIZE = 20
+MESSAGE_PAGE_SIZE = 50
+
+
+# 페이지 단위 조회 상태 (owner가 바뀌면 첫 페이지부터 다시 조회)
+# 페이지를 다시 그릴 때마다 새로 생긴 항목을 반영하고, 이미 불러온 이전 페이지 / cursor는 유지
+# - newest_first(최신순 목록): 첫 페이지를 다시 조회하여 새 항목을 앞에 추가
+# - 시간순 목록: 마지막 페이지까지 불러왔으면 마지막 항목(cursor_of) 이후를 다시 조회하여 뒤에 추가
+def get_paged_state(state_key, owner, fetch_page, newest_first=False, cursor_of=None):
+    state = st.session_state.get(state_key)
+    if state is None or state["owner"] != owner:
+        state = {"owner": owner, "rows": [], "cursor": None, "done": False}
+        st.session_state[state_key] = state
+        load_next_page(state, fetch_page)
+    elif newest_first:
+        refresh_first_page(state, fetch_page)
+    elif state["done"] and state["rows"]:
+        load_next_page(state, fetch_page, cursor_of(state["rows"][-1]))
+    return state
+
+
+# 다음 페이지를 불러와 기존 목록 뒤에 추가 (cursor가 없으면 저장된 cursor 사용)
+def load_next_page(state, fetch_page, cursor=None):
+    rows, next_cursor = fetch_page(cursor if cursor is not None else state["cursor"])
+    state["rows"].extend(rows)
+    state["cursor"] = next_cursor
+    state["done"] = next_cursor is None
+
+
+# 첫 페이지를 다시 불러와 새 항목을 앞에 추가 (이전에 불러온 항목과 이어지지 않으면 첫 페이지부터 다시 시작)
+def refresh_first_page(state, fetch_page):
+    rows, next_cursor = fetch_page(None)
+    ids = {row["id"] for row in rows}
+    older = [row for row in state["rows"] if row["id"] not in ids]
+    if older and len(older) == len(state["rows"]):
+        older = []  # 새 항목이 한 페이지를 넘게 생겨 사이에 빠진 항목이 있음
+    state["rows"] = rows + older
+    if not older:
+        state["cursor"] = next_cursor
+        state["done"] = next_cursor is None
+
 
 # 채팅 히스토리 조회 페이지
 def display_chat_history():
-    """사용자의 모든 채팅 세션과 선택한 세션의 대화 내역을 조회하는 UI"""
+    """사용자의 채팅 세션과 선택한 세션의 대화 내역을 페이지 단위로 조회하는 UI"""
 
     # 로그인 여부 확인
     if not is_authenticated():
@@ -15,14 +57,18 @@ def display_chat_history():
 
     username = st.session_state["user"]  # 현재 로그인한 사용자 이름
 
-    # 사용자 ID 가져오기
-    user_id = get_user_id(username)
+    # 사용자 ID 가져오기 (로그인 시 저장한 값 사용, 없으면 캐시된 조회)
+    user_id = st.session_state.get("user_id") or get_user_id(username)
     if not user_id:
         st.error("사용자 정보를 찾을 수 없습니다.")
         return
 
-    # 사용자의 채팅 세션 목록 가져오기
-    sessions = get_user_chat_sessions(user_id)
+    # 사용자의 채팅 세션 목록 가져오기 (최신순, 한 페이지씩)
+    def fetch_sessions(cursor):
+        return get_user_chat_sessions_page(user_id, SESSION_PAGE_SIZE, before=cursor)
+
+    sessions_state = get_paged_state("history_sessions", user_id, fetch_sessions, newest_first=True)
+    sessions = sessions_state["rows"]
 
     if not sessions:
         st.info("저장된 채팅 내역이 없습니다.")
@@ -36,8 +82,21 @@ def display_chat_history():
         format_func=lambda x: session_options[x],
     )
 
-    # 특정 세션의 대화 내역 가져오기
-    chat_history = get_chat_history(selected_session_id)
+    if not sessions_state["done"] and st.button("이전 세션 더 불러오기"):
+        load_next_page(sessions_state, fetch_sessions)
+        st.rerun()
+
+    # 특정 세션의 대화 내역 가져오기 (시간순, 한 페이지씩)
+    def fetch_messages(cursor):
+        return get_chat_history_page(selected_session_id, MESSAGE_PAGE_SIZE, after=cursor)
+
+    messages_state = get_paged_state(
+        "history_messages",
+        selected_session_id,
+        fetch_messages,
+        cursor_of=lambda chat: (chat["timestamp"], chat["id"]),
+    )
+    chat_history = messages_state["rows"]
 
     if not chat_history:
         st.info("이 세션에는 대화 기록이 없습니다.")
@@ -52,6 +111,10 @@ def display_chat_history():
         st.write(chat["message"])
         st.markdown("---")
 
+    if not messages_state["done"] and st.button("대화 더 불러오기"):
+        load_next_page(messages_state, fetch_messages)
+        st.rerun()
+
 
 # Streamlit 실행 시 메인 함수 호출
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+import os
+import pytest
+from dotenv import load_dotenv
+from backend import db, llm_cache, storage
+
+# `.env` 파일 로드
+load_dotenv()
+
+# 테스트할 저장소 목록 (예: TEST_DB_BACKENDS=sqlite 로 PostgreSQL 없이 실행)
+TEST_DB_BACKENDS = os.getenv("TEST_DB_BACKENDS", "postgres,sqlite").split(",")
+
+
+@pytest.fixture(autouse=True)
+def isolated_llm_cache(tmp_path, monkeypatch):
+    """LLM 응답 캐시는 테스트마다 임시 파일 사용 (실제 캐시 파일에 쓰거나 이전 응답을 읽지 않도록)"""
+    cache = llm_cache.LLMCache(str(tmp_path / "llm_cache.sqlite3"))
+    monkeypatch.setattr(llm_cache, "_cache", cache)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(scope="module", params=TEST_DB_BACKENDS)
+def storage_backend(request, tmp_path_factory):
+    """같은 테스트를 PostgreSQL / SQLite 저장소에 각각 실행 (설정이 없는 저장소는 skip)"""
+    options = {}
+    if request.param == "sqlite":
+        options["path"] = str(tmp_path_factory.mktemp("storage") / "chatbot.sqlite3")
+    try:
+        backend = storage.use_backend(request.param, **options)
+        backend.run_sql("SELECT 1;")
+    except Exception as e:
+        storage.close_backend()
+        pytest.skip(f"{request.param} storage backend is not available: {e}")
+
+    yield backend
+
+    # 다음 저장소로 넘어가기 전에 남은 메시지 저장 및 캐시 정리
+    db.message_journal.flush()
+    db.identity_cache.clear()
+    storage.close_backend()
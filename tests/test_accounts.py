@@ -1,38 +1,35 @@
+import time
+from concurrent import futures
+
 import pytest
 import streamlit as st
+from backend import accounts, passwords
 from backend.accounts import (
     register_user,
+    hash_password,
     authenticate,
     delete_user,
     login_user,
     logout,
     is_authenticated,
 )
-from backend.db import get_connection, release_connection
+from backend.db import (
+    get_user_id,
+    identity_cache,
+    identity_cache_stats,
+)
 
 # 테스트용 계정 정보
 TEST_USERNAME = "pytest_test_user"
 TEST_PASSWORD = "TestPassword123!"
 
 
-@pytest.fixture(scope="module")
-def db_connection():
-    """데이터베이스 연결을 설정하고 테스트 후 정리"""
-    conn = get_connection()
-    yield conn
-    release_connection(conn)
-
-
 @pytest.fixture(autouse=True)
-def cleanup_user(db_connection):
+def cleanup_user(storage_backend):
     """테스트 전후로 DB에서 테스트 사용자 데이터를 정리"""
-    with db_connection.cursor() as cur:
-        cur.execute("DELETE FROM users WHERE username = %s;", (TEST_USERNAME,))
-        db_connection.commit()
+    storage_backend.run_sql("DELETE FROM users WHERE username = $1;", (TEST_USERNAME,))
     yield
-    with db_connection.cursor() as cur:
-        cur.execute("DELETE FROM users WHERE username = %s;", (TEST_USERNAME,))
-        db_connection.commit()
+    storage_backend.run_sql("DELETE FROM users WHERE username = $1;", (TEST_USERNAME,))
 
 
 @pytest.fixture(autouse=True)
@@ -52,8 +49,73 @@ def test_register_user():
 def test_authenticate():
     """사용자 인증 테스트"""
     register_user(TEST_USERNAME, TEST_PASSWORD)
-    assert authenticate(TEST_USERNAME, TEST_PASSWORD) is True  # 올바른 비밀번호
-    assert authenticate(TEST_USERNAME, "wrongpassword") is False  # 잘못된 비밀번호
+    user = authenticate(TEST_USERNAME, TEST_PASSWORD)  # 올바른 비밀번호
+    assert user["username"] == TEST_USERNAME
+    assert user["id"] == get_user_id(TEST_USERNAME)
+    assert authenticate(TEST_USERNAME, "wrongpassword") is None  # 잘못된 비밀번호
+
+
+def test_identity_cache():
+    """로그인 후 get_user_id가 DB 조회 없이 캐시에서 반환되는지 확인"""
+    register_user(TEST_USERNAME, TEST_PASSWORD)
+    user = authenticate(TEST_USERNAME, TEST_PASSWORD)
+    hits = identity_cache_stats()["hits"]
+    assert get_user_id(TEST_USERNAME) == user["id"]
+    assert identity_cache_stats()["hits"] == hits + 1
+
+    delete_user(TEST_USERNAME)  # 탈퇴 시 캐시 무효화
+    assert identity_cache.get(TEST_USERNAME) is None
+
+
+def test_rehash_on_login(storage_backend):
+    """cost 설정이 바뀌면 로그인 성공 시 저장된 해시가 새 cost로 교체되는지 확인"""
+    rounds = passwords.current_rounds()
+    try:
+        passwords.configure(rounds=4)
+        register_user(TEST_USERNAME, TEST_PASSWORD)
+        passwords.configure(rounds=5)
+        assert authenticate(TEST_USERNAME, TEST_PASSWORD) is not None
+
+        # 재해싱은 로그인 응답을 기다리게 하지 않고 백그라운드에서 저장
+        deadline = time.monotonic() + 10
+        while True:
+            stored = storage_backend.run_sql(
+                "SELECT password FROM users WHERE username = $1;", (TEST_USERNAME,)
+            )[0]["password"]
+            if passwords.hash_rounds(stored) == 5 or time.monotonic() > deadline:
+                break
+            time.sleep(0.05)
+        assert passwords.hash_rounds(stored) == 5
+        assert authenticate(TEST_USERNAME, TEST_PASSWORD) is not None  # 새 해시로 로그인
+    finally:
+        passwords.configure(rounds=rounds)
+
+
+def test_authenticate_fails_when_hashing_times_out(monkeypatch):
+    """비밀번호 검증이 timeout되면 예외 대신 로그인 실패(None)"""
+    register_user(TEST_USERNAME, TEST_PASSWORD)
+
+    def timeout(*args):
+        raise futures.TimeoutError()  # Python 3.10에서는 내장 TimeoutError와 다른 클래스
+
+    monkeypatch.setattr(accounts, "verify_password", timeout)
+    assert authenticate(TEST_USERNAME, TEST_PASSWORD) is None
+
+
+def test_register_user_fails_when_hashing_times_out(monkeypatch, storage_backend):
+    """비밀번호 해싱이 timeout되면 예외 대신 None (중복 아이디의 False와 구분)"""
+    def timeout(*args):
+        raise futures.TimeoutError()
+
+    monkeypatch.setattr(passwords, "hash_password", timeout)
+    assert register_user(TEST_USERNAME, TEST_PASSWORD) is None
+    assert storage_backend.run_sql("SELECT id FROM users WHERE username = $1;", (TEST_USERNAME,)) == []
+
+
+def test_hash_password_rejects_non_string():
+    """문자열이 아닌 비밀번호는 해싱하지 않음"""
+    with pytest.raises(ValueError):
+        hash_password(1234)
 
 
 def test_register_duplicate():
@@ -68,7 +130,7 @@ def test_delete_user():
     register_user(TEST_USERNAME, TEST_PASSWORD)
     assert delete_user(TEST_USERNAME) is True  # 탈퇴 성공
     assert (
-        authenticate(TEST_USERNAME, TEST_PASSWORD) is False
+        authenticate(TEST_USERNAME, TEST_PASSWORD) is None
     )  # 탈퇴한 계정은 로그인 불가
 
 
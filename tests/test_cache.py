@@ -0,0 +1,40 @@
+import time
+from backend.cache import TTLCache
+
+
+def test_get_and_set():
+    """저장한 값을 조회하고 hit / miss가 집계되는지 확인"""
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("alice") is None
+    cache.set("alice", 1)
+    assert cache.get("alice") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction():
+    """가득 차면 가장 오래 사용하지 않은 항목이 제거되는지 확인"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a를 최근 사용으로 갱신
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    """ttl이 지나면 항목이 만료되는지 확인"""
+    cache = TTLCache(maxsize=10, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_invalidate():
+    """invalidate 후에는 캐시에서 조회되지 않음"""
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
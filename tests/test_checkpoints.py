@@ -0,0 +1,72 @@
+import itertools
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from backend import checkpoints, langchain_chatbot
+from backend.checkpoints import BoundedMemorySaver, create_checkpointer
+from backend.langchain_chatbot import initialize_evaluation_workflow, stream_evaluation
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """항상 같은 평가를 스트리밍하는 모델로 교체"""
+    model = GenericFakeChatModel(messages=itertools.cycle([AIMessage(content="좋은 답변입니다.")]))
+    monkeypatch.setattr(langchain_chatbot, "get_openai_client", lambda: model)
+    return model
+
+
+def _answer(app, thread_id, text="답변"):
+    config = {"configurable": {"thread_id": thread_id, "question": "Q", "context": "C"}}
+    return stream_evaluation(app, {"role": "user", "content": text}, config)[0]
+
+
+def test_keeps_only_latest_checkpoint(fake_model):
+    """같은 thread로 여러 번 답변해도 최신 checkpoint 하나(이번 답변과 평가)만 보관"""
+    saver = BoundedMemorySaver()
+    app = initialize_evaluation_workflow(saver)
+    for _ in range(3):
+        assert _answer(app, "1") == "좋은 답변입니다."
+    blobs = saver.stats()["blobs"]
+    for _ in range(5):
+        _answer(app, "1")
+
+    stats = saver.stats()
+    assert stats["threads"] == 1 and stats["checkpoints"] == 1
+    assert stats["blobs"] == blobs  # 답변 수가 늘어도 channel 값 수는 그대로
+    state = app.get_state({"configurable": {"thread_id": "1"}})
+    assert [msg.type for msg in state.values["messages"]] == ["human", "ai"]
+
+
+def test_evicts_least_recently_used_thread(fake_model):
+    """max_threads를 넘으면 가장 오래 사용하지 않은 thread 삭제"""
+    saver = BoundedMemorySaver(max_threads=2)
+    app = initialize_evaluation_workflow(saver)
+    for thread_id in ("1", "2", "1", "3"):
+        _answer(app, thread_id)
+
+    assert saver.stats()["threads"] == 2 and saver.stats()["evictions"] == 1
+    assert not app.get_state({"configurable": {"thread_id": "2"}}).values
+    assert app.get_state({"configurable": {"thread_id": "1"}}).values
+
+
+def test_evicts_idle_threads(fake_model, monkeypatch):
+    """ttl보다 오래 사용하지 않은 thread 삭제"""
+    now = [1000.0]
+    monkeypatch.setattr(checkpoints.time, "monotonic", lambda: now[0])
+    saver = BoundedMemorySaver(ttl=60)
+    app = initialize_evaluation_workflow(saver)
+    _answer(app, "1")
+    now[0] += 61
+    _answer(app, "2")
+
+    assert saver.stats()["threads"] == 1
+    assert not app.get_state({"configurable": {"thread_id": "1"}}).values
+
+
+def test_unknown_backend():
+    """지원하지 않는 저장소 이름은 ValueError"""
+    assert isinstance(create_checkpointer("memory"), BoundedMemorySaver)
+    with pytest.raises(ValueError):
+        create_checkpointer("redis")
@@ -1,7 +1,10 @@
+import subprocess
+import sys
+import pytest
+import streamlit as st
 from dotenv import load_dotenv
+from backend import config
 from backend.config import (
-    DB_CONFIG,
-    PINECONE_CONFIG,
     DEFAULT_MODEL,
     get_openai_client,
     get_openai_key,
@@ -11,20 +14,38 @@ from backend.config import (
 load_dotenv()
 
 
-def test_db_config():
+@pytest.fixture
+def secrets():
+    """secrets.toml이 필요한 테스트는 설정이 없으면 skip"""
+    try:
+        return dict(st.secrets)
+    except FileNotFoundError as e:
+        pytest.skip(f"secrets.toml is not available: {e}")
+
+
+def test_import_is_lazy():
+    """import만으로는 secrets / 외부 SDK가 필요하지 않아야 함 (새 프로세스에서 확인)"""
+    code = (
+        "import sys, backend.config; "
+        "assert not {'pinecone', 'langchain_openai', 'langchain_pinecone'} & set(sys.modules)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, capture_output=True)
+
+
+def test_db_config(secrets):
     """PostgreSQL 데이터베이스 환경변수 설정 테스트"""
     required_keys = ["host", "database", "user", "password", "port"]
     for key in required_keys:
-        assert key in DB_CONFIG
-        assert DB_CONFIG[key] is not None  # 값이 설정되어 있어야 함
+        assert key in config.DB_CONFIG
+        assert config.DB_CONFIG[key] is not None  # 값이 설정되어 있어야 함
 
 
-def test_pinecone_config():
+def test_pinecone_config(secrets):
     """Pinecone 설정 환경변수 테스트"""
     required_keys = ["api_key", "environment", "index_name"]
     for key in required_keys:
-        assert key in PINECONE_CONFIG
-        assert PINECONE_CONFIG[key] is not None  # 값이 설정되어 있어야 함
+        assert key in config.PINECONE_CONFIG
+        assert config.PINECONE_CONFIG[key] is not None  # 값이 설정되어 있어야 함
 
 
 def test_defaults():
@@ -32,7 +53,13 @@ def test_defaults():
     assert DEFAULT_MODEL == "gpt-4o-mini"  # 기본 모델이 정확하게 설정되었는지 확인
 
 
-def test_openai_key():
+def test_prompts_are_built_once():
+    """프롬프트는 처음 사용할 때 한 번만 생성되어 재사용"""
+    assert config.QUESTION_PROMPT is config.QUESTION_PROMPT
+    assert config.EVALUATION_PROMPT.input_variables == ["answer", "context", "question"]
+
+
+def test_openai_key(secrets):
     """OpenAI API 키가 설정되어 있는지 확인"""
     api_key = get_openai_key()
     assert api_key is not None
@@ -40,7 +67,7 @@ def test_openai_key():
     assert len(api_key) > 0  # API 키는 빈 문자열이 아니어야 함
 
 
-def test_openai_client():
+def test_openai_client(secrets):
     """OpenAI 클라이언트 생성 테스트"""
     client = get_openai_client()
     assert client is not None
@@ -0,0 +1,118 @@
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from backend import langchain_chatbot, llm_metrics
+from backend.context_assembly import TokenCounter, assemble_context, compress, trim
+from backend.langchain_chatbot import pick_next_question
+from backend.llm_cache import cached_chain
+from tests.test_langchain_chatbot import FakeChain, FakeRetriever
+
+
+class WordCounter:
+    """단어 하나를 토큰 하나로 세는 tokenizer"""
+
+    def count(self, text):
+        return len(text.split())
+
+    def truncate(self, text, max_tokens):
+        return " ".join(text.split()[:max_tokens])
+
+
+def test_compress_removes_blank_and_repeated_lines():
+    """연속 공백은 하나로, 빈 줄 / 이미 나온 줄은 제거"""
+    text = "Python  문서\n\n  GIL은   락이다.\nPython 문서\n"
+    assert compress(text) == "Python 문서\nGIL은 락이다."
+
+
+def test_trim_keeps_whole_sentences():
+    """예산 안에 들어가는 문장까지만 남기고, 첫 문장도 넘치면 단어 단위로 자름"""
+    text = "one two three. four five six. seven eight"
+    assert trim(text, 7, WordCounter()) == "one two three. four five six."
+    assert trim(text, 2, WordCounter()) == "one two"
+    assert trim(text, 100, WordCounter()) == text
+
+
+def test_assemble_context_merges_small_chunks_within_budget():
+    """첫 chunk 뒤에 예산 안에 들어가는 chunk만 병합 (넘치는 chunk는 건너뜀)"""
+    chunks = ["a b c", "d e f g h i j k", "l m", "n o"]
+    context, included = assemble_context(chunks, 8, WordCounter(), min_chunk_tokens=1)
+    assert context == "a b c\n\nl m\n\nn o"
+    assert included == ["a b c", "l m", "n o"]
+
+
+def test_assemble_context_trims_first_chunk_without_merge():
+    """첫 chunk가 예산을 넘으면 자르고, merge=False면 다른 chunk를 붙이지 않음"""
+    context, included = assemble_context(["a b c d e", "f"], 3, WordCounter())
+    assert (context, included) == ("a b c", ["a b c d e"])
+    context, included = assemble_context(["a", "f"], 3, WordCounter(), merge=False)
+    assert (context, included) == ("a", ["a"])
+
+
+def test_token_counter_truncates_within_budget():
+    """tiktoken(또는 근사)으로 센 토큰 수 기준으로 max_tokens 이하로 자름"""
+    counter = TokenCounter("gpt-4o-mini")
+    text = "GIL은 한 번에 하나의 스레드만 파이썬 바이트코드를 실행하도록 하는 락입니다. " * 20
+    truncated = counter.truncate(text, 30)
+    assert 0 < counter.count(truncated) <= 30
+    assert text.startswith(truncated)
+
+
+def test_pick_next_question_assembles_context():
+    """선택한 문맥에 다른 문맥을 병합하여 질문 생성, 사용한 문맥으로는 선택한 문맥만 기록"""
+    chain = FakeChain(["Q2"])
+    assembler = lambda chunks: assemble_context(chunks, 100, WordCounter(), min_chunk_tokens=1)
+    question, context, used = pick_next_question(
+        FakeRetriever(["doc1", "doc2", "doc3"]), chain, "doc1", {"doc1"}, {"Q1"},
+        context_assembler=assembler,
+    )
+    assert question == "Q2"
+    chosen, merged = context.split("\n\n")
+    assert {chosen, merged} == {"doc2", "doc3"}
+    assert used == {"doc1", chosen}
+
+
+def test_question_context_is_not_merged_when_question_cache_is_enabled(monkeypatch):
+    """질문 캐시를 사용하면 선택한 문맥만 사용 (병합하면 사용자마다 key가 달라짐), 사용하지 않으면 병합"""
+    monkeypatch.setattr(langchain_chatbot, "get_counter", lambda model: WordCounter())
+    monkeypatch.setitem(langchain_chatbot.CONTEXT_BUDGET_CONFIG, "min_chunk_tokens", 1)
+    monkeypatch.setitem(langchain_chatbot.CONTEXT_BUDGET_CONFIG, "merge", True)
+
+    monkeypatch.setitem(langchain_chatbot.LLM_CACHE_POLICY, "question", {"enabled": True, "variants": 5})
+    assert langchain_chatbot.question_context_assembler()(["doc1", "doc2"]) == ("doc1", ["doc1"])
+
+    monkeypatch.setitem(langchain_chatbot.LLM_CACHE_POLICY, "question", {"enabled": False, "variants": 5})
+    context, _ = langchain_chatbot.question_context_assembler()(["doc1", "doc2"])
+    assert context == "doc1\n\ndoc2"
+
+
+def test_cached_chain_records_token_usage():
+    """LLM을 호출하면 프롬프트 / 응답 토큰 수와 호출 시간을 기록"""
+    llm_metrics.reset()
+    usage = {"input_tokens": 420, "output_tokens": 35, "total_tokens": 455}
+    llm = RunnableLambda(lambda prompt: AIMessage(content="Q", usage_metadata=usage))
+    prompt = PromptTemplate.from_template("문서: {context}\n질문:")
+    cached_chain("question", prompt, llm, policy={"question": {"enabled": False}}).invoke({"context": "GIL"})
+
+    snapshot = llm_metrics.snapshot()["question"]
+    assert snapshot["prompt_tokens"]["sum"] == 420
+    assert snapshot["completion_tokens"]["sum"] == 35
+    assert snapshot["call_seconds"]["count"] == 1
+
+
+def test_evaluation_prompt_context_is_budgeted(monkeypatch):
+    """평가 프롬프트의 문맥은 토큰 예산까지만 포함"""
+    prompts = []
+
+    def llm(prompt):
+        prompts.append(prompt.to_string())
+        return AIMessage(content="평가")
+
+    monkeypatch.setattr(langchain_chatbot, "get_counter", lambda model: WordCounter())
+    monkeypatch.setitem(langchain_chatbot.CONTEXT_BUDGET_CONFIG, "evaluation_tokens", 3)
+    app = langchain_chatbot.initialize_evaluation_workflow(llm=RunnableLambda(llm))
+    config = {"configurable": {"thread_id": "t1", "question": "GIL이란?", "context": "GIL 문서. 긴 설명 " * 50}}
+    app.invoke({"messages": [{"role": "user", "content": "답변"}]}, config)
+
+    assert "GIL 문서." in prompts[-1]
+    assert "긴 설명" not in prompts[-1]
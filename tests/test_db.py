@@ -1,102 +1,112 @@
-import os
+import asyncio
+import inspect
 import pytest
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from dotenv import load_dotenv
-from backend.db import (
-    create_chat_session,
-    insert_chat_message,
-    get_chat_history,
-    get_user_chat_sessions,
-    delete_chat_messages,
-    delete_chat_session,
-    delete_all_user_sessions,
-    get_user_id,
-)
-
-# `.env` 파일 로드
-load_dotenv()
-
-# PostgreSQL 테스트 데이터베이스 설정
-DB_CONFIG = {
-    "dbname": os.getenv("POSTGRES_DB"),
-    "user": os.getenv("POSTGRES_USER"),
-    "password": os.getenv("POSTGRES_PASSWORD"),
-    "host": os.getenv("POSTGRES_HOST"),
-    "port": os.getenv("POSTGRES_PORT"),
-    "sslmode": os.getenv("SSL_MODE", "require"),
-}
+import backend.db as sync_db
 
 # 테스트용 사용자 정보
-TEST_USER_ID = 1
+TEST_USERNAME = "pytest_db_user"
 TEST_MESSAGE_USER = "Hello, chatbot!"
 TEST_MESSAGE_BOT = "Hello! How can I assist you?"
 
 
-@pytest.fixture(scope="module")
-def db_connection():
-    """테스트용 데이터베이스 연결 생성"""
-    conn = psycopg2.connect(**DB_CONFIG, cursor_factory=RealDictCursor)
-    yield conn
-    conn.close()
+class AsyncLayer:
+    """async 계층 함수를 동기 호출처럼 실행 (같은 테스트를 두 계층에 적용하기 위함)"""
 
+    def __init__(self, module):
+        self.module = module
+        self.loop = asyncio.new_event_loop()  # asyncpg pool은 loop에 묶이므로 하나만 사용
 
-@pytest.fixture(autouse=True)
-def setup_and_teardown(db_connection):
-    """각 테스트 실행 전후 데이터 초기화"""
-    with db_connection.cursor() as cur:
-        # 기존 테스트 데이터 삭제
-        cur.execute(
-            "DELETE FROM chat_messages WHERE session_id IN (SELECT id FROM chat_sessions WHERE user_id = %s);",
-            (TEST_USER_ID,),
-        )
-        cur.execute("DELETE FROM chat_sessions WHERE user_id = %s;", (TEST_USER_ID,))
-        db_connection.commit()
+    def __getattr__(self, name):
+        func = getattr(self.module, name)
 
-        # 새로운 채팅 세션 생성
-        cur.execute(
-            "INSERT INTO chat_sessions (user_id) VALUES (%s) RETURNING id;",
-            (TEST_USER_ID,),
-        )
-        session_id = cur.fetchone()["id"]
-        db_connection.commit()
+        def call(*args, **kwargs):
+            result = func(*args, **kwargs)
+            if inspect.isasyncgen(result):
+                return self.loop.run_until_complete(self._collect(result))
+            return self.loop.run_until_complete(result)
 
-        # 테스트 메시지 삽입
-        cur.execute(
-            "INSERT INTO chat_messages (session_id, sender, message) VALUES (%s, %s, %s);",
-            (session_id, "user", TEST_MESSAGE_USER),
-        )
-        cur.execute(
-            "INSERT INTO chat_messages (session_id, sender, message) VALUES (%s, %s, %s);",
-            (session_id, "bot", TEST_MESSAGE_BOT),
+        return call
+
+    async def _collect(self, agen):
+        return [chunk async for chunk in agen]
+
+    def close(self):
+        self.loop.run_until_complete(self.module.close_pool())
+        self.loop.close()
+
+
+@pytest.fixture(scope="module", params=["sync", "async"])
+def dal(request, storage_backend):
+    """동기(backend.db) / 비동기(backend.async_db) 계층에 같은 테스트 실행"""
+    if request.param == "sync":
+        yield sync_db
+        return
+    if storage_backend.name != "postgres":
+        pytest.skip("async 계층(asyncpg)은 PostgreSQL 저장소에서만 실행")
+    import backend.async_db as async_db
+
+    layer = AsyncLayer(async_db)
+    yield layer
+    layer.close()
+
+
+def _delete_test_user(backend):
+    backend.run_sql(
+        """
+        DELETE FROM chat_messages
+        WHERE session_id IN (
+            SELECT s.id FROM chat_sessions s JOIN users u ON s.user_id = u.id
+            WHERE u.username = $1
+        );
+        """,
+        (TEST_USERNAME,),
+    )
+    backend.run_sql(
+        "DELETE FROM chat_sessions WHERE user_id IN (SELECT id FROM users WHERE username = $1);",
+        (TEST_USERNAME,),
+    )
+    backend.run_sql("DELETE FROM users WHERE username = $1;", (TEST_USERNAME,))
+
+
+@pytest.fixture
+def db_user_id(storage_backend):
+    """각 테스트 실행 전후 데이터 초기화 후 테스트 사용자 ID 반환"""
+    _delete_test_user(storage_backend)
+    user_id = storage_backend.run_sql(
+        "INSERT INTO users (username, password) VALUES ($1, $2) RETURNING id;",
+        (TEST_USERNAME, "not-a-real-hash"),
+    )[0]["id"]
+
+    # 새로운 채팅 세션 생성 및 테스트 메시지 삽입
+    session_id = storage_backend.run_sql(
+        "INSERT INTO chat_sessions (user_id) VALUES ($1) RETURNING id;", (user_id,)
+    )[0]["id"]
+    for sender, message in (("user", TEST_MESSAGE_USER), ("bot", TEST_MESSAGE_BOT)):
+        storage_backend.run_sql(
+            "INSERT INTO chat_messages (session_id, sender, message) VALUES ($1, $2, $3);",
+            (session_id, sender, message),
         )
-        db_connection.commit()
 
-    yield  # 테스트 실행
+    yield user_id  # 테스트 실행
 
     # 테스트 종료 후 정리
-    with db_connection.cursor() as cur:
-        cur.execute(
-            "DELETE FROM chat_messages WHERE session_id IN (SELECT id FROM chat_sessions WHERE user_id = %s);",
-            (TEST_USER_ID,),
-        )
-        cur.execute("DELETE FROM chat_sessions WHERE user_id = %s;", (TEST_USER_ID,))
-        db_connection.commit()
+    sync_db.message_journal.flush()
+    _delete_test_user(storage_backend)
 
 
-def test_create_chat_session():
+def test_create_chat_session(dal, db_user_id):
     """새로운 채팅 세션 생성 테스트"""
-    session_id = create_chat_session(TEST_USER_ID)
+    session_id = dal.create_chat_session(db_user_id)
     assert session_id is not None  # 세션 ID가 정상적으로 생성되었는지 확인
 
 
-def test_insert_chat_message():
+def test_insert_chat_message(dal, db_user_id):
     """채팅 메시지가 정상적으로 저장되는지 테스트"""
-    session_id = create_chat_session(TEST_USER_ID)
-    insert_chat_message(session_id, "user", TEST_MESSAGE_USER)
-    insert_chat_message(session_id, "bot", TEST_MESSAGE_BOT)
+    session_id = dal.create_chat_session(db_user_id)
+    dal.insert_chat_message(session_id, "user", TEST_MESSAGE_USER)
+    dal.insert_chat_message(session_id, "bot", TEST_MESSAGE_BOT)
 
-    chat_history = get_chat_history(session_id)
+    chat_history = dal.get_chat_history(session_id)
     assert len(chat_history) == 2  # 메시지가 두 개 삽입되었는지 확인
     assert (
         chat_history[0]["sender"] == "user"
@@ -108,15 +118,47 @@ def test_insert_chat_message():
     )
 
 
-def test_get_chat_history():
+def test_insert_chat_message_requires_session(dal, db_user_id):
+    """session_id 없이는 메시지를 저장하지 않음"""
+    with pytest.raises(ValueError):
+        dal.insert_chat_message(None, "user", TEST_MESSAGE_USER)
+
+
+def test_journal_rejects_message_for_deleted_session(db_user_id, tmp_path):
+    """삭제된 세션의 메시지(FK 위반)는 dead-letter 파일로 옮기고 같은 batch의 다른 메시지는 저장"""
+    from backend.message_journal import MessageJournal
+    from backend.storage import DataError, IntegrityError
+
+    session_id = sync_db.create_chat_session(db_user_id)
+    deleted_id = sync_db.create_chat_session(db_user_id)
+    sync_db.delete_chat_session(deleted_id)
+
+    journal = MessageJournal(
+        sync_db._write_chat_messages,
+        str(tmp_path / "spool.jsonl"),
+        retry_interval=60,
+        row_errors=(IntegrityError, DataError),
+    )
+    try:
+        journal.append(session_id, "user", TEST_MESSAGE_USER)
+        journal.append(deleted_id, "user", "lost")
+        assert journal.flush()
+        stats = journal.stats()
+        assert (stats["written"], stats["rejected"], stats["spooled"]) == (1, 1, 0)
+    finally:
+        journal.close()
+    assert [row["message"] for row in sync_db.get_chat_history(session_id)] == [TEST_MESSAGE_USER]
+
+
+def test_get_chat_history(dal, db_user_id):
     """특정 채팅 세션의 대화 기록을 조회하는 기능 테스트"""
-    session_id = create_chat_session(TEST_USER_ID)
-    insert_chat_message(session_id, "user", "Test message 1")
-    insert_chat_message(session_id, "bot", "Test response 1")
-    insert_chat_message(session_id, "user", "Test message 2")
-    insert_chat_message(session_id, "bot", "Test response 2")
+    session_id = dal.create_chat_session(db_user_id)
+    dal.insert_chat_message(session_id, "user", "Test message 1")
+    dal.insert_chat_message(session_id, "bot", "Test response 1")
+    dal.insert_chat_message(session_id, "user", "Test message 2")
+    dal.insert_chat_message(session_id, "bot", "Test response 2")
 
-    chat_history = get_chat_history(session_id)
+    chat_history = dal.get_chat_history(session_id)
     assert len(chat_history) == 4  # 네 개의 메시지가 저장되었는지 확인
     assert chat_history[0]["message"] == "Test message 1"
     assert chat_history[1]["message"] == "Test response 1"
@@ -124,60 +166,144 @@ def test_get_chat_history():
     assert chat_history[3]["message"] == "Test response 2"
 
 
-def test_get_user_chat_sessions():
+def test_get_user_chat_sessions(dal, db_user_id):
     """사용자의 모든 채팅 세션을 조회하는 기능 테스트"""
-    create_chat_session(TEST_USER_ID)
-    sessions = get_user_chat_sessions(TEST_USER_ID)
+    dal.create_chat_session(db_user_id)
+    sessions = dal.get_user_chat_sessions(db_user_id)
     assert isinstance(sessions, list)  # 반환 값이 리스트인지 확인
     assert len(sessions) > 0  # 세션이 하나 이상 존재해야 함
     assert "id" in sessions[0] and "created_at" in sessions[0]  # 세션 데이터 구조 확인
 
 
-def test_delete_chat_messages():
+def test_get_chat_history_page(dal, db_user_id):
+    """대화 내역을 keyset 페이지 단위로 빠짐없이 조회하는지 테스트"""
+    session_id = dal.create_chat_session(db_user_id)
+    for i in range(5):
+        dal.insert_chat_message(session_id, "user", f"Paged message {i}")
+
+    first_page, cursor = dal.get_chat_history_page(session_id, limit=2)
+    assert [m["message"] for m in first_page] == ["Paged message 0", "Paged message 1"]
+    assert cursor is not None
+
+    messages = list(first_page)
+    while cursor is not None:
+        page, cursor = dal.get_chat_history_page(session_id, limit=2, after=cursor)
+        messages.extend(page)
+    assert [m["message"] for m in messages] == [f"Paged message {i}" for i in range(5)]
+
+
+def test_get_user_chat_sessions_page(dal, db_user_id):
+    """세션 목록을 최신순 페이지로 조회하는지 테스트"""
+    created = [dal.create_chat_session(db_user_id) for _ in range(3)]
+    page, cursor = dal.get_user_chat_sessions_page(db_user_id, limit=2)
+    assert len(page) == 2 and cursor is not None
+    rest, cursor = dal.get_user_chat_sessions_page(db_user_id, limit=10, before=cursor)
+    assert cursor is None
+    ids = [s["id"] for s in page + rest]
+    assert set(created) <= set(ids)
+    assert len(ids) == len(set(ids))  # 페이지 사이에 중복 없음
+
+
+def test_iter_chat_history(dal, db_user_id):
+    """server-side cursor로 대화 내역을 chunk 단위로 스트리밍하는지 테스트"""
+    session_id = dal.create_chat_session(db_user_id)
+    for i in range(5):
+        dal.insert_chat_message(session_id, "user", f"Streamed message {i}")
+
+    chunks = list(dal.iter_chat_history(session_id, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert chunks[-1][-1]["message"] == "Streamed message 4"
+
+
+def test_delete_chat_messages(dal, db_user_id):
     """특정 채팅 세션의 모든 메시지를 삭제하는 기능 테스트"""
-    session_id = create_chat_session(TEST_USER_ID)
-    insert_chat_message(session_id, "user", "Test message")
-    insert_chat_message(session_id, "bot", "Test response")
+    session_id = dal.create_chat_session(db_user_id)
+    dal.insert_chat_message(session_id, "user", "Test message")
+    dal.insert_chat_message(session_id, "bot", "Test response")
 
-    delete_chat_messages(session_id)
+    dal.delete_chat_messages(session_id)
 
-    chat_history = get_chat_history(session_id)
+    chat_history = dal.get_chat_history(session_id)
     assert len(chat_history) == 0  # 모든 메시지가 삭제되었어야 함
 
 
-def test_delete_chat_session():
+def test_delete_chat_session(dal, db_user_id):
     """특정 채팅 세션과 모든 메시지를 삭제하는 기능 테스트"""
-    session_id = create_chat_session(TEST_USER_ID)
-    insert_chat_message(session_id, "user", "Test message")
-    insert_chat_message(session_id, "bot", "Test response")
+    session_id = dal.create_chat_session(db_user_id)
+    dal.insert_chat_message(session_id, "user", "Test message")
+    dal.insert_chat_message(session_id, "bot", "Test response")
 
-    delete_chat_session(session_id)
+    dal.delete_chat_session(session_id)
 
-    chat_history = get_chat_history(session_id)
+    chat_history = dal.get_chat_history(session_id)
     assert len(chat_history) == 0  # 메시지가 삭제되었어야 함
 
-    sessions = get_user_chat_sessions(TEST_USER_ID)
+    sessions = dal.get_user_chat_sessions(db_user_id)
     assert session_id not in [s["id"] for s in sessions]  # 세션 ID가 목록에 없어야 함
 
 
-def test_delete_all_user_sessions():
+def test_delete_all_user_sessions(dal, db_user_id):
     """특정 사용자의 모든 채팅 세션과 관련 메시지를 삭제하는 기능 테스트"""
-    session1 = create_chat_session(TEST_USER_ID)
-    session2 = create_chat_session(TEST_USER_ID)
+    session1 = dal.create_chat_session(db_user_id)
+    session2 = dal.create_chat_session(db_user_id)
 
-    insert_chat_message(session1, "user", "Session 1 - Message")
-    insert_chat_message(session2, "user", "Session 2 - Message")
+    dal.insert_chat_message(session1, "user", "Session 1 - Message")
+    dal.insert_chat_message(session2, "user", "Session 2 - Message")
 
-    delete_all_user_sessions(TEST_USER_ID)
+    dal.delete_all_user_sessions(db_user_id)
 
-    sessions = get_user_chat_sessions(TEST_USER_ID)
+    sessions = dal.get_user_chat_sessions(db_user_id)
     assert len(sessions) == 0  # 사용자의 모든 세션이 삭제되었어야 함
 
-    assert len(get_chat_history(session1)) == 0
-    assert len(get_chat_history(session2)) == 0
+    assert len(dal.get_chat_history(session1)) == 0
+    assert len(dal.get_chat_history(session2)) == 0
+
+
+def test_get_user_questions(dal, db_user_id):
+    """이전 면접의 질문만(평가 제외) 최신순으로 조회"""
+    for i in range(2):
+        session_id = dal.create_chat_session(db_user_id)
+        dal.insert_chat_message(session_id, "bot", f"질문 {i}-1")
+        dal.insert_chat_message(session_id, "user", "답변")
+        dal.insert_chat_message(session_id, "bot", "평가")
+        dal.insert_chat_message(session_id, "bot", f"질문 {i}-2")
+
+    assert dal.get_user_questions(db_user_id) == ["질문 1-2", "질문 1-1", "질문 0-2", "질문 0-1"]
+    assert dal.get_user_questions(db_user_id, limit=1) == ["질문 1-2"]
 
 
-def test_get_user_id():
+def test_get_user_id(dal, db_user_id):
     """사용자 ID 조회 기능 테스트"""
-    user_id = get_user_id("non_existing_user")
+    user_id = dal.get_user_id("non_existing_user")
     assert user_id is None  # 존재하지 않는 사용자 조회 시 None 반환
+    assert dal.get_user_id(TEST_USERNAME) == db_user_id
+
+
+def test_async_insert_spools_when_db_unavailable(monkeypatch, tmp_path):
+    """async 계층에서 저장하지 못한 메시지는 journal spool에 기록되었다가 DB 복구 후 같은 message_uid로 저장"""
+    import time
+    import backend.async_db as async_db
+    from backend.message_journal import MessageJournal
+    from backend.pool import PoolTimeoutError
+
+    class Unavailable:
+        async def __aenter__(self):
+            raise PoolTimeoutError("DB 연결을 얻지 못했습니다.")
+
+        async def __aexit__(self, *exc):
+            return False
+
+    written = []
+    journal = MessageJournal(written.extend, str(tmp_path / "spool.jsonl"), retry_interval=0)
+    monkeypatch.setattr(async_db, "message_journal", journal)
+    monkeypatch.setattr(async_db, "db_connection", lambda timeout=None: Unavailable())
+    try:
+        message_uid = asyncio.run(async_db.insert_chat_message(1, "user", "spooled"))
+        assert journal.stats()["spooled"] == 1
+
+        deadline = time.monotonic() + 5
+        while not written and time.monotonic() < deadline:
+            time.sleep(0.05)  # 백그라운드 스레드가 spool을 replay
+        assert [row["message_uid"] for row in written] == [message_uid]
+    finally:
+        journal.close()
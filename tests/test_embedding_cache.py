@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from backend.embedding_cache import CachedEmbeddings, EmbeddingCache, embed_cached
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """임시 디렉터리의 작은 캐시 (차원별 최대 3개)"""
+    cache = EmbeddingCache(str(tmp_path / "embedding_cache"), max_entries=3)
+    yield cache
+    cache.close()
+
+
+class CountingEmbed:
+    """호출된 텍스트를 기록하는 임베딩 함수"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0, 0.5] for text in texts]
+
+
+def test_only_missing_texts_are_embedded(cache):
+    """캐시에 있는 텍스트는 다시 임베딩하지 않고 입력 순서대로 반환"""
+    embed = CountingEmbed()
+    first = embed_cached(embed, "model", "passage", ["a", "bb"], cache)
+    second = embed_cached(embed, "model", "passage", ["bb", "ccc", "a"], cache)
+    assert embed.calls == [["a", "bb"], ["ccc"]]
+    assert second == [first[1], [3.0, 1.0, 0.5], first[0]]
+    assert cache.stats()["hits"] == 2
+
+
+def test_key_includes_model_and_input_type(cache):
+    """모델이나 input_type이 다르면 다른 항목"""
+    embed = CountingEmbed()
+    embed_cached(embed, "model", "passage", ["a"], cache)
+    embed_cached(embed, "model", "query", ["a"], cache)
+    embed_cached(embed, "other", "passage", ["a"], cache)
+    assert len(embed.calls) == 3
+
+
+def test_lru_eviction(cache):
+    """가득 차면 가장 오래 사용하지 않은 항목부터 제거"""
+    embed = CountingEmbed()
+    embed_cached(embed, "m", "passage", ["a", "b", "c"], cache)
+    embed_cached(embed, "m", "passage", ["a"], cache)  # a 사용 → b가 가장 오래됨
+    embed_cached(embed, "m", "passage", ["d"], cache)
+    assert cache.stats()["evictions"] == 1
+    results = cache.get_many("m", "passage", ["a", "b", "c", "d"])
+    assert [r is not None for r in results] == [True, False, True, True]
+
+
+def test_hits_do_not_write_until_touch_interval(tmp_path):
+    """조회는 쓰기 없이 처리하고, 사용 시각은 다음 저장 / touch_interval에 한 번에 저장"""
+    cache = EmbeddingCache(str(tmp_path / "embedding_cache"), max_entries=3, touch_interval=3600)
+    cache.put_many("m", "passage", ["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        assert all(r is not None for r in cache.get_many("m", "passage", ["a", "b"]))
+    assert cache._conn.total_changes == changes  # hit마다 UPDATE / commit 하지 않음
+
+    cache.put_many("m", "passage", ["c"], [[1.0, 1.0]])  # 저장에서 모아 둔 사용 시각 반영
+    assert cache._conn.total_changes == changes + 3
+    cache.close()
+
+
+def test_shared_across_instances(tmp_path):
+    """같은 디렉터리를 여는 다른 인스턴스(프로세스)도 저장된 벡터를 사용"""
+    path = str(tmp_path / "shared")
+    writer, reader = EmbeddingCache(path, max_entries=10), EmbeddingCache(path, max_entries=10)
+    writer.put_many("m", "passage", ["hello"], [[0.25, 0.5]])
+    np.testing.assert_allclose(reader.get_many("m", "passage", ["hello"])[0], [0.25, 0.5])
+    writer.close()
+    reader.close()
+
+
+def test_cached_embeddings_wrapper(cache):
+    """LangChain Embeddings wrapper는 원본과 같은 벡터를 반환"""
+    inner = DeterministicFakeEmbedding(size=8)
+    embeddings = CachedEmbeddings(embeddings=inner, model="fake", cache=cache)
+    np.testing.assert_allclose(embeddings.embed_query("질문"), inner.embed_query("질문"), rtol=1e-6)
+    np.testing.assert_allclose(
+        embeddings.embed_documents(["문서"])[0], inner.embed_documents(["문서"])[0], rtol=1e-6
+    )
+    embeddings.embed_query("질문")
+    assert cache.stats()["hits"] == 1
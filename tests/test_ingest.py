@@ -0,0 +1,100 @@
+import zipfile
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from backend.ingest import Ingestor, iter_chunks, iter_docx_paragraphs
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+
+class FakeIndex:
+    """list / upsert / delete만 지원하는 메모리 인덱스 (Pinecone 대신 사용)"""
+
+    def __init__(self):
+        self.vectors = {}
+        self.upsert_calls = []
+
+    def list(self, prefix, namespace):
+        yield [id_ for id_ in self.vectors if id_.startswith(prefix)]
+
+    def upsert(self, vectors, namespace):
+        self.upsert_calls.append(len(vectors))
+        self.vectors.update((v["id"], v) for v in vectors)
+
+    def delete(self, ids, namespace):
+        for id_ in ids:
+            self.vectors.pop(id_, None)
+
+
+class FailingEmbeddings(DeterministicFakeEmbedding):
+    def embed_documents(self, texts):
+        raise RuntimeError("rate limited")
+
+
+def _write_docx(path, paragraphs):
+    body = "".join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{W}"><w:body>{body}</w:body></w:document>')
+
+
+def _ingestor(index, embeddings=None, **options):
+    options = {"chunk_size": 60, "chunk_overlap": 10, "embed_batch_size": 2, "max_retries": 1, **options}
+    return Ingestor(index, embeddings or DeterministicFakeEmbedding(size=8), "ns", **options)
+
+
+def test_docx_paragraphs_are_streamed(tmp_path):
+    """docx의 문단을 순서대로 읽고 빈 문단은 제외"""
+    path = tmp_path / "doc.docx"
+    _write_docx(path, ["첫 문단", "", "둘째 문단"])
+    assert list(iter_docx_paragraphs(str(path))) == ["첫 문단", "둘째 문단"]
+
+
+def test_chunks_overlap_and_cover_text():
+    """chunk는 chunk_size 이하이고, 이어지는 chunk는 앞 chunk의 끝을 포함"""
+    words = " ".join(f"w{i}" for i in range(100))
+    chunks = list(iter_chunks([words], chunk_size=50, overlap=10))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert all(nxt.startswith(prev[-10:].lstrip()) for prev, nxt in zip(chunks, chunks[1:]))
+    assert chunks[-1].endswith("w99")
+    with pytest.raises(ValueError):
+        list(iter_chunks([words], chunk_size=10, overlap=10))
+
+
+def test_reingest_only_touches_changed_chunks(tmp_path):
+    """다시 적재하면 바뀐 chunk만 임베딩하고 사라진 chunk는 삭제"""
+    path = tmp_path / "notes.txt"
+    paragraphs = [f"문단 {i} " + "내용 " * 12 for i in range(6)]
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+    index = FakeIndex()
+
+    first = _ingestor(index).ingest(str(path))
+    assert first["failed"] == 0 and first["upserted"] == first["chunks"] == len(index.vectors)
+
+    second = _ingestor(index).ingest(str(path))
+    assert second["unchanged"] == second["chunks"] and second["embedded"] == 0
+
+    paragraphs[-1] = "바뀐 마지막 문단 " + "새 내용 " * 10
+    path.write_text("\n\n".join(paragraphs), encoding="utf-8")
+    third = _ingestor(index).ingest(str(path))
+    assert 0 < third["embedded"] < first["embedded"]
+    assert third["deleted"] >= 1
+    assert len(index.vectors) == third["chunks"]
+
+
+def test_upsert_respects_size_limit(tmp_path):
+    """upsert 요청은 개수와 크기 제한을 넘지 않도록 나눠 전송"""
+    path = tmp_path / "notes.txt"
+    path.write_text("\n\n".join(f"문단 {i} " + "x" * 40 for i in range(10)), encoding="utf-8")
+    index = FakeIndex()
+    report = _ingestor(index, embed_batch_size=10, upsert_batch_size=3, upsert_max_bytes=600).ingest(str(path))
+    assert report["upserted"] == report["chunks"]
+    assert max(index.upsert_calls) <= 3
+    assert report["upsert_requests"] == len(index.upsert_calls)
+
+
+def test_embedding_failures_are_reported(tmp_path):
+    """임베딩 실패는 중단하지 않고 실패 건수와 오류로 보고"""
+    path = tmp_path / "notes.txt"
+    path.write_text("짧은 문단 하나", encoding="utf-8")
+    report = _ingestor(FakeIndex(), FailingEmbeddings(size=8)).ingest(str(path))
+    assert report["failed"] == 1 and report["upserted"] == 0
+    assert "rate limited" in report["errors"][0]
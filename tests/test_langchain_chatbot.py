@@ -0,0 +1,90 @@
+from types import SimpleNamespace
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from backend import langchain_chatbot, llm_metrics
+from backend.langchain_chatbot import (
+    initialize_evaluation_workflow,
+    pick_next_question,
+    stream_evaluation,
+)
+
+EVALUATION = "좋은 답변입니다. 다만 GIL이 I/O 작업에 미치는 영향에 대한 예시가 부족합니다."
+
+
+class RecordingChatModel(GenericFakeChatModel):
+    """받은 프롬프트를 기록하고 응답을 단어 단위로 스트리밍하는 모델"""
+
+    prompts: list = []
+
+    def _stream(self, messages, *args, **kwargs):
+        self.prompts.append(messages[-1].content)
+        yield from super()._stream(messages, *args, **kwargs)
+
+
+class FakeRetriever:
+    def __init__(self, contents):
+        self.contents = contents
+
+    def invoke(self, query):
+        return [SimpleNamespace(page_content=content) for content in self.contents]
+
+
+class FakeChain:
+    def __init__(self, answers):
+        self.answers = list(answers)
+        self.contexts = []
+
+    def invoke(self, inputs, config=None):
+        self.contexts.append(inputs["context"])
+        return SimpleNamespace(content=self.answers.pop(0))
+
+
+def test_pick_next_question_skips_used_context():
+    """이미 사용한 문맥은 건너뛰고 새 문맥으로 질문 생성"""
+    chain = FakeChain(["Q2"])
+    question, context, used = pick_next_question(
+        FakeRetriever(["doc1", "doc2"]), chain, "doc1", {"doc1"}, {"Q1"}
+    )
+    assert (question, context) == ("Q2", "doc2")
+    assert used == {"doc1", "doc2"}
+
+
+def test_pick_next_question_retries_duplicate_question():
+    """이미 나온 질문이면 다시 생성, 문맥이 모두 사용되었으면 이전 문맥 사용"""
+    chain = FakeChain(["Q1", "Q2"])
+    question, context, _ = pick_next_question(
+        FakeRetriever(["doc1"]), chain, "doc1", {"doc1"}, frozenset({"Q1"})
+    )
+    assert question == "Q2"
+    assert chain.contexts == ["doc1", "doc1"]
+
+
+def test_stream_evaluation_streams_tokens(monkeypatch):
+    """평가 응답을 토큰 단위로 전달하고 전체 응답과 TTFT 반환, 질문 / 문맥은 config로 전달"""
+    model = RecordingChatModel(messages=iter([AIMessage(content=EVALUATION)]))
+    monkeypatch.setattr(langchain_chatbot, "get_openai_client", lambda: model)
+    app = initialize_evaluation_workflow()
+    config = {"configurable": {"thread_id": "t1", "question": "GIL이란?", "context": "GIL 문서"}}
+
+    partials = []
+    response, stats = stream_evaluation(app, {"role": "user", "content": "답변"}, config, partials.append)
+
+    assert response == EVALUATION
+    assert len(partials) > 1 and partials[-1] == EVALUATION
+    assert all(EVALUATION.startswith(partial) for partial in partials)
+    assert stats["chunks"] == len(partials)
+    assert 0 <= stats["ttft"] <= stats["duration"]
+    assert "GIL이란?" in model.prompts[-1] and "GIL 문서" in model.prompts[-1]
+
+
+def test_record_response_histograms():
+    """턴별 TTFT / 응답 시간 / chunk 수를 호출 종류별 histogram에 기록"""
+    llm_metrics.reset()
+    llm_metrics.record_response("evaluation", ttft=0.2, duration=3.0, chunks=120, session_id=1)
+    llm_metrics.record_response("evaluation", ttft=None, duration=0.1, chunks=0)
+    snapshot = llm_metrics.snapshot()["evaluation"]
+    assert snapshot["ttft_seconds"]["count"] == 1
+    assert snapshot["duration_seconds"]["count"] == 2
+    assert snapshot["chunks"]["sum"] == 120
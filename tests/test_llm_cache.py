@@ -0,0 +1,102 @@
+from langchain_core.language_models import FakeListChatModel
+from langchain_core.prompts import PromptTemplate
+
+from backend import llm_cache
+from backend.llm_cache import LLMCache, cache_key, cached_chain
+
+QUESTION = PromptTemplate.from_template("문서: {context}\n질문:")
+EVALUATION = PromptTemplate.from_template("질문: {question}\n답변: {answer}\n평가:")
+POLICY = {
+    "question": {"enabled": True, "variants": 3},
+    "evaluation": {"enabled": True, "variants": 1, "max_answer_chars": 10},
+}
+
+
+class CountingChatModel(FakeListChatModel):
+    """호출 횟수를 세는 고정 응답 모델"""
+
+    calls: int = 0
+
+    def _call(self, *args, **kwargs):
+        self.calls += 1
+        return super()._call(*args, **kwargs)
+
+
+def test_cache_key_normalizes_inputs():
+    """공백만 다른 입력은 같은 key, 템플릿 / temperature가 다르면 다른 key"""
+    key = cache_key("gpt", QUESTION.template, {"context": "GIL 문서"}, 0.9)
+    assert key == cache_key("gpt", QUESTION.template, {"context": "  GIL   문서\n"}, 0.9)
+    assert key != cache_key("gpt", QUESTION.template + " ", {"context": "GIL 문서"}, 0.9)
+    assert key != cache_key("gpt", QUESTION.template, {"context": "GIL 문서"}, 0.0)
+
+
+def test_serves_variants_after_they_are_collected(isolated_llm_cache):
+    """variants개가 모일 때까지는 LLM을 호출하고, 이후에는 저장된 응답 중 하나 반환"""
+    llm = CountingChatModel(responses=["Q1", "Q2", "Q3", "Q4"])
+    chain = cached_chain("question", QUESTION, llm, policy=POLICY)
+    first = [chain.invoke({"context": "GIL 문서"}).content for _ in range(3)]
+    assert first == ["Q1", "Q2", "Q3"] and llm.calls == 3
+
+    cached = {chain.invoke({"context": "GIL 문서"}).content for _ in range(10)}
+    assert cached <= {"Q1", "Q2", "Q3"} and llm.calls == 3
+    assert isolated_llm_cache.stats()["responses"] == 3
+
+
+def test_avoid_responses_falls_back_to_llm():
+    """피할 응답만 남았으면 LLM 호출"""
+    llm = CountingChatModel(responses=["Q1", "Q2"])
+    policy = {"question": {"enabled": True, "variants": 1}}
+    chain = cached_chain("question", QUESTION, llm, policy=policy)
+    chain.invoke({"context": "문서"})
+    response = chain.invoke({"context": "문서"}, {"configurable": {"avoid_responses": {"Q1"}}})
+    assert response.content == "Q2" and llm.calls == 2
+
+
+def test_evaluation_policy_only_caches_short_answers():
+    """평가는 짧은 답변만 캐시, 긴 답변은 매번 LLM 호출"""
+    llm = CountingChatModel(responses=["평가"])
+    chain = cached_chain("evaluation", EVALUATION, llm, policy=POLICY)
+    for _ in range(3):
+        chain.invoke({"question": "GIL이란?", "answer": "모르겠습니다"})
+    assert llm.calls == 1
+    for _ in range(2):
+        chain.invoke({"question": "GIL이란?", "answer": "GIL은 인터프리터 전역 잠금으로 ..."})
+    assert llm.calls == 3
+    assert llm_cache.stats()["evaluation"]["bypassed"] >= 2
+
+
+def test_evicts_least_recently_used_keys(tmp_path, monkeypatch):
+    """key 수가 max_entries를 넘으면 가장 오래 사용하지 않은 key 삭제"""
+    clock = iter(range(1000, 2000))
+    monkeypatch.setattr(llm_cache.time, "time", lambda: float(next(clock)))
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    cache.add(b"a", "A", 1)
+    cache.add(b"b", "B", 1)
+    cache.get(b"a")  # a를 최근 사용으로 갱신
+    cache.add(b"c", "C", 1)
+    assert cache.get(b"b") == [] and cache.get(b"a") == ["A"] and cache.get(b"c") == ["C"]
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_hits_do_not_write_until_touch_interval(tmp_path):
+    """조회는 쓰기 없이 처리하고, 사용 시각은 다음 쓰기 / touch_interval에 한 번에 저장"""
+    cache = LLMCache(str(tmp_path / "cache.sqlite3"), touch_interval=3600)
+    cache.add(b"a", "A", 1)
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        assert cache.get(b"a") == ["A"]
+    assert cache._conn.total_changes == changes  # hit마다 UPDATE / commit 하지 않음
+
+    cache.add(b"b", "B", 1)  # 쓰기에서 모아 둔 사용 시각 반영
+    assert cache._conn.total_changes == changes + 2
+    cache.close()
+
+
+def test_cache_hits_are_marked():
+    """캐시에서 반환한 응답은 from_cache로 구분 (LLM 호출 수 집계에서 제외)"""
+    llm = CountingChatModel(responses=["Q1"])
+    policy = {"question": {"enabled": True, "variants": 1}}
+    chain = cached_chain("question", QUESTION, llm, policy=policy)
+    assert not llm_cache.from_cache(chain.invoke({"context": "문서"}))
+    assert llm_cache.from_cache(chain.invoke({"context": "문서"}))
@@ -0,0 +1,72 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend import llm_clients
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {"index": 0, "message": {"role": "assistant", "content": "좋은 답변입니다."}, "finish_reason": "stop"}
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    """keep-alive로 chat completion 응답을 반환하는 로컬 OpenAI API 대역"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def openai_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+    llm_clients.close()
+
+
+def test_registry_reuses_models_and_transport():
+    """같은 (모델, 파라미터)는 같은 객체, 파라미터가 달라도 같은 httpx.Client 사용"""
+    first = llm_clients.get_chat_model("gpt-4o-mini", "sk-test", temperature=0.9)
+    assert llm_clients.get_chat_model("gpt-4o-mini", "sk-test", temperature=0.9) is first
+    other = llm_clients.get_chat_model("gpt-4o-mini", "sk-test", temperature=0.2)
+    assert other is not first
+    assert first.http_client is other.http_client is llm_clients.get_http_client()
+    llm_clients.close()
+    assert llm_clients.stats()["chat_models"] == 0
+
+
+def test_calls_reuse_keep_alive_connection(openai_server):
+    """여러 번 호출해도 keep-alive 연결 하나를 재사용 (호출 단위 temperature 변경 포함)"""
+    before = llm_clients.stats()
+    llm = llm_clients.get_chat_model("gpt-4o-mini", "sk-test", base_url=openai_server, temperature=0.9)
+    for _ in range(3):
+        assert llm.invoke("GIL이란?").content == "좋은 답변입니다."
+    assert llm.bind(temperature=0.1).invoke("GIL이란?").content == "좋은 답변입니다."
+
+    after = llm_clients.stats()
+    assert after["requests"] - before["requests"] == 4
+    assert after["connections_opened"] - before["connections_opened"] == 1
+    assert after["chat_models"] == 1
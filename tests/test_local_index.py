@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from backend.local_index import LocalRetriever, LocalVectorIndex
+
+DIMENSION = 32
+
+
+@pytest.fixture
+def vectors():
+    """재현 가능한 임의 벡터 200개"""
+    return np.random.default_rng(42).standard_normal((200, DIMENSION)).astype(np.float32)
+
+
+def _index(vectors, quantize=False):
+    ids = [f"doc{i}" for i in range(len(vectors))]
+    metadatas = [{"text": f"문서 {i}", "source": "test"} for i in range(len(vectors))]
+    return LocalVectorIndex(ids, vectors, metadatas, quantize=quantize)
+
+
+def test_search_matches_brute_force(vectors):
+    """top-k 결과가 전체 cosine 유사도 정렬과 같아야 함"""
+    query = vectors[7] + 0.1
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert [i for i, _ in _index(vectors).search(query, 5)] == expected.tolist()
+
+
+def test_quantized_index_is_smaller_and_close(vectors):
+    """int8 인덱스는 메모리가 약 1/4이고 상위 결과는 거의 같아야 함"""
+    exact, quantized = _index(vectors), _index(vectors, quantize=True)
+    assert quantized.stats()["vector_bytes"] < exact.stats()["vector_bytes"] / 3
+    query = vectors[3]
+    assert quantized.search(query, 1)[0][0] == 3
+    top_exact = {i for i, _ in exact.search(query, 10)}
+    top_quantized = {i for i, _ in quantized.search(query, 10)}
+    assert len(top_exact & top_quantized) >= 8
+
+
+def test_mmr_prefers_diverse_documents():
+    """같은 문서가 여러 개 있으면 MMR은 중복 대신 다른 문서를 선택"""
+    base = np.eye(4, dtype=np.float32)
+    vectors = np.vstack([base[0], base[0], base[0] + 0.01, base[1] * 0.5 + base[0] * 0.5])
+    index = _index(vectors)
+    assert len({i for i, _ in index.search(base[0], 2)} & {0, 1, 2}) == 2  # top-k는 중복 선택
+    assert index.mmr_search(base[0], k=2, fetch_k=4, lambda_mult=0.3)[1] == 3
+
+
+@pytest.mark.parametrize("quantize", [False, True])
+def test_save_and_load_round_trip(tmp_path, vectors, quantize):
+    """저장 후 다시 읽어도 같은 검색 결과와 문서"""
+    index = _index(vectors, quantize=quantize)
+    path = str(tmp_path / "vector_index.npz")
+    index.save(path)
+    loaded = LocalVectorIndex.load(path)
+    assert loaded.quantized == quantize
+    assert loaded.search(vectors[0], 5) == index.search(vectors[0], 5)
+    assert loaded.document(0).page_content == "문서 0"
+    assert loaded.document(0).metadata == {"source": "test"}
+
+
+def test_local_retriever_interface(vectors):
+    """Pinecone retriever와 같은 search_type / search_kwargs로 문서 반환"""
+    retriever = LocalRetriever(
+        index=_index(vectors),
+        embeddings=DeterministicFakeEmbedding(size=DIMENSION),
+        search_type="mmr",
+        search_kwargs={"k": 5, "fetch_k": 20, "lambda_mult": 0.7},
+    )
+    documents = retriever.invoke("파이썬 면접 질문 하나 생성해")
+    assert len(documents) == 5
+    assert len({document.id for document in documents}) == 5
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+from backend.message_journal import MessageJournal
+
+
+class RowError(Exception):
+    """제약 조건 위반 흉내"""
+
+
+class FakeWriter:
+    """DB 대신 메시지를 리스트에 저장 (fail=True면 DB 장애, session_id가 bad_sessions에 있으면 FK 위반 흉내)"""
+
+    def __init__(self):
+        self.rows = {}
+        self.calls = 0
+        self.fail = False
+        self.bad_sessions = set()
+
+    def __call__(self, rows):
+        if self.fail:
+            raise ConnectionError("database is unreachable")
+        if any(row["session_id"] in self.bad_sessions for row in rows):
+            raise RowError("violates foreign key constraint")
+        self.calls += 1
+        for row in rows:
+            self.rows.setdefault(row["message_uid"], row)  # ON CONFLICT DO NOTHING
+
+
+@pytest.fixture
+def writer():
+    return FakeWriter()
+
+
+@pytest.fixture
+def journal(writer, tmp_path):
+    journal = MessageJournal(
+        writer, str(tmp_path / "spool.jsonl"), batch_size=50, retry_interval=0, row_errors=(RowError,)
+    )
+    yield journal
+    journal.close()
+
+
+def test_append_returns_uid_and_flushes(journal, writer):
+    """메시지 추가 시 message_uid가 반환되고 flush 후 저장되는지 확인"""
+    uid = journal.append(1, "user", "안녕하세요")
+    assert journal.flush()
+    assert writer.rows[uid]["message"] == "안녕하세요"
+    assert journal.stats()["pending"] == 0
+
+
+def test_messages_are_batched(journal, writer):
+    """여러 메시지가 batch 단위로 저장되는지 확인"""
+    for i in range(120):
+        journal.append(1, "user", f"message {i}")
+    assert journal.flush()
+    assert len(writer.rows) == 120
+    assert writer.calls < 120
+
+
+def test_spool_and_replay(writer, tmp_path):
+    """DB 장애 중 메시지는 spool 파일에 보관되고 복구 후 다시 저장"""
+    # 백그라운드 자동 replay가 끼어들지 않도록 재시도 간격을 길게 설정
+    journal = MessageJournal(writer, str(tmp_path / "spool.jsonl"), retry_interval=60)
+    writer.fail = True
+    uid = journal.append(1, "bot", "질문")
+    assert journal.flush()
+    assert journal.stats()["spooled"] == 1
+    assert uid not in writer.rows
+
+    writer.fail = False
+    assert journal.replay_spool() == 1
+    assert writer.rows[uid]["message"] == "질문"
+    assert not journal.stats()["spool_exists"]
+    journal.close()
+
+
+def test_replay_is_idempotent(journal, writer):
+    """이미 저장된 메시지를 다시 저장해도 중복되지 않음"""
+    uid = journal.append(1, "user", "답변")
+    journal.flush()
+    writer([writer.rows[uid]])
+    assert len(writer.rows) == 1
+
+
+def test_rejected_row_does_not_block_batch(journal, writer):
+    """제약 조건을 위반한 행만 dead-letter 파일로 옮기고, 같은 batch의 나머지와 이후 메시지는 DB에 저장"""
+    writer.bad_sessions.add(2)
+    good = [journal.append(1, "user", f"message {i}") for i in range(3)]
+    bad = journal.append(2, "user", "purged session")
+    assert journal.flush()
+    later = journal.append(1, "bot", "later")
+    assert journal.flush()
+
+    assert set(writer.rows) == set(good) | {later}
+    stats = journal.stats()
+    assert (stats["rejected"], stats["spooled"], stats["spool_exists"]) == (1, 0, False)
+    with open(journal.rejected_path, encoding="utf-8") as f:
+        record = json.loads(f.read())
+    assert record["message_uid"] == bad
+    assert "foreign key" in record["error"]
+
+
+def test_replay_moves_rejected_rows_out_of_spool(writer, tmp_path):
+    """spool의 잘못된 행은 replay 때 dead-letter 파일로 옮기고, spool은 비워 이후 저장을 막지 않음"""
+    journal = MessageJournal(
+        writer, str(tmp_path / "spool.jsonl"), retry_interval=60, row_errors=(RowError,)
+    )
+    writer.fail = True
+    good = journal.append(1, "user", "답변")
+    journal.append(2, "user", "삭제된 세션")
+    assert journal.flush()
+
+    writer.fail = False
+    writer.bad_sessions.add(2)
+    assert journal.replay_spool() == 1
+    assert list(writer.rows) == [good]
+    assert journal.stats()["rejected"] == 1
+    assert not journal.stats()["spool_exists"]
+    journal.close()
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import pytest
+from backend import metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """테스트마다 지표 초기화"""
+    metrics.reset()
+    metrics.configure(slow_threshold=0.2)
+    yield
+    metrics.reset()
+
+
+def test_records_calls_rows_and_nested_timings():
+    """호출 횟수, 반환 행 수, 내부에서 누적한 풀 대기 / 실행 시간이 기록되는지 확인"""
+
+    @metrics.instrument("fetch_rows")
+    def fetch_rows(n):
+        metrics.add_pool_wait(0.002)
+        metrics.add_execute(0.003)
+        return [{"id": i} for i in range(n)]
+
+    fetch_rows(3)
+    fetch_rows(7)
+    stats = metrics.snapshot()["fetch_rows"]
+    assert stats["calls"] == 2 and stats["errors"] == 0
+    assert stats["rows"]["sum"] == 10
+    assert stats["pool_wait_seconds"]["sum"] == pytest.approx(0.004)
+    assert stats["execute_seconds"]["sum"] == pytest.approx(0.006)
+
+
+def test_counts_raised_and_swallowed_errors():
+    """예외가 전달된 경우와 SQL 오류를 내부에서 처리한 경우 모두 오류로 집계되는지 확인"""
+
+    @metrics.instrument("raises")
+    def raises():
+        raise RuntimeError("boom")
+
+    @metrics.instrument("swallows")
+    def swallows():
+        metrics.add_execute(0.001, error=True)
+        return []
+
+    with pytest.raises(RuntimeError):
+        raises()
+    swallows()
+    data = metrics.snapshot()
+    assert data["raises"]["errors"] == 1
+    assert data["swallows"]["errors"] == 1
+
+
+def test_slow_query_log_has_param_shape_only(caplog):
+    """느린 호출은 파라미터 값 없이 타입 / 길이만 기록되는지 확인"""
+    metrics.configure(slow_threshold=0.0)
+
+    @metrics.instrument("lookup")
+    def lookup(username, limit=10):
+        return None
+
+    with caplog.at_level(logging.WARNING, logger="backend.slow_query"):
+        lookup("secret-user", limit=5)
+
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["function"] == "lookup"
+    assert entry["params"] == ["str[11]", "limit=int"]
+    assert "secret-user" not in caplog.text
+
+
+def test_generators_are_measured_until_exhausted():
+    """generator / async generator는 소비한 chunk의 행 수 합계로 기록되는지 확인"""
+
+    @metrics.instrument("stream")
+    def stream():
+        yield [1, 2]
+        yield [3]
+
+    @metrics.instrument("astream")
+    async def astream():
+        yield [1, 2, 3]
+
+    async def consume():
+        return [chunk async for chunk in astream()]
+
+    assert list(stream()) == [[1, 2], [3]]
+    asyncio.run(consume())
+    data = metrics.snapshot()
+    assert data["stream"]["rows"]["sum"] == 3
+    assert data["astream"]["rows"]["sum"] == 3
+
+
+def test_concurrent_coroutines_are_measured_separately():
+    """동시에 실행되는 coroutine(async_db 함수)마다 풀 대기 / 실행 시간이 따로 누적되는지 확인"""
+
+    @metrics.instrument("fast")
+    async def fast():
+        metrics.add_execute(0.001)
+        await asyncio.sleep(0.01)
+        metrics.add_execute(0.001)
+        return [1]
+
+    @metrics.instrument("slow")
+    async def slow():
+        metrics.add_pool_wait(0.005)
+        await asyncio.sleep(0.01)
+        metrics.add_execute(0.01)
+        return [1, 2]
+
+    async def run_all():
+        return await asyncio.gather(fast(), slow(), fast())
+
+    assert asyncio.run(run_all()) == [[1], [1, 2], [1]]
+    data = metrics.snapshot()
+    assert data["fast"]["calls"] == 2 and data["fast"]["rows"]["sum"] == 2
+    assert data["fast"]["execute_seconds"]["sum"] == pytest.approx(0.004)
+    assert data["fast"]["pool_wait_seconds"]["sum"] == 0
+    assert data["slow"]["execute_seconds"]["sum"] == pytest.approx(0.01)
+    assert data["slow"]["pool_wait_seconds"]["sum"] == pytest.approx(0.005)
+
+
+def test_exports():
+    """JSON과 Prometheus text 형식으로 내보내기"""
+
+    @metrics.instrument("get_chat_history")
+    def get_chat_history():
+        return [1]
+
+    get_chat_history()
+    assert json.loads(metrics.to_json())["functions"]["get_chat_history"]["calls"] == 1
+    text = metrics.to_prometheus()
+    assert 'chatbot_db_calls_total{function="get_chat_history"} 1' in text
+    assert 'chatbot_db_duration_seconds_bucket{function="get_chat_history",le="+Inf"} 1' in text
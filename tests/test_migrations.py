@@ -0,0 +1,40 @@
+import pytest
+from backend.migrations import MIGRATIONS, applied_versions, check, upgrade
+
+
+@pytest.fixture(autouse=True)
+def postgres_only(storage_backend):
+    """migration은 PostgreSQL 저장소 전용"""
+    if storage_backend.name != "postgres":
+        pytest.skip("migration은 PostgreSQL 저장소에서만 실행")
+
+
+def test_upgrade_is_idempotent():
+    """migration을 여러 번 실행해도 추가 적용이 없어야 함"""
+    upgrade()
+    assert upgrade() == []
+    assert applied_versions() == [version for version, *_ in MIGRATIONS]
+
+
+def test_hot_queries_use_indexes():
+    """주요 쿼리가 hot table에서 Seq Scan을 사용하지 않는지 확인"""
+    upgrade()
+    assert check() == {}
+
+
+def test_upgrade_rebuilds_invalid_index(storage_backend):
+    """CONCURRENTLY 인덱스가 INVALID로 남아 있으면 삭제 후 다시 만들어 유효한 인덱스로 적용"""
+    upgrade()
+    storage_backend.run_sql(
+        """
+        UPDATE pg_index SET indisvalid = FALSE
+        WHERE indexrelid = 'chat_sessions_created_idx'::regclass;
+        """
+    )
+    storage_backend.run_sql("DELETE FROM schema_migrations WHERE version = 3;")
+
+    assert upgrade() == [3]
+    rows = storage_backend.run_sql(
+        "SELECT indisvalid FROM pg_index WHERE indexrelid = 'chat_sessions_created_idx'::regclass;"
+    )
+    assert rows[0]["indisvalid"] is True
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from backend import passwords
+from backend.settings import PASSWORD_HASH_CONFIG
+
+
+@pytest.fixture(autouse=True)
+def fast_rounds():
+    """테스트에서는 가장 낮은 cost 사용"""
+    rounds = passwords.current_rounds()
+    passwords.configure(rounds=4)
+    yield
+    passwords.configure(rounds=rounds)
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_hash_and_verify(workers):
+    """직접 실행 / process pool 실행 모두 해싱과 검증이 일치하는지 확인"""
+    passwords.configure(workers=workers)
+    try:
+        hashed = passwords.hash_password("s3cret!")
+        assert passwords.verify_password("s3cret!", hashed)
+        assert not passwords.verify_password("wrong", hashed)
+    finally:
+        passwords.configure(workers=0)
+
+
+def test_needs_rehash_when_cost_changes():
+    """저장된 해시의 cost가 현재 설정과 다르면 재해싱 대상"""
+    hashed = passwords.hash_password("pw", rounds=4)
+    assert passwords.hash_rounds(hashed) == 4
+    assert not passwords.needs_rehash(hashed)
+    passwords.configure(rounds=5)
+    assert passwords.needs_rehash(hashed)
+
+
+def test_calibrate_cost_stays_in_range():
+    """목표 시간이 아주 짧으면 최소 cost, 길면 범위 안의 값 반환"""
+    assert passwords.calibrate_cost(target_ms=0, min_rounds=4, max_rounds=6) == 4
+    assert 4 <= passwords.calibrate_cost(target_ms=10_000, min_rounds=4, max_rounds=6) <= 6
+
+
+def test_invalid_rounds():
+    """bcrypt가 지원하지 않는 cost는 거부"""
+    with pytest.raises(ValueError):
+        passwords.configure(rounds=3)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_hash_passwords_keeps_order(workers):
+    """여러 worker에 나눠 해싱해도 입력 순서대로 반환"""
+    passwords.configure(workers=workers)
+    try:
+        plain = [f"pw-{i}" for i in range(6)]
+        hashed = passwords.hash_passwords(plain)
+        assert all(passwords.verify_password(p, h) for p, h in zip(plain, hashed))
+    finally:
+        passwords.configure(workers=0)
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_hash_password_async_calls_back(workers):
+    """기다리지 않고 제출한 해싱이 끝나면 callback에 해시 전달"""
+    passwords.configure(workers=workers)
+    try:
+        results = []
+        future = passwords.hash_password_async("s3cret!", results.append)
+        if future is not None:
+            future.result(timeout=30)
+            deadline = time.monotonic() + 5
+            while not results and time.monotonic() < deadline:
+                time.sleep(0.01)  # callback은 결과 처리 스레드에서 실행
+        assert len(results) == 1 and passwords.verify_password("s3cret!", results[0])
+    finally:
+        passwords.configure(workers=0)
+
+
+def test_hashing_timeout_raises():
+    """process pool 작업이 timeout 안에 끝나지 않으면 TimeoutError"""
+    passwords.configure(workers=1, timeout=0.001)
+    try:
+        with pytest.raises(passwords.UNAVAILABLE_ERRORS):
+            passwords.hash_password("s3cret!", rounds=12)
+    finally:
+        passwords.configure(workers=0, timeout=PASSWORD_HASH_CONFIG["timeout"])
@@ -0,0 +1,91 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from backend.pinecone_retriever import PineconeRetriever, query_concurrently
+
+
+class FakeIndex:
+    """벡터 내적으로 검색하는 gRPC index 대역 (요청마다 지연을 두고 동시 실행 수 기록)"""
+
+    def __init__(self, ids, vectors, texts, delay=0.0):
+        self.ids = ids
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.texts = texts
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def query(self, vector, namespace, top_k, include_values=False, include_metadata=True, filter=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        scores = self.vectors @ np.asarray(vector, dtype=np.float32)
+        order = np.argsort(-scores)[:top_k]
+        with self.lock:
+            self.active -= 1
+        return SimpleNamespace(
+            matches=[
+                SimpleNamespace(
+                    id=self.ids[i],
+                    score=float(scores[i]),
+                    values=self.vectors[i].tolist() if include_values else [],
+                    metadata={"text": self.texts[i], "source": "doc"},
+                )
+                for i in order
+            ]
+        )
+
+
+def _index(embeddings, texts, delay=0.0):
+    return FakeIndex([f"id{i}" for i in range(len(texts))], embeddings.embed_documents(texts), texts, delay)
+
+
+def test_queries_run_concurrently_in_input_order():
+    """여러 질의를 동시에 조회하고 결과는 입력 순서대로 반환"""
+    vectors = np.eye(4, dtype=np.float32)
+    index = FakeIndex(["a", "b", "c", "d"], vectors, list("abcd"), delay=0.05)
+    start = time.perf_counter()
+    responses = query_concurrently(index, vectors[::-1], "ns", top_k=1)
+    elapsed = time.perf_counter() - start
+    assert [response.matches[0].id for response in responses] == ["d", "c", "b", "a"]
+    assert index.max_active > 1
+    assert elapsed < 4 * 0.05
+
+
+def test_search_many_matches_single_search():
+    """search_many 결과는 검색어별 invoke 결과와 같음"""
+    embeddings = DeterministicFakeEmbedding(size=16)
+    texts = [f"문서 {i}" for i in range(10)]
+    retriever = PineconeRetriever(
+        index=_index(embeddings, texts), embeddings=embeddings, namespace="ns", search_kwargs={"k": 3}
+    )
+    queries = ["문서 3", "문서 7"]
+    many = retriever.search_many(queries)
+    assert [[d.id for d in docs] for docs in many] == [
+        [d.id for d in retriever.invoke(query)] for query in queries
+    ]
+    assert many[0][0].page_content == "문서 3"
+    assert many[0][0].metadata == {"source": "doc"}
+    assert retriever.search_many([]) == []
+
+
+def test_mmr_returns_k_distinct_documents():
+    """MMR 검색은 fetch_k개 후보 중 서로 다른 문서 k개 반환"""
+    embeddings = DeterministicFakeEmbedding(size=16)
+    texts = [f"문서 {i}" for i in range(30)]
+    retriever = PineconeRetriever(
+        index=_index(embeddings, texts),
+        embeddings=embeddings,
+        namespace="ns",
+        search_type="mmr",
+        search_kwargs={"k": 5, "fetch_k": 20, "lambda_mult": 0.7},
+    )
+    documents = retriever.invoke("문서 1")
+    assert len({d.id for d in documents}) == 5
+    assert documents[0].page_content == "문서 1"
@@ -0,0 +1,96 @@
+import threading
+import time
+import pytest
+from psycopg2 import extensions
+from backend.pool import ConnectionPool, PoolError, PoolTimeoutError
+
+
+class FakeConnection:
+    """DB 없이 풀 동작을 확인하기 위한 가짜 연결"""
+
+    def __init__(self):
+        self.closed = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self.rollbacks = 0
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+@pytest.fixture
+def pool():
+    pool = ConnectionPool(FakeConnection, minconn=1, maxconn=2, timeout=0.2)
+    yield pool
+    pool.closeall()
+
+
+def test_checkout_and_release(pool):
+    """연결을 대여하고 반환하면 재사용되는지 확인"""
+    conn = pool.getconn()
+    assert pool.stats()["checked_out"] == 1
+    pool.putconn(conn)
+    assert pool.stats()["checked_out"] == 0
+    assert pool.getconn() is conn  # 같은 연결 재사용
+
+
+def test_timeout_when_exhausted(pool):
+    """풀이 가득 차면 None 대신 PoolTimeoutError 발생"""
+    pool.getconn()
+    pool.getconn()
+    with pytest.raises(PoolTimeoutError):
+        pool.getconn(timeout=0.05)
+    stats = pool.stats()
+    assert stats["exhaustion_events"] == 1
+    assert stats["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection(pool):
+    """대기 중인 스레드가 반환된 연결을 받아가는지 확인"""
+    first = pool.getconn()
+    pool.getconn()
+    result = {}
+
+    def waiter():
+        result["conn"] = pool.getconn(timeout=2)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    time.sleep(0.05)
+    pool.putconn(first)
+    thread.join()
+    assert result["conn"] is first
+    assert pool.stats()["wait_time_max"] > 0
+
+
+def test_broken_connection_is_replaced(pool):
+    """끊어진 연결은 폐기되고 새 연결로 교체"""
+    conn = pool.getconn()
+    conn.closed = 1
+    pool.putconn(conn)
+    new_conn = pool.getconn()
+    assert new_conn is not conn
+    assert pool.stats()["discarded"] == 1
+
+
+def test_open_transaction_is_rolled_back(pool):
+    """트랜잭션이 열린 채 반환된 연결은 롤백 후 재사용"""
+    conn = pool.getconn()
+    conn.status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+
+
+def test_connection_context_manager(pool):
+    """with 문 사용 후 연결이 반환되고, 외부 연결은 반환 불가"""
+    with pool.connection() as conn:
+        assert pool.stats()["checked_out"] == 1
+    assert pool.stats()["checked_out"] == 0
+    with pytest.raises(PoolError):
+        pool.putconn(FakeConnection())
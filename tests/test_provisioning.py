@@ -0,0 +1,70 @@
+import json
+import pytest
+from backend import passwords
+from backend.accounts import authenticate, register_user
+from backend.provisioning import read_users, register_users
+
+USERNAMES = [f"pytest_bulk_{i}" for i in range(5)]
+PASSWORD = "BulkPassword123!"
+
+
+@pytest.fixture(autouse=True)
+def cleanup_users(storage_backend):
+    """테스트 전후로 대량 등록 사용자 정리 (해싱은 가장 낮은 cost 사용)"""
+    rounds = passwords.current_rounds()
+    passwords.configure(rounds=4)
+    for username in USERNAMES:
+        storage_backend.run_sql("DELETE FROM users WHERE username = $1;", (username,))
+    yield
+    for username in USERNAMES:
+        storage_backend.run_sql("DELETE FROM users WHERE username = $1;", (username,))
+    passwords.configure(rounds=rounds)
+
+
+def test_register_users_in_batches():
+    """여러 batch로 나눠 등록해도 모든 사용자가 로그인 가능해야 함"""
+    users = [(i + 1, {"username": name, "password": PASSWORD}) for i, name in enumerate(USERNAMES)]
+    result = register_users(users, batch_size=2)
+    assert [row["username"] for row in result["created"]] == USERNAMES
+    assert result["conflicts"] == []
+    assert authenticate(USERNAMES[-1], PASSWORD)["id"] == result["created"][-1]["id"]
+
+
+def test_conflicts_do_not_abort_batch():
+    """이미 있는 username / 파일 안 중복 / 잘못된 행은 행 단위로 보고하고 나머지는 등록"""
+    register_user(USERNAMES[0], PASSWORD)
+    users = [
+        (1, {"username": USERNAMES[0], "password": PASSWORD}),
+        (2, {"username": USERNAMES[1], "password": PASSWORD}),
+        (3, {"username": USERNAMES[1], "password": PASSWORD}),
+        (4, {"username": USERNAMES[2]}),
+        (5, None),
+        (6, {"username": USERNAMES[3], "password": PASSWORD}),
+    ]
+    result = register_users(users, batch_size=10)
+    assert [row["username"] for row in result["created"]] == [USERNAMES[1], USERNAMES[3]]
+    assert [(c["line"], c["reason"]) for c in result["conflicts"]] == [
+        (1, "username already exists"),
+        (3, "duplicate username in input"),
+        (4, "missing password"),
+        (5, "invalid row"),
+    ]
+
+
+def test_read_users_csv_and_jsonl(tmp_path):
+    """CSV는 헤더 다음 줄부터, JSONL은 빈 줄을 건너뛰고 줄 번호와 함께 반환"""
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("username,password\nalice,pw1\nbob,pw2\n", encoding="utf-8")
+    assert [(line, row["username"]) for line, row in read_users(str(csv_path))] == [
+        (2, "alice"),
+        (3, "bob"),
+    ]
+
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text(
+        json.dumps({"username": "carol", "password": "pw"}) + "\n\nnot json\n", encoding="utf-8"
+    )
+    assert list(read_users(str(jsonl_path))) == [
+        (1, {"username": "carol", "password": "pw"}),
+        (3, None),
+    ]
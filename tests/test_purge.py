@@ -0,0 +1,111 @@
+import pytest
+from backend.accounts import register_user
+from backend.db import (
+    create_chat_session,
+    insert_chat_message,
+    get_user_chat_sessions,
+    get_user_id,
+    message_journal,
+)
+from backend import purge
+from backend.purge import PurgeJob
+
+# 테스트용 계정 정보
+TEST_USERNAME = "pytest_purge_user"
+TEST_PASSWORD = "TestPassword123!"
+
+
+def _delete_test_user(backend):
+    message_journal.flush()
+    backend.run_sql(
+        """
+        DELETE FROM chat_messages
+        WHERE session_id IN (
+            SELECT s.id FROM chat_sessions s JOIN users u ON s.user_id = u.id
+            WHERE u.username = $1
+        );
+        """,
+        (TEST_USERNAME,),
+    )
+    backend.run_sql(
+        "DELETE FROM chat_sessions WHERE user_id IN (SELECT id FROM users WHERE username = $1);",
+        (TEST_USERNAME,),
+    )
+    backend.run_sql("DELETE FROM users WHERE username = $1;", (TEST_USERNAME,))
+
+
+@pytest.fixture(autouse=True)
+def cleanup_user(storage_backend):
+    """테스트 전후로 테스트 사용자와 채팅 데이터를 정리"""
+    _delete_test_user(storage_backend)
+    yield
+    _delete_test_user(storage_backend)
+
+
+def test_purge_deletes_inactive_user_data(storage_backend):
+    """비활성 사용자의 세션과 메시지가 batch 단위로 모두 삭제되는지 테스트"""
+    register_user(TEST_USERNAME, TEST_PASSWORD)
+    user_id = get_user_id(TEST_USERNAME)
+    for _ in range(2):
+        session_id = create_chat_session(user_id)
+        for i in range(3):
+            insert_chat_message(session_id, "user", f"Purge message {i}")
+
+    # delete_user는 백그라운드 작업을 시작하므로, 비활성화만 직접 수행한 뒤 작업 실행
+    message_journal.flush()
+    storage_backend.run_sql("UPDATE users SET is_active = FALSE WHERE id = $1;", (user_id,))
+
+    progress = PurgeJob(batch_size=2, pause=0).run()
+    assert progress["state"] == "done"
+    assert progress["messages_deleted"] >= 6
+    assert progress["batches"] > 2  # 여러 batch로 나눠 삭제
+    assert get_user_chat_sessions(user_id) == []
+
+
+def test_purge_skips_active_users():
+    """활성 사용자의 데이터는 삭제하지 않음"""
+    register_user(TEST_USERNAME, TEST_PASSWORD)
+    user_id = get_user_id(TEST_USERNAME)
+    session_id = create_chat_session(user_id)
+    insert_chat_message(session_id, "user", "Keep me")
+
+    PurgeJob(batch_size=2, pause=0).run()
+    assert len(get_user_chat_sessions(user_id)) == 1
+
+
+def test_start_during_run_purges_new_inactive_user(monkeypatch):
+    """실행 중에 시작을 요청하면 (실행 중 탈퇴한 사용자) 작업이 끝나기 전에 대상 사용자를 다시 조회하여 처리"""
+    job = PurgeJob(pause=0)
+    pending = [[1], [2], []]
+    purged = []
+
+    def pending_users():
+        return pending.pop(0)
+
+    def purge_user(user_id):
+        purged.append(user_id)
+        if user_id == 1:
+            assert job.start() is False  # 실행 중이므로 새 스레드 대신 다시 조회 요청
+
+    monkeypatch.setattr(job, "_pending_users", pending_users)
+    monkeypatch.setattr(job, "_purge_user", purge_user)
+    progress = job.run()
+    assert purged == [1, 2]
+    assert progress["state"] == "done" and progress["users_done"] == 2
+    assert pending == [[]]  # 다시 요청하지 않았으면 더 조회하지 않음
+
+
+def test_purge_flushes_message_journal_before_deleting(monkeypatch):
+    """사용자 데이터를 지우기 전에 journal에 남은 메시지를 먼저 저장"""
+    calls = []
+
+    class Journal:
+        def flush(self, timeout=5.0):
+            calls.append("flush")
+            return True
+
+    job = PurgeJob(pause=0)
+    monkeypatch.setattr(purge, "message_journal", Journal())
+    monkeypatch.setattr(job, "_delete_batch", lambda name, user_id: calls.append(name) or 0)
+    job._purge_user(1)
+    assert calls == ["flush", "purge_messages_batch", "purge_sessions_batch"]
@@ -0,0 +1,48 @@
+from backend import queries
+
+
+class FakeCursor:
+    """실행된 SQL만 기록하는 테스트용 cursor"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = []
+
+    def execute(self, query, params=None):
+        self.executed.append((query, params))
+
+
+class FakeConnection:
+    pass
+
+
+def test_to_pyformat_reorders_params():
+    """$n placeholder가 %s로 바뀌고 재사용된 파라미터가 순서대로 펼쳐지는지 확인"""
+    query, params = queries.to_pyformat("delete_chat_session", (7,))
+    assert "$" not in query
+    assert query.count("%s") == 2
+    assert params == (7, 7)
+
+
+def test_param_count():
+    """쿼리별 필요한 파라미터 수 확인"""
+    assert queries.param_count("get_all_chat_sessions") == 0
+    assert queries.param_count("get_user_id") == 1
+    assert queries.param_count("get_chat_history_page_after") == 4
+
+
+def test_prepare_once_per_connection():
+    """같은 연결에서는 한 번만 PREPARE 하고 이후에는 EXECUTE만 하는지 확인"""
+    conn = FakeConnection()
+    cur = FakeCursor(conn)
+    queries.execute(cur, "get_user_id", ("alice",))
+    queries.execute(cur, "get_user_id", ("bob",))
+    statements = [query for query, _ in cur.executed]
+    assert sum(query.startswith("PREPARE q_get_user_id") for query in statements) == 1
+    assert statements.count("EXECUTE q_get_user_id (%s);") == 2
+
+    # 새 연결에서는 다시 PREPARE
+    other = FakeCursor(FakeConnection())
+    queries.execute(other, "get_user_id", ("carol",))
+    assert other.executed[0][0].startswith("PREPARE q_get_user_id")
+    assert queries.stats()["get_user_id"]["calls"] >= 3
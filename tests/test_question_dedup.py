@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage
+
+from backend.langchain_chatbot import pick_next_question
+from backend.question_dedup import QuestionDeduplicator
+
+TOPICS = ["GIL", "데코레이터", "제너레이터", "리스트"]
+
+
+class TopicEmbeddings(Embeddings):
+    """텍스트에 들어 있는 주제어로 벡터를 만드는 임베딩 (같은 주제면 표현이 달라도 같은 방향)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts):
+        self.calls += 1
+        return [[float(topic in text) for topic in TOPICS] + [0.1] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class FakeRetriever:
+    def __init__(self, contents):
+        self.contents = contents
+
+    def invoke(self, query):
+        return [SimpleNamespace(page_content=content) for content in self.contents]
+
+
+class TopicChain:
+    """문맥의 주제로 질문을 만드는 질문 체인 대역"""
+
+    def __init__(self):
+        self.contexts = []
+
+    def invoke(self, inputs, config=None):
+        self.contexts.append(inputs["context"])
+        topic = next(topic for topic in TOPICS if topic in inputs["context"])
+        return SimpleNamespace(content=f"{topic}에 대해 설명해 주세요 ({len(self.contexts)})")
+
+
+def test_rephrased_question_is_duplicate():
+    """표현만 바꾼 질문은 중복, 다른 주제의 질문은 새 질문"""
+    dedup = QuestionDeduplicator(TopicEmbeddings(), threshold=0.9)
+    dedup.add(["GIL이란 무엇인가요?"])
+    assert dedup.is_duplicate("파이썬의 GIL을 설명해 주세요")
+    assert not dedup.is_duplicate("데코레이터는 언제 사용하나요?")
+    stats = dedup.stats()
+    assert stats["semantic_rejections"] == 1 and stats["llm_calls"] == 0  # 판정만으로는 LLM 호출로 세지 않음
+
+
+def test_exact_duplicate_skips_embedding():
+    """문자열이 같은 질문은 임베딩 없이 중복 처리"""
+    embeddings = TopicEmbeddings()
+    dedup = QuestionDeduplicator(embeddings)
+    calls = embeddings.calls
+    assert dedup.is_duplicate("Q1", used_questions={"Q1"})
+    assert embeddings.calls == calls
+    assert dedup.stats()["exact_rejections"] == 1
+
+
+def test_choose_contexts_prefers_new_topics():
+    """이미 낸 질문과 겹치는 문맥은 제외하고, 모두 겹치면 가장 덜 겹치는 문맥 하나 반환"""
+    dedup = QuestionDeduplicator(TopicEmbeddings(), context_threshold=0.85)
+    contexts = ["GIL 문서", "데코레이터 문서"]
+    assert dedup.choose_contexts(contexts) == contexts  # 기존 질문이 없으면 그대로
+    dedup.add(["GIL이란?"])
+    assert dedup.choose_contexts(contexts) == ["데코레이터 문서"]
+    dedup.add(["데코레이터란?"])
+    assert len(dedup.choose_contexts(contexts)) == 1
+
+
+def test_pick_next_question_avoids_colliding_context():
+    """기존 질문과 같은 주제의 문맥은 건너뛰어 LLM 호출 한 번으로 새 질문 생성"""
+    dedup = QuestionDeduplicator(TopicEmbeddings())
+    dedup.add(["GIL에 대해 설명해 주세요"])
+    chain = TopicChain()
+    question, context, _ = pick_next_question(
+        FakeRetriever(["GIL 문서", "데코레이터 문서"]), chain, "", set(), set(), dedup=dedup
+    )
+    assert context == "데코레이터 문서" and "데코레이터" in question
+    assert chain.contexts == ["데코레이터 문서"]
+    assert dedup.stats()["llm_calls"] == 1
+
+
+def test_pick_next_question_retries_semantic_duplicate():
+    """문맥이 모두 사용되어 같은 주제의 질문이 나오면 다시 생성"""
+    dedup = QuestionDeduplicator(TopicEmbeddings())
+    dedup.add(["GIL에 대해 설명해 주세요"])
+    chain = TopicChain()
+    question, _, _ = pick_next_question(
+        FakeRetriever(["GIL 문서"]), chain, "GIL 문서", {"GIL 문서"}, set(), max_retries=3, dedup=dedup
+    )
+    assert len(chain.contexts) == 3  # 모두 중복이면 마지막 질문 반환
+    assert dedup.stats()["semantic_rejections"] == 3
+
+
+def test_cached_questions_are_not_counted_as_llm_calls():
+    """응답 캐시에서 받은 질문은 LLM 호출 수에 포함하지 않음"""
+    dedup = QuestionDeduplicator(TopicEmbeddings())
+    chain = TopicChain()
+    cached = SimpleNamespace(invoke=lambda inputs, config=None: AIMessage(
+        content="GIL에 대해 설명해 주세요", response_metadata={"llm_cache": "hit"}
+    ))
+    pick_next_question(FakeRetriever(["GIL 문서"]), cached, "", set(), set(), dedup=dedup)
+    pick_next_question(FakeRetriever(["데코레이터 문서"]), chain, "", set(), set(), dedup=dedup)
+    assert dedup.stats()["llm_calls"] == 1
@@ -0,0 +1,66 @@
+from typing import List
+import pytest
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from backend import retrieval_cache
+from backend.retrieval_cache import CachedRetriever
+
+
+class CountingRetriever(BaseRetriever):
+    """호출 횟수를 세는 검색기 (Pinecone 대신 사용)"""
+
+    calls: int = 0
+
+    def _get_relevant_documents(self, query, *, run_manager) -> List[Document]:
+        self.calls += 1
+        return [Document(page_content=f"{query} #{self.calls}", metadata={"n": self.calls})]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """테스트마다 빈 캐시에서 시작"""
+    retrieval_cache.invalidate()
+    yield
+    retrieval_cache.invalidate()
+
+
+def _cached(inner, **search_kwargs):
+    return CachedRetriever(
+        retriever=inner, namespace="ns", search_type="mmr", search_kwargs=search_kwargs or {"k": 5}
+    )
+
+
+def test_same_query_is_served_from_cache():
+    """같은 검색어 / 조건은 한 번만 검색하고 결과를 공유"""
+    inner = CountingRetriever()
+    first = _cached(inner).invoke("python")
+    second = _cached(inner).invoke("python")  # 다른 세션의 retriever 객체도 같은 캐시 사용
+    assert inner.calls == 1
+    assert [d.page_content for d in first] == [d.page_content for d in second]
+    assert retrieval_cache.stats()["hits"] >= 1
+
+
+def test_key_includes_search_kwargs():
+    """검색 조건이 다르면 다른 결과로 캐시"""
+    inner = CountingRetriever()
+    _cached(inner, k=5).invoke("python")
+    _cached(inner, k=3).invoke("python")
+    assert inner.calls == 2
+
+
+def test_invalidate_after_reingest():
+    """인덱스 버전이 바뀌면 다시 검색"""
+    inner = CountingRetriever()
+    retriever = _cached(inner)
+    retriever.invoke("python")
+    version = retrieval_cache.index_version()
+    retrieval_cache.invalidate()
+    assert retrieval_cache.index_version() != version
+    assert retriever.invoke("python")[0].page_content == "python #2"
+
+
+def test_cached_documents_are_copies():
+    """반환된 문서를 수정해도 캐시된 결과는 바뀌지 않음"""
+    retriever = _cached(CountingRetriever())
+    retriever.invoke("python")[0].metadata["n"] = "changed"
+    assert retriever.invoke("python")[0].metadata["n"] == 1
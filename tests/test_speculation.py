@@ -0,0 +1,62 @@
+import threading
+import time
+from backend.speculation import Speculator
+
+
+def test_hit_when_result_is_ready():
+    """요청 전에 끝난 작업은 적중으로 기록되고 작업 시간만큼 절약"""
+    speculator = Speculator(max_workers=1)
+    speculation = speculator.start(lambda: time.sleep(0.05) or "next")
+    time.sleep(0.1)
+    assert speculation.take() == "next"
+
+    stats = speculator.stats()
+    assert stats["hits"] == 1 and stats["hit_rate"] == 1.0
+    assert stats["time_saved_seconds"] >= 0.04
+    speculator.shutdown()
+
+
+def test_wait_when_still_running():
+    """아직 실행 중이면 남은 시간만 기다리고 '대기 후 사용'으로 기록"""
+    speculator = Speculator(max_workers=1)
+    release = threading.Event()
+    speculation = speculator.start(lambda: release.wait(5) and "next")
+    time.sleep(0.05)
+    release.set()
+    assert speculation.take() == "next"
+
+    stats = speculator.stats()
+    assert stats["waits"] == 1 and stats["hits"] == 0 and stats["hit_rate"] == 0.0
+    speculator.shutdown()
+
+
+def test_failed_and_discarded():
+    """실패한 작업은 None을 반환하고, 버린 작업은 결과를 사용하지 않음"""
+    speculator = Speculator(max_workers=1)
+    assert speculator.start(lambda: 1 / 0).take() is None
+
+    speculation = speculator.start(lambda: "unused")
+    speculation.discard()
+    speculation.discard()  # 한 번만 기록
+
+    stats = speculator.stats()
+    assert stats["started"] == 2
+    assert stats["failed"] == 1 and stats["discarded"] == 1
+    speculator.shutdown()
+
+
+def test_miss_when_task_has_not_started():
+    """작업 스레드가 바빠 시작 전인 작업은 취소하고 miss로 기록 (절약 시간 없음)"""
+    speculator = Speculator(max_workers=1)
+    release = threading.Event()
+    busy = speculator.start(release.wait, 5)
+    queued = speculator.start(lambda: "next")
+    assert queued.take(timeout=5) is None
+
+    release.set()
+    busy.take()
+    stats = speculator.stats()
+    assert stats["misses"] == 1 and stats["waits"] == 1
+    assert stats["hit_rate"] == 0.0
+    assert stats["avg_time_saved_seconds"] == stats["time_saved_seconds"]  # miss는 절약 시간 평균에서 제외
+    speculator.shutdown()
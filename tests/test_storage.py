@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from backend.storage import IntegrityError
+from backend.storage.sqlite import SQLiteBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """임시 파일 SQLite 저장소"""
+    backend = SQLiteBackend(str(tmp_path / "chatbot.sqlite3"))
+    yield backend
+    backend.close()
+
+
+def test_wal_mode(backend):
+    """WAL 모드와 외래 키 제약이 켜져 있는지 확인"""
+    with backend.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+
+
+def test_duplicate_username_raises_integrity_error(backend):
+    """중복 username은 저장소 공통 IntegrityError로 전달"""
+    backend.query("register_user", ("alice", "hash"), commit=True)
+    with pytest.raises(IntegrityError):
+        backend.query("register_user", ("alice", "hash"), commit=True)
+
+
+def test_timestamps_round_trip_in_utc(backend):
+    """시각은 UTC로 저장되고 keyset cursor로 다시 비교할 수 있어야 함"""
+    user_id = backend.query("register_user", ("bob", "hash"), commit=True)[0]["id"]
+    session_id = backend.query("create_chat_session", (user_id,), commit=True)[0]["id"]
+    base = datetime(2025, 1, 1, 9, 0, tzinfo=timezone(timedelta(hours=9)))
+    backend.write_messages(
+        [
+            {
+                "message_uid": f"uid-{i}",
+                "session_id": session_id,
+                "sender": "user",
+                "message": f"m{i}",
+                "timestamp": base + timedelta(microseconds=i),
+            }
+            for i in range(3)
+        ]
+    )
+
+    rows = backend.query("get_chat_history", (session_id,))
+    assert rows[0]["timestamp"] == base
+    assert rows[0]["timestamp"].tzinfo == timezone.utc
+
+    after = backend.query(
+        "get_chat_history_page_after", (session_id, rows[0]["timestamp"], rows[0]["id"], 10)
+    )
+    assert [row["message"] for row in after] == ["m1", "m2"]
+
+
+def test_write_messages_is_idempotent(backend):
+    """같은 message_uid는 한 번만 저장"""
+    user_id = backend.query("register_user", ("carol", "hash"), commit=True)[0]["id"]
+    session_id = backend.query("create_chat_session", (user_id,), commit=True)[0]["id"]
+    row = {
+        "message_uid": "same-uid",
+        "session_id": session_id,
+        "sender": "bot",
+        "message": "hi",
+        "timestamp": datetime.now(timezone.utc),
+    }
+    backend.write_messages([row])
+    backend.write_messages([row])
+    assert len(backend.query("get_chat_history", (session_id,))) == 1